@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from anthropic import AsyncAnthropic
+
+logger = logging.getLogger(__name__)
+
+BATCH_POLL_INTERVAL_SECONDS = float(os.environ.get("MESSAGE_BATCH_POLL_INTERVAL", "30"))
+
+# The API accepts up to 100,000 requests per batch; smaller batches finish and fail independently
+BATCH_MAX_REQUESTS = int(os.environ.get("MESSAGE_BATCH_MAX_REQUESTS", "10000"))
+
+_CUSTOM_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
+
+def batch_custom_id(case_id: str) -> str:
+    """Map a case_id to a valid batch custom_id, hashing ids the API would reject"""
+    if _CUSTOM_ID_PATTERN.match(case_id):
+        return case_id
+    return hashlib.sha256(case_id.encode("utf-8")).hexdigest()[:64]
+
+async def run_message_batches(
+    client: AsyncAnthropic,
+    requests: Dict[str, Dict[str, Any]],
+    poll_interval: Optional[float] = None
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """Submit messages.create params keyed by case_id as Message Batches and wait for them.
+
+    Returns a result per case_id ({"success", "message", "error"}) and the submitted batch ids.
+    """
+    poll_interval = BATCH_POLL_INTERVAL_SECONDS if poll_interval is None else poll_interval
+    custom_ids = {batch_custom_id(case_id): case_id for case_id in requests}
+    if len(custom_ids) != len(requests):
+        raise ValueError("Case ids collide after mapping to batch custom ids")
+    
+    batch_requests = [
+        {"custom_id": custom_id, "params": requests[case_id]}
+        for custom_id, case_id in custom_ids.items()
+    ]
+    chunks = [
+        batch_requests[start:start + BATCH_MAX_REQUESTS]
+        for start in range(0, len(batch_requests), BATCH_MAX_REQUESTS)
+    ]
+    
+    chunk_results = await asyncio.gather(*(
+        _run_single_batch(client, chunk, poll_interval) for chunk in chunks
+    ))
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    batch_ids = []
+    for batch_id, entries in chunk_results:
+        batch_ids.append(batch_id)
+        for custom_id, entry in entries.items():
+            results[custom_ids[custom_id]] = entry
+    
+    # Anything the batch did not report back is treated as failed
+    for case_id in requests:
+        if case_id not in results:
+            results[case_id] = {"success": False, "message": None, "error": "No result returned by batch"}
+    
+    return results, batch_ids
+
+async def _run_single_batch(
+    client: AsyncAnthropic,
+    batch_requests: List[Dict[str, Any]],
+    poll_interval: float
+) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    started = time.monotonic()
+    batch = await client.messages.batches.create(requests=batch_requests)
+    logger.info("Submitted message batch %s with %d requests", batch.id, len(batch_requests))
+    
+    while batch.processing_status != "ended":
+        await asyncio.sleep(poll_interval)
+        batch = await client.messages.batches.retrieve(batch.id)
+    
+    logger.info("Message batch %s ended after %.0fs", batch.id, time.monotonic() - started)
+    
+    entries: Dict[str, Dict[str, Any]] = {}
+    async for entry in await client.messages.batches.results(batch.id):
+        result = entry.result
+        if result.type == "succeeded":
+            entries[entry.custom_id] = {"success": True, "message": result.message, "error": None}
+        elif result.type == "errored":
+            entries[entry.custom_id] = {"success": False, "message": None, "error": str(result.error.error.message)}
+        else:
+            entries[entry.custom_id] = {"success": False, "message": None, "error": f"Batch request {result.type}"}
+    
+    return batch.id, entries
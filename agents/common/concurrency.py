@@ -0,0 +1,52 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+# Default number of cases a single run keeps in flight
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("EVAL_MAX_CONCURRENCY", "8"))
+
+# Hard ceiling on model calls in flight across every run in this process (see scheduler.py)
+GLOBAL_MAX_CONCURRENCY = int(os.environ.get("EVAL_GLOBAL_MAX_CONCURRENCY", "32"))
+
+def resolve_max_concurrency(
+    settings: Dict[str, Any],
+    key: str = "max_concurrency",
+    default: int = DEFAULT_MAX_CONCURRENCY
+) -> int:
+    """Read a per-run in-flight limit from evaluation settings, clamped to the global limit"""
+    try:
+        requested = int(settings.get(key, default))
+    except (TypeError, ValueError):
+        requested = default
+    return max(1, min(requested, GLOBAL_MAX_CONCURRENCY))
+
+async def run_bounded(
+    items: Sequence[Any],
+    worker: Callable[[int, Any], Awaitable[Any]],
+    max_concurrency: int,
+    on_error: Callable[[int, Any, Exception], Any],
+    should_stop: Optional[Callable[[], bool]] = None
+) -> List[Any]:
+    """Run worker over items with at most max_concurrency in flight.
+
+    Results are returned in the same order as items. An exception raised by
+    worker is turned into a result by on_error so one item never fails the rest.
+    Once should_stop returns True no new items are started; their results stay None.
+    """
+    results: List[Any] = [None] * len(items)
+    pending = iter(range(len(items)))
+
+    async def worker_loop():
+        # All loops share one iterator, so each index is taken exactly once
+        for index in pending:
+            if should_stop and should_stop():
+                return
+            item = items[index]
+            try:
+                results[index] = await worker(index, item)
+            except Exception as e:
+                results[index] = on_error(index, item, e)
+
+    worker_count = min(max(1, max_concurrency), len(items))
+    await asyncio.gather(*(worker_loop() for _ in range(worker_count)))
+    return results
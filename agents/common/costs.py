@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any, Dict, Optional
+from agents.common.rate_limiter import estimate_input_tokens
+
+# USD per million tokens. Prompt cache writes cost 1.25x and reads 0.1x the input
+# price; the Message Batches API halves everything.
+MODEL_PRICING = {
+    "claude-opus-4": {"input": 15.0, "output": 75.0},
+    "claude-sonnet-4": {"input": 3.0, "output": 15.0},
+    "claude-3-7-sonnet": {"input": 3.0, "output": 15.0},
+    "claude-3-5-sonnet": {"input": 3.0, "output": 15.0},
+    "claude-3-5-haiku": {"input": 0.8, "output": 4.0},
+    "claude-3-opus": {"input": 15.0, "output": 75.0},
+    "claude-3-haiku": {"input": 0.25, "output": 1.25}
+}
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+BATCH_DISCOUNT = 0.5
+
+# Unknown models are priced like the most expensive one, so budgets err on the safe side
+FALLBACK_PRICING = MODEL_PRICING["claude-opus-4"]
+
+def get_model_pricing(model_name: str) -> Dict[str, float]:
+    """Pricing for a model name, matching dated and -latest aliases by prefix"""
+    for prefix, pricing in MODEL_PRICING.items():
+        if model_name.startswith(prefix):
+            return pricing
+    return FALLBACK_PRICING
+
+def cost_of_usage(model_name: str, usage: Dict[str, int], batch: bool = False) -> float:
+    """Dollar cost of a call from its usage_to_dict() token counts"""
+    pricing = get_model_pricing(model_name)
+    cost = (
+        usage.get("input_tokens", 0) * pricing["input"]
+        + usage.get("cache_creation_input_tokens", 0) * pricing["input"] * CACHE_WRITE_MULTIPLIER
+        + usage.get("cache_read_input_tokens", 0) * pricing["input"] * CACHE_READ_MULTIPLIER
+        + usage.get("output_tokens", 0) * pricing["output"]
+    ) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+def projected_cost(params: Dict[str, Any], batch: bool = False) -> float:
+    """Worst-case cost of a messages.create call: estimated input plus max_tokens of output"""
+    return cost_of_usage(params["model"], {
+        "input_tokens": estimate_input_tokens(params),
+        "output_tokens": params["max_tokens"]
+    }, batch)
+
+class BudgetExhaustedError(Exception):
+    """Raised when a call does not fit in what is left of the evaluation budget"""
+
+class CostTracker:
+    """Running spend for one evaluation, with an optional hard budget in USD.
+
+    Work is reserved at its projected cost before it is dispatched and settled at
+    its actual cost afterwards. A reservation that only fits once in-flight work
+    settles waits for it (unless wait is False); one that still does not fit
+    exhausts the tracker, which then refuses all further reservations.
+    """
+
+    def __init__(self, budget: Optional[float] = None, spent: float = 0.0):
+        self.budget = budget
+        self.spent = spent
+        self.reserved = 0.0
+        self.exhausted = False
+        self.skipped = 0
+        self._settled = asyncio.Condition()
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any], spent: float = 0.0) -> "CostTracker":
+        budget = settings.get("budget")
+        return cls(float(budget) if budget is not None else None, spent)
+
+    async def reserve(self, amount: float, wait: bool = True) -> bool:
+        async with self._settled:
+            if self.budget is not None and wait:
+                await self._settled.wait_for(
+                    lambda: self.exhausted or self.spent + amount > self.budget
+                    or self.spent + self.reserved + amount <= self.budget
+                )
+            if self.budget is not None and self.spent + self.reserved + amount > self.budget:
+                self.exhausted = True
+            if self.exhausted:
+                self.skipped += 1
+                return False
+            self.reserved += amount
+            return True
+
+    async def settle(self, reserved: float, actual: float):
+        async with self._settled:
+            self.reserved -= reserved
+            self.spent += actual
+            self._settled.notify_all()
+
+    def record(self, actual: float):
+        self.spent += actual
+
+    def skip(self, cases: int):
+        """Count cases that were never dispatched because the budget ran out"""
+        self.skipped += cases
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "spent": self.spent,
+            "budget": self.budget,
+            "budget_exhausted": self.exhausted,
+            "skipped_cases": self.skipped
+        }
@@ -0,0 +1,153 @@
+"""
+Local stand-in for the Message Batches API, for running batch mode offline.
+
+Start it and point the Anthropic client at it:
+
+    python -m agents.common.fake_batch_server --port 8089
+    export ANTHROPIC_BASE_URL=http://localhost:8089
+
+Batches end after --polls status checks. Every request gets a canned reply
+unless a custom responder is passed to create_app(). Requests forcing a tool
+get the reply parsed as JSON and returned as that tool's input.
+"""
+
+import argparse
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+from aiohttp import web
+
+Responder = Callable[[Dict[str, Any]], str]
+
+def default_responder(params: Dict[str, Any]) -> str:
+    """Reply to judge requests with a valid verdict and to everything else with a fixed answer"""
+    content = params["messages"][-1]["content"]
+    if isinstance(content, list):
+        content = " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+    if params.get("tool_choice") or "similarity_score" in content:
+        return json.dumps({"similarity_score": 100, "reasoning": "Fake batch server verdict"})
+    return "Fake batch server response"
+
+def create_app(responder: Optional[Responder] = None, polls_until_ended: int = 1) -> web.Application:
+    """Build the aiohttp application serving /v1/messages/batches"""
+    responder = responder or default_responder
+    batches: Dict[str, Dict[str, Any]] = {}
+
+    def batch_object(request: web.Request, batch: Dict[str, Any]) -> Dict[str, Any]:
+        ended = batch["polls"] >= polls_until_ended
+        total = len(batch["requests"])
+        succeeded = sum(1 for entry in batch["results"] if entry["result"]["type"] == "succeeded")
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else total,
+                "succeeded": succeeded if ended else 0,
+                "errored": total - succeeded if ended else 0,
+                "canceled": 0,
+                "expired": 0
+            },
+            "created_at": batch["created_at"],
+            "expires_at": batch["expires_at"],
+            "ended_at": batch["created_at"] if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{request.scheme}://{request.host}/v1/messages/batches/{batch['id']}/results" if ended else None
+        }
+
+    def run_request(entry: Dict[str, Any]) -> Dict[str, Any]:
+        params = entry["params"]
+        try:
+            text = responder(params)
+        except Exception as e:
+            return {
+                "custom_id": entry["custom_id"],
+                "result": {
+                    "type": "errored",
+                    "error": {"type": "error", "error": {"type": "api_error", "message": str(e)}}
+                }
+            }
+        tool_choice = params.get("tool_choice") or {}
+        if tool_choice.get("type") == "tool":
+            content = [{
+                "type": "tool_use",
+                "id": f"toolu_{uuid.uuid4().hex[:24]}",
+                "name": tool_choice["name"],
+                "input": json.loads(text)
+            }]
+            stop_reason = "tool_use"
+        else:
+            content = [{"type": "text", "text": text}]
+            stop_reason = "end_turn"
+        return {
+            "custom_id": entry["custom_id"],
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "id": f"msg_{uuid.uuid4().hex[:24]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": params.get("model", "fake-model"),
+                    "content": content,
+                    "stop_reason": stop_reason,
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 0, "output_tokens": len(text) // 4 + 1}
+                }
+            }
+        }
+
+    async def create_batch(request: web.Request) -> web.Response:
+        body = await request.json()
+        now = datetime.now(timezone.utc)
+        batch = {
+            "id": f"msgbatch_{uuid.uuid4().hex[:24]}",
+            "requests": body["requests"],
+            "results": [run_request(entry) for entry in body["requests"]],
+            "polls": 0,
+            "created_at": now.isoformat(),
+            "expires_at": (now + timedelta(hours=24)).isoformat()
+        }
+        batches[batch["id"]] = batch
+        return web.json_response(batch_object(request, batch))
+
+    async def retrieve_batch(request: web.Request) -> web.Response:
+        batch = batches.get(request.match_info["batch_id"])
+        if batch is None:
+            return web.json_response({"type": "error", "error": {"type": "not_found_error", "message": "Batch not found"}}, status=404)
+        batch["polls"] += 1
+        return web.json_response(batch_object(request, batch))
+
+    async def batch_results(request: web.Request) -> web.Response:
+        batch = batches.get(request.match_info["batch_id"])
+        if batch is None:
+            return web.json_response({"type": "error", "error": {"type": "not_found_error", "message": "Batch not found"}}, status=404)
+        body = "\n".join(json.dumps(entry) for entry in batch["results"])
+        return web.Response(text=body, content_type="application/binary")
+
+    app = web.Application()
+    app.router.add_post("/v1/messages/batches", create_batch)
+    app.router.add_get("/v1/messages/batches/{batch_id}", retrieve_batch)
+    app.router.add_get("/v1/messages/batches/{batch_id}/results", batch_results)
+    return app
+
+async def start_fake_batch_server(
+    host: str = "127.0.0.1",
+    port: int = 8089,
+    responder: Optional[Responder] = None,
+    polls_until_ended: int = 1
+) -> web.AppRunner:
+    """Start the fake server in the running event loop; call cleanup() on the result to stop it"""
+    runner = web.AppRunner(create_app(responder, polls_until_ended))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Message Batches API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--polls", type=int, default=1, help="Status checks before a batch ends")
+    args = parser.parse_args()
+    web.run_app(create_app(polls_until_ended=args.polls), host=args.host, port=args.port)
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from agents.common.metrics import percentile
+
+DEFAULT_HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", "95"))
+DEFAULT_MAX_HEDGE_RATIO = float(os.environ.get("HEDGE_MAX_RATIO", "0.05"))
+DEFAULT_HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", "20"))
+
+# Number of recent call latencies the hedge delay is learned from
+LATENCY_WINDOW = int(os.environ.get("HEDGE_LATENCY_WINDOW", "500"))
+
+class HedgeConfig:
+    """Per-run hedging options from evaluation_settings.hedging"""
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        max_hedge_ratio: float = DEFAULT_MAX_HEDGE_RATIO,
+        min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES
+    ):
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_samples = max(1, min_samples)
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> Optional["HedgeConfig"]:
+        config = settings.get("hedging")
+        if not config:
+            return None
+        if config is True:
+            return cls()
+        return cls(
+            float(config.get("percentile", DEFAULT_HEDGE_PERCENTILE)),
+            float(config.get("max_hedge_ratio", DEFAULT_MAX_HEDGE_RATIO)),
+            int(config.get("min_samples", DEFAULT_HEDGE_MIN_SAMPLES))
+        )
+
+class LatencyTracker:
+    """Recent call latencies and hedge counts for one model and call kind, shared by every run in the process"""
+
+    def __init__(self):
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self, config: HedgeConfig) -> Optional[float]:
+        """Seconds to wait before hedging, or None until enough latencies have been seen"""
+        if len(self.latencies) < config.min_samples:
+            return None
+        return percentile(list(self.latencies), config.percentile)
+
+    def can_hedge(self, config: HedgeConfig) -> bool:
+        """Whether one more hedge keeps hedges under max_hedge_ratio of calls"""
+        return self.hedges + 1 <= self.calls * config.max_hedge_ratio
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_ratio": self.hedges / self.calls if self.calls else 0.0
+        }
+
+_trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+
+def get_latency_tracker(model_name: str, call_kind: str) -> LatencyTracker:
+    """Latencies are kept per call kind, so long execution calls and short judge calls
+    on the same model each get their own hedge delay"""
+    tracker = _trackers.get((model_name, call_kind))
+    if tracker is None:
+        tracker = _trackers[(model_name, call_kind)] = LatencyTracker()
+    return tracker
+
+async def send_hedged(
+    send: Callable[[], Awaitable[Any]],
+    start_hedge: Callable[[], Optional["asyncio.Future[Any]"]],
+    tracker: LatencyTracker,
+    config: Optional[HedgeConfig]
+) -> Tuple[Any, Dict[str, bool]]:
+    """Run send, and if it is still running after the learned delay, race it against a hedge.
+
+    start_hedge starts the duplicate request, or returns None when it cannot be sent
+    right now (no free slot), in which case the primary simply carries on. The first
+    successful response wins and the other request is cancelled. If both fail, the
+    primary's error is raised. Returns the result and whether a hedge was issued and won.
+    """
+    tracker.calls += 1
+    start_time = time.monotonic()
+    delay = tracker.hedge_delay(config) if config else None
+
+    primary = asyncio.ensure_future(send())
+    tasks = {primary}
+    hedged = False
+    try:
+        if delay is not None:
+            await asyncio.wait(tasks, timeout=delay)
+            hedge = start_hedge() if not primary.done() and tracker.can_hedge(config) else None
+            if hedge is not None:
+                hedged = True
+                tracker.hedges += 1
+                tasks.add(hedge)
+
+        while True:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in done if task.exception() is None), None)
+            if winner is not None:
+                break
+            tasks -= done
+            if not tasks:
+                # Every request failed; surface the primary's error
+                raise primary.exception()
+    finally:
+        losers = [task for task in tasks if not task.done()]
+        for task in losers:
+            task.cancel()
+        await asyncio.gather(*losers, return_exceptions=True)
+
+    hedge_won = winner is not primary
+    if hedge_won:
+        tracker.hedge_wins += 1
+    tracker.latencies.append(time.monotonic() - start_time)
+    return winner.result(), {"hedged": hedged, "hedge_won": hedge_won}
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import socket
+from typing import Any, Awaitable, Callable, Optional, Set, Tuple
+import aiohttp
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+# Connection pool shared by every request from this process
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "100"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT_SECONDS = float(os.environ.get("HTTP_READ_TIMEOUT", "600"))
+
+# HTTP/2 multiplexes concurrent calls over a few connections (h2 comes with httpx[http2])
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "1") != "0"
+
+# Clients are bound to the event loop they were created on, so one is kept per loop
+_anthropic_client: Optional[Tuple[asyncio.AbstractEventLoop, AsyncAnthropic]] = None
+_http_session: Optional[Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = None
+_closing: Set["asyncio.Future[Any]"] = set()
+
+def _discard(loop: asyncio.AbstractEventLoop, close: Callable[[], Awaitable[Any]]):
+    """Close a client made for another event loop: on that loop while it still runs, else on this one"""
+    if loop.is_running() and loop is not asyncio.get_running_loop():
+        asyncio.run_coroutine_threadsafe(close(), loop)
+        return
+    closing = asyncio.ensure_future(close())
+    _closing.add(closing)
+    # Sockets of a loop that has already closed may fail to shut down cleanly; nothing is left to do then
+    closing.add_done_callback(lambda done: _closing.discard(done) or done.cancelled() or done.exception())
+
+def get_anthropic_client() -> AsyncAnthropic:
+    """The process-wide Anthropic client, created on first use with the tuned connection pool"""
+    global _anthropic_client
+    loop = asyncio.get_running_loop()
+    if _anthropic_client is None or _anthropic_client[0] is not loop:
+        if _anthropic_client is not None:
+            _discard(_anthropic_client[0], _anthropic_client[1].close)
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+        # The SDK's default transport ignores http2, so the transport is built here
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_ENABLED,
+            limits=limits,
+            socket_options=[(socket.SOL_SOCKET, socket.SO_KEEPALIVE, True)]
+        )
+        http_client = DefaultAsyncHttpxClient(
+            transport=transport,
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS)
+        )
+        _anthropic_client = (loop, AsyncAnthropic(http_client=http_client))
+    return _anthropic_client[1]
+
+def get_http_session() -> aiohttp.ClientSession:
+    """The process-wide aiohttp session for plain HTTP fetches (aiohttp speaks HTTP/1.1 only)"""
+    global _http_session
+    loop = asyncio.get_running_loop()
+    if _http_session is None or _http_session[0] is not loop or _http_session[1].closed:
+        if _http_session is not None and not _http_session[1].closed:
+            _discard(_http_session[0], _http_session[1].close)
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_MAX_CONNECTIONS,
+            keepalive_timeout=HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+        timeout = aiohttp.ClientTimeout(total=HTTP_READ_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS)
+        _http_session = (loop, aiohttp.ClientSession(connector=connector, timeout=timeout))
+    return _http_session[1]
@@ -0,0 +1,7 @@
+from agentuity import AgentContext
+
+async def delete_if_present(context: AgentContext, namespace: str, key: str):
+    """Delete a key if it exists; the KV store raises when deleting a missing key"""
+    result = await context.kv.get(namespace, key)
+    if result.data:
+        await context.kv.delete(namespace, key)
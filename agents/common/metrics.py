@@ -0,0 +1,80 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+# Upper bucket edges for the latency (seconds) and throughput (output tokens/sec) histograms
+LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 5, 10, 20, 30, 60]
+THROUGHPUT_BUCKETS = [10, 25, 50, 75, 100, 150, 200, 300]
+
+# Per-case fields rolled up into percentiles
+CASE_METRICS = ["request_seconds", "time_to_first_token", "output_tokens_per_second"]
+
+def percentile(values: Sequence[float], p: float) -> Optional[float]:
+    """The p-th percentile (0-100) of values, interpolating between closest ranks"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def histogram(values: Sequence[float], buckets: Sequence[float]) -> List[Dict[str, Any]]:
+    """Count values per bucket; each bucket holds values up to and including its "le" edge"""
+    edges = list(buckets) + [None]
+    counts = [0] * len(edges)
+    for value in values:
+        for i, edge in enumerate(edges):
+            if edge is None or value <= edge:
+                counts[i] += 1
+                break
+    return [{"le": edge if edge is not None else "inf", "count": count} for edge, count in zip(edges, counts)]
+
+def distribution(values: Sequence[float]) -> Dict[str, Any]:
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None
+    }
+
+def summarize_case_metrics(execution_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Latency, throughput and token roll-up for a run, overall and per model_key.
+
+    Only cases that actually called the model are counted; cache hits and
+    failures would otherwise skew the latency figures.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for case_result in execution_results:
+        if case_result.get("success") and not case_result.get("cache_hit") and "request_seconds" in case_result:
+            groups.setdefault("overall", []).append(case_result)
+            groups.setdefault(case_result.get("model_key", "default"), []).append(case_result)
+
+    summaries = {}
+    for group, case_results in groups.items():
+        summary = {}
+        for metric in CASE_METRICS:
+            values = [case_result[metric] for case_result in case_results if case_result.get(metric) is not None]
+            summary[metric] = distribution(values)
+        summary["latency_histogram"] = histogram(
+            [case_result["request_seconds"] for case_result in case_results], LATENCY_BUCKETS
+        )
+        summary["throughput_histogram"] = histogram(
+            [case_result["output_tokens_per_second"] for case_result in case_results
+             if case_result.get("output_tokens_per_second") is not None],
+            THROUGHPUT_BUCKETS
+        )
+        summary["tokens"] = {
+            key: sum(case_result.get("usage", {}).get(key, 0) for case_result in case_results)
+            for key in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+        }
+        summary["retries"] = sum(case_result.get("retries", 0) for case_result in case_results)
+        summary["hedged_calls"] = sum(1 for case_result in case_results if case_result.get("hedged"))
+        summary["hedge_wins"] = sum(1 for case_result in case_results if case_result.get("hedge_won"))
+        summaries[group] = summary
+
+    return {
+        "overall": summaries.pop("overall", None),
+        "per_model": summaries
+    }
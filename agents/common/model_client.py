@@ -0,0 +1,163 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from anthropic import AsyncAnthropic, APIStatusError
+from anthropic.types import Message
+from agents.common.hedging import HedgeConfig, get_latency_tracker, send_hedged
+from agents.common.rate_limiter import estimate_input_tokens, get_rate_limiter
+from agents.common.retry import (
+    MAX_ATTEMPTS,
+    ModelCallError,
+    backoff_delay,
+    get_circuit_breaker,
+    is_retryable,
+    retry_after_seconds
+)
+from agents.common.scheduler import get_scheduler
+
+async def create_message(
+    client: AsyncAnthropic,
+    hedging: Optional[HedgeConfig] = None,
+    call_kind: str = "default",
+    **params: Any
+) -> Tuple[Message, Dict[str, Any]]:
+    """Call messages.create paced by the shared per-model rate limiter.
+
+    Transient errors are retried with jittered exponential backoff behind a per-model
+    circuit breaker, and with hedging a slow attempt is raced against a duplicate.
+    call_kind (e.g. "execution", "judge") groups calls of similar length, so each
+    kind learns its own hedge delay. Returns the message together with call info
+    describing how the call was scheduled; raises ModelCallError once the call has
+    failed for good.
+    """
+    async def send(call_client: AsyncAnthropic) -> Tuple[Message, Any, Dict[str, Any]]:
+        raw_response = await call_client.messages.with_raw_response.create(**params)
+        return raw_response.parse(), raw_response.headers, {}
+    
+    return await _call_with_retries(client, params, send, hedging, call_kind)
+
+async def stream_message(
+    client: AsyncAnthropic,
+    hedging: Optional[HedgeConfig] = None,
+    call_kind: str = "default",
+    **params: Any
+) -> Tuple[Message, Dict[str, Any]]:
+    """Like create_message, but streams the response to time its first token.
+
+    Call info additionally carries request_seconds (the successful attempt only),
+    time_to_first_token and output_tokens_per_second measured after the first token.
+    """
+    async def send(call_client: AsyncAnthropic) -> Tuple[Message, Any, Dict[str, Any]]:
+        start_time = time.perf_counter()
+        first_token_time = None
+        async with call_client.messages.stream(**params) as stream:
+            async for event in stream:
+                if first_token_time is None and event.type == "content_block_delta":
+                    first_token_time = time.perf_counter()
+            message = await stream.get_final_message()
+            headers = stream.response.headers
+        end_time = time.perf_counter()
+        
+        first_token_time = first_token_time or end_time
+        generation_seconds = end_time - first_token_time
+        return message, headers, {
+            "request_seconds": end_time - start_time,
+            "time_to_first_token": first_token_time - start_time,
+            "output_tokens_per_second": message.usage.output_tokens / generation_seconds if generation_seconds > 0 else None
+        }
+    
+    return await _call_with_retries(client, params, send, hedging, call_kind)
+
+async def _call_with_retries(
+    client: AsyncAnthropic,
+    params: Dict[str, Any],
+    send: Callable[[AsyncAnthropic], Awaitable[Tuple[Message, Any, Dict[str, Any]]]],
+    hedging: Optional[HedgeConfig],
+    call_kind: str = "default"
+) -> Tuple[Message, Dict[str, Any]]:
+    limiter = get_rate_limiter(params["model"])
+    breaker = get_circuit_breaker(params["model"])
+    latency_tracker = get_latency_tracker(params["model"], call_kind)
+    estimated_input = estimate_input_tokens(params)
+    estimated_output = params["max_tokens"]
+    
+    # Retries are handled here, so the SDK's own retry loop is disabled
+    call_client = client.with_options(max_retries=0)
+    scheduler = get_scheduler()
+    
+    async def send_hedge() -> Tuple[Message, Any, Dict[str, Any]]:
+        # A hedge is a real extra request, so it pays rate limit budget too
+        await limiter.acquire(estimated_input, estimated_output)
+        return await send(call_client)
+    
+    def start_hedge() -> Optional["asyncio.Future[Tuple[Message, Any, Dict[str, Any]]]"]:
+        # A hedge also needs its own scheduler slot; it is skipped rather than queued when none is free
+        queue = scheduler.try_acquire()
+        if queue is None:
+            return None
+        hedge = asyncio.ensure_future(send_hedge())
+        # Released on completion or cancellation, even if the hedge never got to start
+        hedge.add_done_callback(lambda _: scheduler.release(queue))
+        return hedge
+    
+    rate_limit_wait = 0.0
+    circuit_wait = 0.0
+    attempt = 0
+    
+    while True:
+        attempt += 1
+        circuit_wait += await breaker.before_call()
+        probing = breaker.state == "half_open"
+        
+        try:
+            # Each attempt waits for a fair-share slot, then for rate limit budget
+            async with scheduler.slot():
+                rate_limit_wait += await limiter.acquire(estimated_input, estimated_output)
+                (message, headers, timing), hedge_info = await send_hedged(
+                    lambda: send(call_client), start_hedge, latency_tracker, hedging
+                )
+        except asyncio.CancelledError:
+            # A cancelled probe has no outcome; free the circuit for the next caller
+            if probing:
+                breaker.release_probe()
+            raise
+        except Exception as e:
+            # Rejected calls still carry the current limits; nothing was generated
+            if isinstance(e, APIStatusError):
+                limiter.update_from_headers(e.response.headers)
+            limiter.reconcile(estimated_input, estimated_output, estimated_input, 0)
+            
+            retryable = is_retryable(e)
+            if retryable:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            
+            if not retryable or attempt >= MAX_ATTEMPTS:
+                raise ModelCallError(str(e), attempt, retryable) from e
+            
+            await asyncio.sleep(backoff_delay(attempt, retry_after_seconds(e)))
+            continue
+        
+        breaker.record_success()
+        limiter.update_from_headers(headers)
+        limiter.reconcile(estimated_input, estimated_output, message.usage.input_tokens, message.usage.output_tokens)
+        
+        return message, {
+            "attempts": attempt,
+            "retries": attempt - 1,
+            "rate_limit_wait": rate_limit_wait,
+            "circuit_wait": circuit_wait,
+            "estimated_input_tokens": estimated_input,
+            **hedge_info,
+            **timing
+        }
+
+def usage_to_dict(usage: Any) -> Dict[str, int]:
+    """Token usage of a message, including prompt cache reads and writes"""
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0
+    }
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+# Budgets used until the API reports real limits in its response headers
+DEFAULT_REQUESTS_PER_MINUTE = int(os.environ.get("ANTHROPIC_RPM_LIMIT", "50"))
+DEFAULT_INPUT_TOKENS_PER_MINUTE = int(os.environ.get("ANTHROPIC_INPUT_TPM_LIMIT", "50000"))
+DEFAULT_OUTPUT_TOKENS_PER_MINUTE = int(os.environ.get("ANTHROPIC_OUTPUT_TPM_LIMIT", "10000"))
+
+# Rough characters-per-token ratio used to estimate prompt size before dispatch
+CHARS_PER_TOKEN = 4
+
+class TokenBucket:
+    """Token bucket that refills continuously to its per-minute capacity"""
+
+    def __init__(self, capacity_per_minute: int):
+        self.capacity = float(capacity_per_minute)
+        self.tokens = float(capacity_per_minute)
+        self.updated_at = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.capacity / 60.0)
+        self.updated_at = now
+
+    def seconds_until(self, amount: float) -> float:
+        """Seconds until amount tokens are available (amounts above capacity wait for a full bucket)"""
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60.0 / self.capacity
+
+    def consume(self, amount: float):
+        self.tokens -= amount
+
+    def sync(self, limit: Optional[int], remaining: Optional[int]):
+        """Align the bucket with limit/remaining values reported by the API"""
+        self.refill()
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            # Trust the API when it has less budget left than we think
+            self.tokens = min(self.tokens, float(remaining))
+        self.tokens = min(self.tokens, self.capacity)
+
+class RateLimiter:
+    """Paces model calls against requests, input token and output token per-minute budgets"""
+
+    def __init__(
+        self,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        input_tokens_per_minute: int = DEFAULT_INPUT_TOKENS_PER_MINUTE,
+        output_tokens_per_minute: int = DEFAULT_OUTPUT_TOKENS_PER_MINUTE
+    ):
+        self.buckets = {
+            "requests": TokenBucket(requests_per_minute),
+            "input_tokens": TokenBucket(input_tokens_per_minute),
+            "output_tokens": TokenBucket(output_tokens_per_minute)
+        }
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, input_tokens: int, output_tokens: int) -> float:
+        """Wait until one request with the given token estimates fits the budget.
+
+        Waiters are served in arrival order. Returns the number of seconds spent waiting.
+        """
+        needed = {"requests": 1, "input_tokens": input_tokens, "output_tokens": output_tokens}
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                wait = 0.0
+                for name, bucket in self.buckets.items():
+                    bucket.refill()
+                    wait = max(wait, bucket.seconds_until(needed[name]))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            for name, bucket in self.buckets.items():
+                bucket.consume(min(needed[name], bucket.capacity))
+        return time.monotonic() - started
+
+    def reconcile(self, estimated_input: int, estimated_output: int, actual_input: int, actual_output: int):
+        """Correct the buckets once the real usage of a call is known"""
+        self.buckets["input_tokens"].consume(actual_input - estimated_input)
+        self.buckets["output_tokens"].consume(actual_output - estimated_output)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Update limits and remaining budget from anthropic-ratelimit-* response headers"""
+        for name, bucket in self.buckets.items():
+            prefix = f"anthropic-ratelimit-{name.replace('_', '-')}"
+            limit = _parse_int(headers.get(f"{prefix}-limit"))
+            remaining = _parse_int(headers.get(f"{prefix}-remaining"))
+            if limit is not None or remaining is not None:
+                bucket.sync(limit, remaining)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current capacity and available tokens per budget, for logging and metadata"""
+        result = {}
+        for name, bucket in self.buckets.items():
+            bucket.refill()
+            result[name] = {"limit": bucket.capacity, "available": round(bucket.tokens, 1)}
+        return result
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+def get_rate_limiter(model_name: str) -> RateLimiter:
+    """Return the process-wide rate limiter for a model (the API enforces limits per model)"""
+    if model_name not in _rate_limiters:
+        _rate_limiters[model_name] = RateLimiter()
+    return _rate_limiters[model_name]
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a piece of text"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def estimate_input_tokens(params: Dict[str, Any]) -> int:
+    """Estimate the input tokens of a messages.create request from its system prompt and messages"""
+    total = 0
+    system = params.get("system")
+    if system:
+        total += sum(estimate_tokens(text) for text in _iter_text(system))
+    for message in params.get("messages", []):
+        total += sum(estimate_tokens(text) for text in _iter_text(message.get("content", "")))
+    return total
+
+def _iter_text(content: Any) -> Iterable[str]:
+    if isinstance(content, str):
+        yield content
+    elif isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict) and isinstance(block.get("text"), str):
+                yield block["text"]
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from agentuity import AgentContext
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# KV namespace holding the persistent tier
+RESPONSE_CACHE_NAMESPACE = "eval_response_cache"
+
+CACHE_POLICIES = ("use", "refresh", "bypass")
+
+def response_cache_key(params: Dict[str, Any]) -> str:
+    """Content hash of the request fields that determine a completion"""
+    keyed = {
+        "model": params.get("model"),
+        "max_tokens": params.get("max_tokens"),
+        "temperature": params.get("temperature"),
+        "system": params.get("system"),
+        "messages": params.get("messages")
+    }
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True).encode("utf-8")).hexdigest()
+
+class LRUCache:
+    """In-memory LRU bounded by entry count and total size, with per-entry expiry"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float, size: int):
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.time() + ttl, size, value)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+class ResponseCache:
+    """Two-tier cache: process-local LRU in front of the persistent KV store"""
+
+    def __init__(
+        self,
+        namespace: str = RESPONSE_CACHE_NAMESPACE,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        ttl: int = RESPONSE_CACHE_TTL_SECONDS
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.memory = LRUCache(max_entries, max_bytes)
+
+    async def get(self, key: str, context: AgentContext) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Look a key up in memory, then in KV. Returns the value and the tier that served it."""
+        value = self.memory.get(key)
+        if value is not None:
+            return value, "memory"
+        
+        try:
+            kv_result = await context.kv.get(self.namespace, key)
+            if not kv_result.data:
+                return None, None
+            value = await kv_result.data.json()
+        except Exception as e:
+            context.logger.warning("Response cache read failed for %s: %s", key, str(e))
+            return None, None
+        
+        if value.get("expires_at", 0) <= time.time():
+            return None, None
+        
+        # Promote to memory for the rest of its lifetime
+        self.memory.set(key, value, value["expires_at"] - time.time(), len(json.dumps(value)))
+        return value, "kv"
+
+    async def set(self, key: str, value: Dict[str, Any], context: AgentContext):
+        value = dict(value, expires_at=time.time() + self.ttl)
+        self.memory.set(key, value, self.ttl, len(json.dumps(value)))
+        try:
+            await context.kv.set(self.namespace, key, value, {"ttl": self.ttl})
+        except Exception as e:
+            # The in-memory tier still serves this process
+            context.logger.warning("Response cache write failed for %s: %s", key, str(e))
+
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide model response cache"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+class CacheSession:
+    """Applies one run's cache policy to the shared cache and counts hits and misses.
+
+    Policies: "use" reads and writes, "refresh" skips reads but stores fresh responses,
+    "bypass" does neither. Only temperature 0 calls are cached unless
+    cache_nondeterministic is set. Subclasses cache other requests by overriding
+    cache_key() and is_cacheable().
+    """
+
+    # The evaluation setting that selects the policy
+    policy_setting = "cache_policy"
+
+    def __init__(self, policy: str = "use", cache_nondeterministic: bool = False, cache: Optional[ResponseCache] = None):
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown {self.policy_setting} '{policy}', expected one of: {', '.join(CACHE_POLICIES)}")
+        self.policy = policy
+        self.cache_nondeterministic = cache_nondeterministic
+        self.cache = cache or get_response_cache()
+        self.stats = {"memory_hits": 0, "kv_hits": 0, "misses": 0, "writes": 0, "uncacheable": 0}
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "CacheSession":
+        return cls(settings.get("cache_policy", "use"), bool(settings.get("cache_nondeterministic", False)))
+
+    def cache_key(self, params: Dict[str, Any]) -> str:
+        return response_cache_key(params)
+
+    def is_cacheable(self, params: Dict[str, Any]) -> bool:
+        if self.policy == "bypass":
+            return False
+        return self.cache_nondeterministic or params.get("temperature", 1.0) == 0
+
+    async def lookup(self, params: Dict[str, Any], context: AgentContext) -> Optional[Dict[str, Any]]:
+        if not self.is_cacheable(params):
+            self.stats["uncacheable"] += 1
+            return None
+        if self.policy == "refresh":
+            self.stats["misses"] += 1
+            return None
+        value, tier = await self.cache.get(self.cache_key(params), context)
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats[f"{tier}_hits"] += 1
+        return value
+
+    async def store(self, params: Dict[str, Any], value: Dict[str, Any], context: AgentContext):
+        if not self.is_cacheable(params):
+            return
+        await self.cache.set(self.cache_key(params), value, context)
+        self.stats["writes"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["kv_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            "policy": self.policy,
+            "hits": hits,
+            **self.stats,
+            "hit_rate": hits / lookups if lookups > 0 else 0
+        }
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Dict, Optional
+from anthropic import APIConnectionError, APIStatusError, APITimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Total attempts per model call, including the first one
+MAX_ATTEMPTS = int(os.environ.get("MODEL_CALL_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE_SECONDS = float(os.environ.get("MODEL_CALL_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX_SECONDS = float(os.environ.get("MODEL_CALL_BACKOFF_MAX", "60.0"))
+
+# Consecutive transient failures that open the circuit, and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("MODEL_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_COOLDOWN_SECONDS = float(os.environ.get("MODEL_CIRCUIT_COOLDOWN", "30.0"))
+CIRCUIT_MAX_COOLDOWN_SECONDS = float(os.environ.get("MODEL_CIRCUIT_MAX_COOLDOWN", "300.0"))
+
+# Status codes worth retrying: timeouts, conflicts, rate limits, overload and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 529}
+
+class ModelCallError(Exception):
+    """Raised when a model call fails for good, recording how many attempts were made"""
+
+    def __init__(self, message: str, attempts: int, retryable: bool):
+        super().__init__(message)
+        self.attempts = attempts
+        self.retryable = retryable
+
+def is_retryable(error: Exception) -> bool:
+    """Transient errors (timeouts, connection drops, 429/529/5xx) are retried; other 4xx are not"""
+    if isinstance(error, (APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server-requested delay from retry-after-ms or retry-after headers"""
+    if not isinstance(error, APIStatusError):
+        return None
+    headers = error.response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter, never shorter than a server-requested retry-after"""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+class CircuitBreaker:
+    """Stops all callers of a model while it is failing, instead of letting each call fail.
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive transient failures the circuit opens and
+    every caller waits out the cooldown. A single probe call is then let through; if it
+    succeeds the circuit closes, otherwise it reopens with a doubled cooldown.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN_SECONDS,
+        max_cooldown: float = CIRCUIT_MAX_COOLDOWN_SECONDS
+    ):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+
+    async def before_call(self) -> float:
+        """Wait until a call is allowed. Returns the number of seconds spent paused."""
+        started = time.monotonic()
+        while True:
+            if self.state == "closed":
+                break
+            if self.state == "open":
+                remaining = self.open_until - time.monotonic()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+                    continue
+                self.state = "half_open"
+                self.probe_in_flight = False
+            if not self.probe_in_flight:
+                self.probe_in_flight = True
+                break
+            # Another caller is probing; wait for its outcome
+            await asyncio.sleep(min(1.0, self.base_cooldown))
+        return time.monotonic() - started
+
+    def release_probe(self):
+        """Let another caller probe when the probe call ended without an outcome, e.g. it was cancelled"""
+        if self.state == "half_open":
+            self.probe_in_flight = False
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info("Circuit closed after successful probe")
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.cooldown = self.base_cooldown
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open":
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif self.state == "closed" and self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.open_until = time.monotonic() + self.cooldown
+        self.probe_in_flight = False
+        logger.warning("Circuit opened after %d consecutive failures; pausing calls for %.0fs",
+                       self.consecutive_failures, self.cooldown)
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_circuit_breaker(model_name: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for a model"""
+    if model_name not in _circuit_breakers:
+        _circuit_breakers[model_name] = CircuitBreaker()
+    return _circuit_breakers[model_name]
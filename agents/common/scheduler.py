@@ -0,0 +1,187 @@
+import asyncio
+import contextvars
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+from agents.common.concurrency import GLOBAL_MAX_CONCURRENCY
+
+# Lower rank is served first; a class only gets slots while no higher class is waiting
+PRIORITY_CLASSES = {"interactive": 0, "normal": 1, "batch": 2}
+DEFAULT_PRIORITY = "normal"
+
+# Evaluations idle this long are dropped from the scheduler's statistics
+SCHEDULER_IDLE_SECONDS = float(os.environ.get("SCHEDULER_IDLE_SECONDS", "600"))
+
+class DispatchContext:
+    """Who a model call is made for: the evaluation, its priority class and its fair-share weight"""
+
+    def __init__(self, evaluation_id: str, priority: str = DEFAULT_PRIORITY, weight: float = 1.0):
+        self.evaluation_id = evaluation_id
+        self.priority = priority if priority in PRIORITY_CLASSES else DEFAULT_PRIORITY
+        self.weight = max(0.01, float(weight))
+
+_dispatch_context: contextvars.ContextVar[Optional[DispatchContext]] = contextvars.ContextVar(
+    "dispatch_context", default=None
+)
+
+def set_dispatch_context(evaluation_id: str, settings: Dict[str, Any]) -> DispatchContext:
+    """Attribute model calls made from the current task (and tasks it starts) to an evaluation"""
+    dispatch_context = DispatchContext(
+        evaluation_id, settings.get("priority", DEFAULT_PRIORITY), settings.get("scheduling_weight", 1.0)
+    )
+    _dispatch_context.set(dispatch_context)
+    return dispatch_context
+
+class EvaluationQueue:
+    def __init__(self, dispatch_context: DispatchContext):
+        self.evaluation_id = dispatch_context.evaluation_id
+        self.priority = dispatch_context.priority
+        self.weight = dispatch_context.weight
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.virtual_time = 0.0
+        self.in_flight = 0
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_active = time.monotonic()
+
+    @property
+    def rank(self) -> int:
+        return PRIORITY_CLASSES[self.priority]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "priority": self.priority,
+            "weight": self.weight,
+            "queue_depth": len(self.waiters),
+            "in_flight": self.in_flight,
+            "granted": self.granted,
+            "average_wait_seconds": self.total_wait / self.granted if self.granted else 0.0,
+            "max_wait_seconds": self.max_wait
+        }
+
+class FairScheduler:
+    """Shares a fixed number of model-call slots between concurrent evaluations.
+
+    Waiting calls are queued per evaluation. When a slot frees up it goes to the
+    highest priority class with waiters and, within that class, to the evaluation
+    with the lowest virtual time; each grant advances an evaluation's virtual time
+    by 1/weight, so over time evaluations get slots in proportion to their weight.
+    An evaluation that goes idle does not bank credit: when it becomes active
+    again it starts no earlier than the class's current virtual time.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self.in_flight = 0
+        self.queues: Dict[str, EvaluationQueue] = {}
+        self.virtual_clock = {priority: 0.0 for priority in PRIORITY_CLASSES}
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of one model call"""
+        dispatch_context = _dispatch_context.get() or DispatchContext("unattributed")
+        queue = self._queue_for(dispatch_context)
+        enqueued_at = time.monotonic()
+
+        if self.in_flight < self.slots and not any(q.waiters for q in self.queues.values()):
+            self._grant(queue)
+        else:
+            if not queue.waiters and queue.in_flight == 0:
+                queue.virtual_time = max(queue.virtual_time, self.virtual_clock[queue.priority])
+            waiter = asyncio.get_running_loop().create_future()
+            queue.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in queue.waiters:
+                    queue.waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # The slot was granted just as we were cancelled; hand it on
+                    self._release(queue)
+                raise
+
+        wait = time.monotonic() - enqueued_at
+        queue.total_wait += wait
+        queue.max_wait = max(queue.max_wait, wait)
+        try:
+            yield
+        finally:
+            self._release(queue)
+
+    def try_acquire(self) -> Optional[EvaluationQueue]:
+        """Take a slot only if one is free and no call is waiting for one, else return None.
+
+        For optional extra calls such as hedges, which must never delay a queued
+        call. The slot counts towards the evaluation's fair share; pair with release().
+        """
+        if self.in_flight >= self.slots or any(queue.waiters for queue in self.queues.values()):
+            return None
+        queue = self._queue_for(_dispatch_context.get() or DispatchContext("unattributed"))
+        self._grant(queue)
+        return queue
+
+    def release(self, queue: EvaluationQueue):
+        self._release(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "in_flight": self.in_flight,
+            "queue_depth": sum(len(queue.waiters) for queue in self.queues.values()),
+            "evaluations": {evaluation_id: queue.snapshot() for evaluation_id, queue in self.queues.items()}
+        }
+
+    def stats_for(self, evaluation_id: str) -> Optional[Dict[str, Any]]:
+        queue = self.queues.get(evaluation_id)
+        return queue.snapshot() if queue else None
+
+    def _queue_for(self, dispatch_context: DispatchContext) -> EvaluationQueue:
+        self._prune_idle()
+        queue = self.queues.get(dispatch_context.evaluation_id)
+        if queue is None:
+            queue = self.queues[dispatch_context.evaluation_id] = EvaluationQueue(dispatch_context)
+            queue.virtual_time = self.virtual_clock[queue.priority]
+        # The latest settings for an evaluation win, e.g. when the judge runs after the runner
+        queue.priority = dispatch_context.priority
+        queue.weight = dispatch_context.weight
+        queue.last_active = time.monotonic()
+        return queue
+
+    def _grant(self, queue: EvaluationQueue):
+        self.in_flight += 1
+        queue.in_flight += 1
+        queue.granted += 1
+        self.virtual_clock[queue.priority] = max(self.virtual_clock[queue.priority], queue.virtual_time)
+        queue.virtual_time += 1.0 / queue.weight
+
+    def _release(self, queue: EvaluationQueue):
+        self.in_flight -= 1
+        queue.in_flight -= 1
+        queue.last_active = time.monotonic()
+        while self.in_flight < self.slots:
+            waiting = [q for q in self.queues.values() if q.waiters]
+            if not waiting:
+                return
+            next_queue = min(waiting, key=lambda q: (q.rank, q.virtual_time))
+            self._grant(next_queue)
+            next_queue.waiters.popleft().set_result(None)
+
+    def _prune_idle(self):
+        cutoff = time.monotonic() - SCHEDULER_IDLE_SECONDS
+        for evaluation_id in [
+            evaluation_id for evaluation_id, queue in self.queues.items()
+            if not queue.waiters and queue.in_flight == 0 and queue.last_active < cutoff
+        ]:
+            del self.queues[evaluation_id]
+
+_scheduler: Optional[FairScheduler] = None
+
+def get_scheduler() -> FairScheduler:
+    """The process-wide scheduler, with GLOBAL_MAX_CONCURRENCY slots"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FairScheduler(GLOBAL_MAX_CONCURRENCY)
+    return _scheduler
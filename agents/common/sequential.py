@@ -0,0 +1,113 @@
+import math
+import random
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_MIN_CASES = 30
+
+class SequentialEstimator:
+    """Running mean and confidence interval of similarity scores, for early stopping.
+
+    Scores are folded in one at a time (Welford's algorithm). Once at least
+    min_cases have been seen, decision() reports "above" or "below" when the
+    interval clears average_threshold, or "precise" when it is narrower than
+    max_interval_width. Checking after every case inflates the error rate a
+    little, which min_cases and a conservative confidence level keep in check.
+    The first decision is final: scores from calls still in flight when it was
+    reached are folded in, but reported as collected after the decision.
+    """
+
+    def __init__(
+        self,
+        average_threshold: Optional[float] = None,
+        max_interval_width: Optional[float] = None,
+        confidence: float = DEFAULT_CONFIDENCE,
+        min_cases: int = DEFAULT_MIN_CASES
+    ):
+        if average_threshold is None and max_interval_width is None:
+            raise ValueError("early_stopping needs average_threshold and/or max_interval_width")
+        self.average_threshold = average_threshold
+        self.max_interval_width = max_interval_width
+        self.confidence = confidence
+        self.min_cases = max(2, min_cases)
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._decision: Optional[str] = None
+        self.decision_count = 0
+        self.decision_interval: Optional[Tuple[float, float]] = None
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> Optional["SequentialEstimator"]:
+        """Build an estimator from evaluation_settings.early_stopping, or None when it is off"""
+        config = settings.get("early_stopping")
+        if not config or not config.get("enabled", True):
+            return None
+        return cls(
+            config.get("average_threshold"),
+            config.get("max_interval_width"),
+            float(config.get("confidence", DEFAULT_CONFIDENCE)),
+            int(config.get("min_cases", DEFAULT_MIN_CASES))
+        )
+
+    def add(self, score: float):
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (score - self.mean)
+        if self._decision is None:
+            self._decision = self._evaluate()
+            if self._decision is not None:
+                self.decision_count = self.count
+                self.decision_interval = self.interval()
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def interval(self) -> Tuple[float, float]:
+        if self.count < 2:
+            return (0.0, 100.0)
+        half_width = self.z * math.sqrt(self.variance / self.count)
+        return (self.mean - half_width, self.mean + half_width)
+
+    def decision(self) -> Optional[str]:
+        return self._decision
+
+    def _evaluate(self) -> Optional[str]:
+        if self.count < self.min_cases:
+            return None
+        low, high = self.interval()
+        if self.average_threshold is not None:
+            if low > self.average_threshold:
+                return "above"
+            if high < self.average_threshold:
+                return "below"
+        if self.max_interval_width is not None and high - low <= self.max_interval_width:
+            return "precise"
+        return None
+
+    def summary(self, cases_available: int) -> Dict[str, Any]:
+        low, high = self.interval()
+        return {
+            "decision": self._decision or "exhausted",
+            "cases_spent": self.count,
+            "cases_at_decision": self.decision_count if self._decision else None,
+            "cases_after_decision": self.count - self.decision_count if self._decision else 0,
+            "decision_interval": list(self.decision_interval) if self.decision_interval else None,
+            "cases_available": cases_available,
+            "mean": self.mean,
+            "interval_low": low,
+            "interval_high": high,
+            "confidence": self.confidence,
+            "average_threshold": self.average_threshold,
+            "max_interval_width": self.max_interval_width
+        }
+
+def shuffled(items: List[Any], seed: Optional[int] = None) -> List[Any]:
+    """Return items in random order, so an early stop sees an unbiased sample"""
+    items = list(items)
+    random.Random(seed).shuffle(items)
+    return items
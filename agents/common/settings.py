@@ -0,0 +1,7 @@
+from typing import Any, Dict, Optional
+
+def get_run_settings(data: Dict[str, Any], metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge evaluation settings stored at load time with any overrides sent in the request"""
+    settings = dict((metadata or {}).get("evaluation_settings") or {})
+    settings.update(data.get("evaluation_settings") or {})
+    return settings
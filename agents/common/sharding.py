@@ -0,0 +1,196 @@
+import asyncio
+import os
+import random
+import socket
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from agentuity import AgentContext
+from agents.common.kv import delete_if_present
+
+DEFAULT_SHARD_SIZE = int(os.environ.get("EVAL_SHARD_SIZE", "100"))
+DEFAULT_LEASE_SECONDS = float(os.environ.get("EVAL_SHARD_LEASE_SECONDS", "120"))
+DEFAULT_SHARD_POLL_SECONDS = float(os.environ.get("EVAL_SHARD_POLL_SECONDS", "5"))
+
+SHARD_NAMESPACE = "eval_shards"
+
+def manifest_key(evaluation_id: str) -> str:
+    return f"eval_run_{evaluation_id}_shards"
+
+def shard_key(evaluation_id: str, shard_number: int) -> str:
+    return f"eval_run_{evaluation_id}_shard_{shard_number}"
+
+def lease_key(evaluation_id: str, shard_number: int) -> str:
+    return f"eval_run_{evaluation_id}_shard_{shard_number}_lease"
+
+def shard_result_key(evaluation_id: str, shard_number: int) -> str:
+    return f"eval_run_{evaluation_id}_shard_{shard_number}_result"
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+async def _get_json(context: AgentContext, key: str) -> Optional[Dict[str, Any]]:
+    result = await context.kv.get(SHARD_NAMESPACE, key)
+    return await result.data.json() if result.data else None
+
+async def _delete(context: AgentContext, key: str):
+    await delete_if_present(context, SHARD_NAMESPACE, key)
+
+async def publish_shards(
+    evaluation_id: str,
+    processed_cases: List[Dict[str, Any]],
+    shard_size: int,
+    context: AgentContext
+) -> Dict[str, Any]:
+    """Split processed cases into shards in the KV store for runner workers to claim"""
+    shard_size = max(1, shard_size)
+    shard_count = (len(processed_cases) + shard_size - 1) // shard_size
+
+    for shard_number in range(shard_count):
+        await context.kv.set(SHARD_NAMESPACE, shard_key(evaluation_id, shard_number), {
+            "evaluation_id": evaluation_id,
+            "shard_number": shard_number,
+            "processed_cases": processed_cases[shard_number * shard_size:(shard_number + 1) * shard_size]
+        })
+        # Clear anything left over from an earlier run of the same evaluation
+        await _delete(context, lease_key(evaluation_id, shard_number))
+        await _delete(context, shard_result_key(evaluation_id, shard_number))
+
+    manifest = {
+        "evaluation_id": evaluation_id,
+        "shard_count": shard_count,
+        "shard_size": shard_size,
+        "total_cases": len(processed_cases)
+    }
+    await context.kv.set(SHARD_NAMESPACE, manifest_key(evaluation_id), manifest)
+    context.logger.info("Published %d shards of up to %d cases for evaluation: %s", shard_count, shard_size, evaluation_id)
+    return manifest
+
+async def load_manifest(evaluation_id: str, context: AgentContext) -> Optional[Dict[str, Any]]:
+    return await _get_json(context, manifest_key(evaluation_id))
+
+class ShardQueue:
+    """Claims shards of one evaluation for a worker, using leases in the KV store.
+
+    A shard is claimable while it has no result and no live lease. Leases expire
+    lease_seconds after their last heartbeat, so a shard held by a worker that
+    died is picked up again by the next claim(). The KV store has no atomic
+    compare-and-set, so a claim is confirmed by reading the lease back after a
+    short jittered pause; in the rare case two workers still both run a shard,
+    results are keyed by case_id and the duplicate is harmless.
+    """
+
+    def __init__(
+        self,
+        evaluation_id: str,
+        shard_count: int,
+        context: AgentContext,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS
+    ):
+        self.evaluation_id = evaluation_id
+        self.shard_count = shard_count
+        self.context = context
+        self.worker_id = worker_id or new_worker_id()
+        self.lease_seconds = lease_seconds
+
+    async def claim(self) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """Lease the next available shard, returning its number and cases, or None if none is free"""
+        # Start at a random shard so concurrent workers rarely contend for the same one
+        offset = random.randrange(self.shard_count) if self.shard_count else 0
+        for i in range(self.shard_count):
+            shard_number = (offset + i) % self.shard_count
+            if await _get_json(self.context, shard_result_key(self.evaluation_id, shard_number)):
+                continue
+
+            lease = await _get_json(self.context, lease_key(self.evaluation_id, shard_number))
+            if lease and lease["expires_at"] > time.time():
+                continue
+            if lease:
+                self.context.logger.warning("Re-queueing shard %d of %s: lease held by %s expired",
+                                          shard_number, self.evaluation_id, lease["worker_id"])
+
+            await self._write_lease(shard_number)
+            await asyncio.sleep(random.uniform(0.05, 0.25))
+            lease = await _get_json(self.context, lease_key(self.evaluation_id, shard_number))
+            if not lease or lease["worker_id"] != self.worker_id:
+                continue
+
+            shard = await _get_json(self.context, shard_key(self.evaluation_id, shard_number))
+            self.context.logger.info("Worker %s claimed shard %d of %s", self.worker_id, shard_number, self.evaluation_id)
+            return shard_number, shard["processed_cases"]
+        return None
+
+    async def heartbeat(self, shard_number: int) -> bool:
+        """Extend our lease; False if another worker has taken the shard over"""
+        lease = await _get_json(self.context, lease_key(self.evaluation_id, shard_number))
+        if lease and lease["worker_id"] != self.worker_id:
+            self.context.logger.warning("Worker %s lost the lease on shard %d of %s to %s",
+                                      self.worker_id, shard_number, self.evaluation_id, lease["worker_id"])
+            return False
+        await self._write_lease(shard_number)
+        return True
+
+    async def keep_alive(self, shard_number: int):
+        """Heartbeat until cancelled; run as a task while the shard is being executed"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await self.heartbeat(shard_number):
+                return
+
+    async def complete(self, shard_number: int, execution_results: List[Dict[str, Any]]) -> bool:
+        """Store a shard's results and release its lease; False if the evaluation was cleared meanwhile"""
+        # Once the coordinator has merged and cleared the run, a late result would only orphan keys
+        if await load_manifest(self.evaluation_id, self.context) is None:
+            self.context.logger.warning("Dropping results of shard %d of %s: the evaluation has already been cleared",
+                                      shard_number, self.evaluation_id)
+            return False
+        await self.context.kv.set(SHARD_NAMESPACE, shard_result_key(self.evaluation_id, shard_number), {
+            "evaluation_id": self.evaluation_id,
+            "shard_number": shard_number,
+            "worker_id": self.worker_id,
+            "execution_results": execution_results
+        })
+        await _delete(self.context, lease_key(self.evaluation_id, shard_number))
+        return True
+
+    async def progress(self) -> Dict[str, Any]:
+        """Completed, leased and pending shard counts"""
+        completed = leased = 0
+        for shard_number in range(self.shard_count):
+            if await _get_json(self.context, shard_result_key(self.evaluation_id, shard_number)):
+                completed += 1
+                continue
+            lease = await _get_json(self.context, lease_key(self.evaluation_id, shard_number))
+            if lease and lease["expires_at"] > time.time():
+                leased += 1
+        return {
+            "shard_count": self.shard_count,
+            "completed": completed,
+            "leased": leased,
+            "pending": self.shard_count - completed - leased
+        }
+
+    async def collect(self) -> Dict[str, Dict[str, Any]]:
+        """All shard results keyed by case_id"""
+        results = {}
+        for shard_number in range(self.shard_count):
+            shard_result = await _get_json(self.context, shard_result_key(self.evaluation_id, shard_number))
+            for case_result in (shard_result or {}).get("execution_results", []):
+                results[case_result["case_id"]] = case_result
+        return results
+
+    async def clear(self):
+        """Remove shards, leases and shard results once the merged results are stored"""
+        for shard_number in range(self.shard_count):
+            for key in (shard_key, lease_key, shard_result_key):
+                await _delete(self.context, key(self.evaluation_id, shard_number))
+        await _delete(self.context, manifest_key(self.evaluation_id))
+
+    async def _write_lease(self, shard_number: int):
+        now = time.time()
+        await self.context.kv.set(SHARD_NAMESPACE, lease_key(self.evaluation_id, shard_number), {
+            "worker_id": self.worker_id,
+            "heartbeat_at": now,
+            "expires_at": now + self.lease_seconds
+        })
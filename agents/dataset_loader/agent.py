@@ -1,8 +1,8 @@
 from agentuity import AgentRequest, AgentResponse, AgentContext
 import json
 import os
-import aiohttp
 from typing import List, Dict, Any
+from agents.common.http_clients import get_http_session
 
 # {
 #   "evaluation_id": "sentiment_classification_eval_002", 
@@ -86,6 +86,8 @@ async def run(request: AgentRequest, response: AgentResponse, context: AgentCont
         evaluation_id = data.get("evaluation_id")
         dataset_format = data.get("format", "query_response_pairs")
         prompt_template = data.get("prompt_template")
+        evaluation_settings = data.get("evaluation_settings", {})
+        model_configs = data.get("model_configs") or ([data["model_config"]] if data.get("model_config") else [])
         
         # Validate input - need either path, URL, or inline JSON
         if not evaluation_id:
@@ -157,7 +159,10 @@ async def run(request: AgentRequest, response: AgentResponse, context: AgentCont
             "total_cases": len(dataset),
             "source": source_info,
             "format": dataset_format,
-            "template_variables": prompt_template.get("variables", [])
+            "template_variables": prompt_template.get("variables", []),
+            "evaluation_settings": evaluation_settings,
+            "model_configs": model_configs,
+            "model_name": ", ".join(config.get("model_name", "") for config in model_configs) or None
         })
         
         # Update evaluation registry for Results API
@@ -203,13 +208,12 @@ async def load_local_dataset(dataset_path: str) -> tuple[List[Dict[str, Any]], D
 
 async def load_remote_dataset(dataset_url: str) -> tuple[List[Dict[str, Any]], Dict[str, str]]:
     """Load dataset from external URL"""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(dataset_url) as response:
-            if response.status != 200:
-                raise Exception(f"Failed to fetch dataset from URL: {dataset_url} (status: {response.status})")
-            
-            content = await response.text()
-            dataset = json.loads(content)
+    async with get_http_session().get(dataset_url) as response:
+        if response.status != 200:
+            raise Exception(f"Failed to fetch dataset from URL: {dataset_url} (status: {response.status})")
+        
+        content = await response.text()
+        dataset = json.loads(content)
     
     source_info = {
         "type": "external_url",
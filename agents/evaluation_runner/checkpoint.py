@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+from agentuity import AgentContext
+from agents.common.kv import delete_if_present
+
+DEFAULT_CHECKPOINT_CHUNK_SIZE = int(os.environ.get("EVAL_CHECKPOINT_CHUNK_SIZE", "50"))
+
+def run_fingerprint(processed_data: Dict[str, Any], model_configs: List[Dict[str, Any]]) -> str:
+    """Content hash of what a run's results depend on: the prompt template, model configs and dataset"""
+    keyed = {
+        "template": (processed_data.get("template_info") or {}).get("original_template"),
+        "model_configs": model_configs,
+        "dataset": [
+            [case["case_id"], case.get("original_query"), case.get("expected_response"), case.get("processed_prompt")]
+            for case in processed_data.get("processed_cases", [])
+        ]
+    }
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True).encode("utf-8")).hexdigest()
+
+class RunCheckpoint:
+    """Persists completed case results in chunks so an interrupted run can resume.
+
+    Results are buffered and written to eval_results as
+    eval_run_{id}_results_chunk_{n}; eval_run_{id}_checkpoint records how many
+    chunks exist. A chunk is always written before the index that references it.
+    The index also stores the run's fingerprint, and a checkpoint written for a
+    different template, model configs or dataset is discarded rather than resumed.
+    """
+
+    def __init__(
+        self,
+        evaluation_id: str,
+        context: AgentContext,
+        chunk_size: int = DEFAULT_CHECKPOINT_CHUNK_SIZE,
+        fingerprint: Optional[str] = None
+    ):
+        self.evaluation_id = evaluation_id
+        self.context = context
+        self.chunk_size = max(1, chunk_size)
+        self.fingerprint = fingerprint
+        self.index_key = f"eval_run_{evaluation_id}_checkpoint"
+        self.chunk_count = 0
+        self.buffer: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+
+    def chunk_key(self, chunk_number: int) -> str:
+        return f"eval_run_{self.evaluation_id}_results_chunk_{chunk_number}"
+
+    async def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return previously checkpointed results keyed by case_id, or nothing if the run has changed since"""
+        index_result = await self.context.kv.get("eval_results", self.index_key)
+        if not index_result.data:
+            return {}
+        
+        index = await index_result.data.json()
+        self.chunk_count = index.get("chunk_count", 0)
+        
+        if index.get("fingerprint") != self.fingerprint:
+            self.context.logger.warning(
+                "Checkpoint for %s was written for a different template, model configs or dataset; discarding it",
+                self.evaluation_id
+            )
+            await self.clear()
+            return {}
+        
+        completed = {}
+        for chunk_number in range(self.chunk_count):
+            chunk_result = await self.context.kv.get("eval_results", self.chunk_key(chunk_number))
+            if not chunk_result.data:
+                self.context.logger.warning("Checkpoint chunk %d missing for %s", chunk_number, self.evaluation_id)
+                continue
+            chunk = await chunk_result.data.json()
+            for case_result in chunk["execution_results"]:
+                completed[case_result["case_id"]] = case_result
+        
+        self.context.logger.info("Loaded checkpoint for %s: %d completed cases in %d chunks",
+                               self.evaluation_id, len(completed), self.chunk_count)
+        return completed
+
+    async def record(self, case_result: Dict[str, Any]):
+        """Buffer a completed case; failed cases are not checkpointed so a resume retries them"""
+        if not case_result.get("success", False):
+            return
+        async with self._lock:
+            self.buffer.append(case_result)
+            if len(self.buffer) >= self.chunk_size:
+                await self._write_chunk()
+
+    async def flush(self):
+        async with self._lock:
+            if self.buffer:
+                await self._write_chunk()
+
+    async def clear(self):
+        """Remove the checkpoint once the full results blob has been written"""
+        for chunk_number in range(self.chunk_count):
+            await self._delete(self.chunk_key(chunk_number))
+        await self._delete(self.index_key)
+        self.chunk_count = 0
+        self.buffer = []
+
+    async def _delete(self, key: str):
+        # Most runs never wrote a checkpoint
+        await delete_if_present(self.context, "eval_results", key)
+
+    async def _write_chunk(self):
+        chunk, self.buffer = self.buffer, []
+        await self.context.kv.set("eval_results", self.chunk_key(self.chunk_count), {
+            "evaluation_id": self.evaluation_id,
+            "chunk_number": self.chunk_count,
+            "execution_results": chunk
+        })
+        self.chunk_count += 1
+        await self.context.kv.set("eval_results", self.index_key, {
+            "evaluation_id": self.evaluation_id,
+            "chunk_count": self.chunk_count,
+            "chunk_size": self.chunk_size,
+            "fingerprint": self.fingerprint
+        })
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+# Fields describing the call itself, which belong only to the case that made it
+CALL_FIELDS = [
+    "usage", "cost", "rate_limit_wait", "request_seconds", "time_to_first_token",
+    "output_tokens_per_second", "attempts", "retries", "hedged", "hedge_won"
+]
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse runs of whitespace so prompts differing only in spacing share a key"""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+def dedup_key(case: Dict[str, Any]) -> str:
+    """Hash of everything that determines a case's model call: model settings and normalized prompt"""
+    model_config = case.get("model_config") or {}
+    payload = json.dumps({
+        "model": model_config.get("model_name"),
+        "max_tokens": model_config.get("max_tokens"),
+        "temperature": model_config.get("temperature"),
+        "prompt": normalize_prompt(case.get("processed_prompt", ""))
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def group_duplicate_cases(
+    cases: List[Dict[str, Any]],
+    samples: int = 1
+) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """Pick the cases to actually execute and map each to the duplicates it answers for.
+
+    Each unique prompt is executed up to samples times; the remaining duplicates
+    are shared round-robin among those samples. Returns the cases to execute in
+    their original order and {case_id: [duplicate cases]}.
+    """
+    samples = max(1, samples)
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for case in cases:
+        groups.setdefault(dedup_key(case), []).append(case)
+
+    representative_ids = set()
+    followers: Dict[str, List[Dict[str, Any]]] = {}
+    for group in groups.values():
+        representatives = group[:samples]
+        representative_ids.update(case["case_id"] for case in representatives)
+        for i, case in enumerate(group[samples:]):
+            followers.setdefault(representatives[i % len(representatives)]["case_id"], []).append(case)
+
+    return [case for case in cases if case["case_id"] in representative_ids], followers
+
+def fan_out_result(case_result: Dict[str, Any], case: Dict[str, Any]) -> Dict[str, Any]:
+    """A copy of a representative's result for one of its duplicate cases"""
+    fanned = {key: value for key, value in case_result.items() if key not in CALL_FIELDS}
+    fanned.update({
+        "case_id": case["case_id"],
+        "original_query": case.get("original_query", ""),
+        "expected_response": case.get("expected_response", ""),
+        "processed_prompt": case.get("processed_prompt", ""),
+        "template_variables": case.get("template_variables", {}),
+        "case_metadata": case.get("case_metadata", {}),
+        "deduplicated_from": case_result["case_id"]
+    })
+    return fanned
+
+def summarize_dedup(execution_results: List[Dict[str, Any]], samples: int) -> Dict[str, Any]:
+    deduplicated = sum(1 for case_result in execution_results if case_result.get("deduplicated_from"))
+    return {
+        "samples": samples,
+        "model_calls": len(execution_results) - deduplicated,
+        "deduplicated_cases": deduplicated,
+        "dedup_ratio": deduplicated / len(execution_results) if execution_results else 0
+    }
@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+from agentuity import AgentContext
+from agents.common.costs import BudgetExhaustedError, CostTracker
+from agents.common.hedging import HedgeConfig
+from agents.common.sequential import SequentialEstimator
+from agents.llm_as_judge.agent import judge_case
+from agents.llm_as_judge.ensemble import JudgeEnsemble
+from agents.llm_as_judge.scorers import ScorerChain
+from agents.llm_as_judge.verdict_cache import VerdictCacheSession
+
+class StreamingJudge:
+    """Judges execution results as they complete instead of after the whole run.
+
+    Results are handed over through a bounded queue, so when judging falls behind,
+    submit() blocks and execution slows down to match. Use as an async context
+    manager so judge workers are always stopped. With an estimator, every score
+    except those of deduplicated copies is fed into it, and should_stop() reports
+    once it has reached a decision.
+    Every judge call is reserved with cost_tracker so it counts against the budget;
+    cases whose judge calls no longer fit are left unjudged.
+    """
+
+    def __init__(
+        self,
+        judge_model: str,
+        similarity_threshold: int,
+        context: AgentContext,
+        judge_concurrency: int,
+        queue_size: int,
+        *,
+        estimator: Optional[SequentialEstimator] = None,
+        cost_tracker: Optional[CostTracker] = None,
+        hedging: Optional[HedgeConfig] = None,
+        verdict_cache: Optional[VerdictCacheSession] = None,
+        scorers: Optional[ScorerChain] = None,
+        ensemble: Optional[JudgeEnsemble] = None
+    ):
+        self.judge_model = judge_model
+        self.similarity_threshold = similarity_threshold
+        self.context = context
+        self.judge_concurrency = max(1, judge_concurrency)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self.comparisons: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.workers: List[asyncio.Task] = []
+        self.estimator = estimator
+        self.cost_tracker = cost_tracker
+        self.hedging = hedging
+        self.verdict_cache = verdict_cache
+        self.scorers = scorers
+        self.ensemble = ensemble
+
+    async def __aenter__(self) -> "StreamingJudge":
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.judge_concurrency)]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+    async def submit(self, case_result: Dict[str, Any]):
+        """Queue a completed execution for judging, waiting while the queue is full"""
+        await self.queue.put(case_result)
+
+    def should_stop(self) -> bool:
+        """True once the estimator is confident enough to stop dispatching cases"""
+        return self.estimator is not None and self.estimator.decision() is not None
+
+    async def finish(self, execution_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Wait for queued work to drain and return comparisons in execution order.
+
+        Any result that never made it onto the queue is judged here; results left
+        unjudged by the budget are left out.
+        """
+        for _ in self.workers:
+            await self.queue.put(None)
+        await asyncio.gather(*self.workers)
+        
+        comparison_results = []
+        for case_result in execution_results:
+            if case_result["case_id"] in self.comparisons:
+                comparison = self.comparisons[case_result["case_id"]]
+            else:
+                comparison = await self._judge(case_result)
+            if comparison is not None:
+                comparison_results.append(comparison)
+        return comparison_results
+
+    async def _worker(self):
+        while True:
+            case_result: Optional[Dict[str, Any]] = await self.queue.get()
+            if case_result is None:
+                return
+            self.context.logger.info("Judging case %s (queue depth %d)", case_result["case_id"], self.queue.qsize())
+            await self._judge(case_result)
+
+    async def _judge(self, case_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            comparison = await judge_case(
+                case_result, self.judge_model, self.similarity_threshold, self.context,
+                hedging=self.hedging, verdict_cache=self.verdict_cache, scorers=self.scorers,
+                ensemble=self.ensemble, cost_tracker=self.cost_tracker
+            )
+        except BudgetExhaustedError:
+            self.comparisons[case_result["case_id"]] = None
+            return None
+        self.comparisons[case_result["case_id"]] = comparison
+        # A fanned-out copy repeats its representative's score rather than adding a new sample
+        if self.estimator is not None and not case_result.get("deduplicated_from"):
+            self.estimator.add(comparison.get("similarity_score", 0))
+        return comparison
@@ -1,10 +1,40 @@
 from agentuity import AgentRequest, AgentResponse, AgentContext
+import asyncio
 import json
-from typing import List, Dict, Any, Optional
-from anthropic import AsyncAnthropic
+import os
+from typing import List, Dict, Any, Optional, Tuple
+from anthropic.types import Message
+from agents.common.batches import run_message_batches
+from agents.common.concurrency import resolve_max_concurrency, run_bounded
+from agents.common.costs import BudgetExhaustedError, CostTracker, cost_of_usage, projected_cost
+from agents.common.hedging import HedgeConfig
+from agents.common.http_clients import get_anthropic_client
+from agents.common.model_client import create_message, usage_to_dict
+from agents.common.scheduler import set_dispatch_context
+from agents.common.sequential import SequentialEstimator, shuffled
+from agents.common.settings import get_run_settings
+from agents.llm_as_judge.ensemble import JudgeEnsemble, summarize_ensemble
+from agents.llm_as_judge.multi_case import DEFAULT_MAX_GROUP_SIZE, group_max_tokens, plan_groups
+from agents.llm_as_judge.score_stats import compute_score_statistics
+from agents.llm_as_judge.scorers import ScorerChain
+from agents.llm_as_judge.verdict_cache import VerdictCacheSession, verdict_cache_key
+from agents.llm_as_judge.verdict_schema import (
+    GROUP_JUDGE_TOOL,
+    JUDGE_TOOL,
+    MalformedVerdictError,
+    extract_group_verdicts,
+    extract_verdict,
+    tool_params
+)
 
-# Initialize Claude client for judging
-client = AsyncAnthropic()
+DEFAULT_SIMILARITY_THRESHOLD = 80
+DEFAULT_JUDGE_MODEL = "claude-3-5-haiku-latest"
+
+# Bump whenever build_judge_prompt or build_judge_params changes, so cached verdicts are not reused
+JUDGE_PROMPT_VERSION = 2
+
+# Times a case whose verdict does not match the schema is asked again before it is recorded as an error
+JUDGE_MAX_REASKS = int(os.environ.get("JUDGE_MAX_REASKS", "2"))
 
 def welcome():
     return {
@@ -21,7 +51,20 @@ def welcome():
                 "data": json.dumps({
                     "evaluation_id": "sentiment_eval_001", 
                     "similarity_threshold": 70,
-                    "judge_model": "claude-3-5-haiku-latest"
+                    "judge_model": "claude-3-5-haiku-latest",
+                    "evaluation_settings": {
+                        "judge_mode": "batch"
+                    }
+                }),
+                "contentType": "application/json"
+            },
+            {
+                "data": json.dumps({
+                    "evaluation_id": "qa_eval_001",
+                    "evaluation_settings": {
+                        "judge_mode": "concurrent",
+                        "judge_concurrency": 16
+                    }
                 }),
                 "contentType": "application/json"
             }
@@ -33,17 +76,13 @@ async def run(request: AgentRequest, response: AgentResponse, context: AgentCont
         # Parse the incoming request
         data = await request.data.json()
         evaluation_id = data.get("evaluation_id")
-        similarity_threshold = 80  # Fixed threshold
-        judge_model = "claude-3-5-haiku-latest"  # Fixed judge model
+        judge_model = DEFAULT_JUDGE_MODEL
         
         if not evaluation_id:
             return response.json({
                 "error": "Missing required field: evaluation_id"
             })
         
-        context.logger.info("Starting response comparison for: %s using Claude judge (threshold: %d)", 
-                          evaluation_id, similarity_threshold)
-        
         # Retrieve execution results from KV store
         results_key = f"eval_run_{evaluation_id}_results"
         results_result = await context.kv.get("eval_results", results_key)
@@ -58,106 +97,79 @@ async def run(request: AgentRequest, response: AgentResponse, context: AgentCont
         execution_results = results_data["execution_results"]
         total_cases = len(execution_results)
         
-        context.logger.info("Comparing %d evaluation results using Claude judge", total_cases)
-        
-        # Compare each result using Claude as judge
-        comparison_results = []
-        high_similarity = 0  # >= threshold
-        medium_similarity = 0  # 50-threshold
-        low_similarity = 0  # < 50
-        total_similarity_score = 0
+        # Load evaluation metadata so stored evaluation settings apply to this run
+        eval_metadata_key = f"eval_run_{evaluation_id}_metadata"
+        metadata_result = await context.kv.get("eval_metadata", eval_metadata_key)
+        metadata = await metadata_result.data.json() if metadata_result.data else None
+        settings = get_run_settings(data, metadata)
+        set_dispatch_context(evaluation_id, settings)
+        similarity_threshold = resolve_similarity_threshold(data, settings)
+        context.logger.info("Starting response comparison for: %s using Claude judge (threshold: %d)", 
+                          evaluation_id, similarity_threshold)
+        judge_mode = settings.get("judge_mode", "concurrent")
+        hedging = HedgeConfig.from_settings(settings)
+        verdict_cache = VerdictCacheSession.from_settings(settings)
+        scorers = ScorerChain.from_settings(settings)
+        ensemble = JudgeEnsemble.from_settings(settings)
+        if ensemble:
+            judge_model = ", ".join(ensemble.judges)
+            if judge_mode in ("batch", "multi"):
+                context.logger.warning("Judge ensembles judge case by case; ignoring judge_mode=%s", judge_mode)
+                judge_mode = "concurrent"
         
-        for i, result in enumerate(execution_results):
-            try:
-                context.logger.info("Judging case %d/%d: %s", i+1, total_cases, result["case_id"])
-                
-                # Use Claude to judge similarity
-                comparison_result = await judge_similarity_with_claude(
-                    result, judge_model, similarity_threshold, context
-                )
-                
-                # Categorize similarity scores
-                similarity_score = comparison_result.get("similarity_score", 0)
-                if similarity_score >= similarity_threshold:
-                    high_similarity += 1
-                elif similarity_score >= 50:
-                    medium_similarity += 1
-                else:
-                    low_similarity += 1
-                
-                total_similarity_score += similarity_score
-                comparison_results.append(comparison_result)
-                
-                context.logger.info("Case %s judged: %d/100 similarity", 
-                                  result["case_id"], similarity_score)
-                
-            except Exception as e:
-                error_result = {
-                    "case_id": result["case_id"],
-                    "success": False,
-                    "error": f"Exception during comparison: {str(e)}",
-                    "similarity_score": 0,
-                    "similarity_category": "error",
-                    "judge_reasoning": f"Error occurred: {str(e)}"
-                }
-                comparison_results.append(error_result)
-                low_similarity += 1
-                context.logger.error("Exception judging case %s: %s", result["case_id"], str(e))
+        # Early stopping judges in random order and stops once the average is settled
+        estimator = SequentialEstimator.from_settings(settings)
+        if estimator and judge_mode in ("batch", "multi"):
+            context.logger.warning("Early stopping needs per-case judging; ignoring judge_mode=%s", judge_mode)
+            judge_mode = "concurrent"
+        judge_concurrency = 1 if judge_mode == "sequential" else resolve_max_concurrency(settings, "judge_concurrency")
         
-        # Calculate average similarity
-        avg_similarity = total_similarity_score / total_cases if total_cases > 0 else 0
+        # Judge calls count against the same budget as execution, starting from what execution spent
+        execution_cost = (results_data.get("cost") or {}).get(
+            "spent", sum(result.get("cost", 0) for result in execution_results)
+        )
+        cost_tracker = CostTracker.from_settings(settings, execution_cost)
         
-        # Store comparison results in KV store
-        comparison_key = f"eval_run_{evaluation_id}_comparison"
-        comparison_data = {
-            "evaluation_id": evaluation_id,
-            "total_cases": total_cases,
-            "high_similarity_count": high_similarity,  # >= threshold
-            "medium_similarity_count": medium_similarity,  # 50-threshold
-            "low_similarity_count": low_similarity,  # < 50
-            "average_similarity_score": avg_similarity,
-            "similarity_threshold": similarity_threshold,
-            "judge_model": judge_model,
-            "comparison_results": comparison_results,
-            "status": "comparison_completed"
-        }
+        context.logger.info("Comparing %d evaluation results using Claude judge (mode: %s, concurrency: %d)",
+                          total_cases, judge_mode, judge_concurrency)
         
-        await context.kv.set("eval_comparison", comparison_key, comparison_data)
+        judge_stats = {}
+        if judge_mode == "batch":
+            comparison_results = await judge_cases_in_batch(
+                execution_results, judge_model, similarity_threshold, context, verdict_cache, scorers, cost_tracker
+            )
+        elif judge_mode == "multi":
+            comparison_results, judge_stats["multi_judge"] = await judge_cases_in_groups(
+                execution_results, judge_model, similarity_threshold, context, judge_concurrency,
+                settings.get("judge_group_size", DEFAULT_MAX_GROUP_SIZE), hedging, verdict_cache, scorers, cost_tracker
+            )
+        else:
+            comparison_results = await judge_cases_concurrently(
+                execution_results, judge_model, similarity_threshold, context, judge_concurrency,
+                estimator, settings, hedging, verdict_cache, scorers, ensemble, cost_tracker
+            )
         
-        # Update metadata
-        eval_metadata_key = f"eval_run_{evaluation_id}_metadata"
-        metadata_result = await context.kv.get("eval_metadata", eval_metadata_key)
-        if metadata_result:
-            metadata = await metadata_result.data.json()
-            metadata["status"] = "comparison_completed"
-            metadata["comparison_summary"] = {
-                "average_similarity": avg_similarity,
-                "high_similarity_count": high_similarity,
-                "medium_similarity_count": medium_similarity,
-                "low_similarity_count": low_similarity,
-                "high_similarity_rate": high_similarity / total_cases if total_cases > 0 else 0,
-                "threshold": similarity_threshold
-            }
-            await context.kv.set("eval_metadata", eval_metadata_key, metadata)
+        # Runs stopped early by the runner already carry a summary for the cases they spent
+        early_stopping = estimator.summary(total_cases) if estimator else results_data.get("early_stopping")
         
-        context.logger.info("Response comparison completed: avg similarity %.1f, %d high, %d medium, %d low", 
-                          avg_similarity, high_similarity, medium_similarity, low_similarity)
+        judge_stats["verdict_cache"] = verdict_cache.summary()
+        judge_stats["scorers"] = scorers.summary() if scorers else None
+        if ensemble:
+            judge_stats["ensemble"] = summarize_ensemble(comparison_results)
+        statistics = compute_score_statistics(
+            comparison_results, execution_results, settings.get("stat_slices", []), settings.get("stats_seed", 0)
+        )
+        if cost_tracker.exhausted:
+            context.logger.warning("Budget exhausted; %d/%d cases left unjudged",
+                                   total_cases - len(comparison_results), total_cases)
+        comparison_response = await store_comparison_results(
+            evaluation_id, comparison_results, similarity_threshold, judge_model, metadata, context,
+            early_stopping=early_stopping, judge_stats=judge_stats, statistics=statistics,
+            cost_tracker=cost_tracker, unjudged_cases=total_cases - len(comparison_results)
+        )
         
         # Return the comparison results directly to the frontend
-        return response.json({
-            "evaluation_id": evaluation_id,
-            "status": "comparison_completed",
-            "summary": {
-                "total_cases": total_cases,
-                "average_similarity_score": round(avg_similarity, 1),
-                "similarity_threshold": similarity_threshold,
-                "high_similarity_count": high_similarity,
-                "medium_similarity_count": medium_similarity,
-                "low_similarity_count": low_similarity,
-                "high_similarity_rate": round(high_similarity / total_cases * 100, 1) if total_cases > 0 else 0,
-                "judge_model": judge_model
-            }
-        })
+        return response.json(comparison_response)
         
     except Exception as e:
         context.logger.error("Error in response comparison: %s", str(e))
@@ -165,37 +177,532 @@ async def run(request: AgentRequest, response: AgentResponse, context: AgentCont
             "error": f"Failed to compare responses: {str(e)}"
         })
 
-async def judge_similarity_with_claude(
-    result: Dict[str, Any], 
+def resolve_similarity_threshold(data: Dict[str, Any], settings: Dict[str, Any]) -> int:
+    """The request's similarity_threshold, else the evaluation setting, else the default; clamped to 0-100"""
+    try:
+        threshold = int(data.get("similarity_threshold", settings.get("similarity_threshold", DEFAULT_SIMILARITY_THRESHOLD)))
+    except (TypeError, ValueError):
+        threshold = DEFAULT_SIMILARITY_THRESHOLD
+    return max(0, min(100, threshold))
+
+async def judge_case(
+    result: Dict[str, Any],
     judge_model: str,
     similarity_threshold: int,
-    context: AgentContext
+    context: AgentContext,
+    *,
+    hedging: Optional[HedgeConfig] = None,
+    verdict_cache: Optional[VerdictCacheSession] = None,
+    scorers: Optional[ScorerChain] = None,
+    ensemble: Optional[JudgeEnsemble] = None,
+    cost_tracker: Optional[CostTracker] = None
 ) -> Dict[str, Any]:
-    """Use Claude to judge similarity between expected and actual responses"""
+    """Judge one execution result, turning unexpected exceptions into an error result.
+
+    Raises BudgetExhaustedError when a judge call for the case no longer fits in the budget.
+    """
+    try:
+        # Use Claude to judge similarity
+        if ensemble:
+            comparison_result = await judge_with_ensemble(
+                result, ensemble, similarity_threshold, context, hedging, verdict_cache, scorers, cost_tracker
+            )
+        else:
+            comparison_result = await judge_similarity_with_claude(
+                result, judge_model, similarity_threshold, context, hedging, verdict_cache, scorers, cost_tracker
+            )
+        
+        context.logger.info("Case %s judged: %d/100 similarity", 
+                          result["case_id"], comparison_result.get("similarity_score", 0))
+        
+    except BudgetExhaustedError:
+        raise
+    except Exception as e:
+        context.logger.error("Exception judging case %s: %s", result["case_id"], str(e))
+        comparison_result = {
+            "case_id": result["case_id"],
+            "success": False,
+            "error": f"Exception during comparison: {str(e)}",
+            "similarity_score": 0,
+            "similarity_category": "error",
+            "judge_reasoning": f"Error occurred: {str(e)}"
+        }
     
-    case_id = result["case_id"]
-    expected_response = result.get("expected_response", "").strip()
-    model_response = result.get("model_response", "").strip()
-    original_query = result.get("original_query", "")
+    return with_model_key(comparison_result, result)
+
+async def judge_with_ensemble(
+    result: Dict[str, Any],
+    ensemble: JudgeEnsemble,
+    similarity_threshold: int,
+    context: AgentContext,
+    hedging: Optional[HedgeConfig] = None,
+    verdict_cache: Optional[VerdictCacheSession] = None,
+    scorers: Optional[ScorerChain] = None,
+    cost_tracker: Optional[CostTracker] = None
+) -> Dict[str, Any]:
+    """Judge one case with an ensemble, adding judges only while their verdicts disagree.
+
+    Every judge's verdict is kept in judge_scores; failed judges are left out of the vote.
+    Every judge call, escalation included, is reserved against the budget first. A
+    judge or escalation call that no longer fits falls back to the median of the
+    verdicts so far; only a case with no verdict at all is left unjudged.
+    """
+    ensemble_model = ", ".join(ensemble.judges)
+    if not needs_judging(result):
+        return build_unjudged_result(result, ensemble_model)
+    verdict = scorers.score(*judge_inputs(result)) if scorers else None
+    if verdict is not None:
+        return build_scored_result(result, verdict, ensemble_model, similarity_threshold)
     
-    # If the execution failed, return 0 similarity
-    if not result.get("success", False) or not model_response:
-        return {
-            "case_id": case_id,
-            "success": True,
-            "expected_response": expected_response,
-            "model_response": model_response,
-            "similarity_score": 0,
-            "similarity_category": "low",
-            "judge_reasoning": "Model execution failed or empty response",
-            "judge_model": judge_model
+    async def ask(judge_model: str) -> Dict[str, Any]:
+        return await judge_similarity_with_claude(
+            result, judge_model, similarity_threshold, context, hedging, verdict_cache, cost_tracker=cost_tracker
+        )
+    
+    # The cheapest judges go first together; the next one is only called while they disagree
+    verdicts = list(await asyncio.gather(
+        *(ask(judge_model) for judge_model in ensemble.judges[:ensemble.initial_judges]), return_exceptions=True
+    ))
+    # Let both first judges settle before giving up on a budget refusal
+    for verdict in verdicts:
+        if isinstance(verdict, BaseException):
+            raise verdict
+    called = ensemble.initial_judges
+    while True:
+        scores = [verdict["similarity_score"] for verdict in verdicts if verdict["similarity_category"] != "error"]
+        similarity_score = ensemble.consensus(scores) if scores else None
+        if similarity_score is not None or called >= len(ensemble.judges):
+            break
+        try:
+            verdicts.append(await ask(ensemble.judges[called]))
+        except BudgetExhaustedError:
+            if not scores:
+                raise
+            context.logger.info("Budget left no room for judge %s on case %s; using the fallback score",
+                              ensemble.judges[called], result["case_id"])
+            break
+        called += 1
+    
+    consensus = similarity_score is not None
+    escalated = False
+    if not consensus and ensemble.escalation_model:
+        try:
+            escalation = await ask(ensemble.escalation_model)
+        except BudgetExhaustedError:
+            if not scores:
+                raise
+            context.logger.info("Budget left no room to escalate case %s; using the fallback score", result["case_id"])
+            escalation = None
+        if escalation is not None:
+            escalation["escalation"] = True
+            verdicts.append(escalation)
+            if escalation["similarity_category"] != "error":
+                similarity_score = escalation["similarity_score"]
+                escalated = True
+    if similarity_score is None and scores:
+        similarity_score = ensemble.fallback(scores)
+    
+    judged = [verdict for verdict in verdicts if verdict["similarity_category"] != "error"]
+    if similarity_score is None:
+        comparison_result = build_judge_error_result(result, "Every ensemble judge failed", ensemble_model)
+    else:
+        closest = min(judged, key=lambda verdict: abs(verdict["similarity_score"] - similarity_score))
+        comparison_result = build_judged_result(
+            result, similarity_score, closest["judge_reasoning"], ensemble_model, similarity_threshold
+        )
+    comparison_result["judge_scores"] = [
+        {
+            "judge_model": verdict["judge_model"],
+            "similarity_score": verdict["similarity_score"],
+            "judge_reasoning": verdict["judge_reasoning"],
+            "escalation": verdict.get("escalation", False)
         }
+        for verdict in judged
+    ]
+    comparison_result["ensemble"] = {
+        "consensus": consensus,
+        "escalated": escalated,
+        "judges_called": len(verdicts),
+        "failed_judges": len(verdicts) - len(judged),
+        "spread": max(scores) - min(scores) if scores else 0
+    }
+    comparison_result["judge_cost"] = sum(verdict.get("judge_cost", 0) for verdict in verdicts)
+    comparison_result["judge_malformed"] = sum(verdict.get("judge_malformed", 0) for verdict in verdicts)
+    comparison_result["judge_cached"] = all(verdict.get("judge_cached") for verdict in verdicts)
+    return comparison_result
+
+async def rejudge_case(
+    result: Dict[str, Any],
+    judge_model: str,
+    similarity_threshold: int,
+    context: AgentContext,
+    cache_key: str,
+    hedging: Optional[HedgeConfig] = None,
+    verdict_cache: Optional[VerdictCacheSession] = None,
+    request_failed: bool = False,
+    cost_tracker: Optional[CostTracker] = None
+) -> Dict[str, Any]:
+    """Judge on its own a case whose verdict was missing or malformed in a batch or group reply.
+
+    With request_failed the shared request itself failed (e.g. a transport error), so
+    no verdict was malformed and the case is flagged judge_request_failed instead.
+    Scorers and the verdict cache were already consulted for it, so the fresh verdict is only stored.
+    """
+    comparison_result = await judge_case(
+        result, judge_model, similarity_threshold, context, hedging=hedging, cost_tracker=cost_tracker
+    )
+    if request_failed:
+        comparison_result["judge_request_failed"] = True
+    else:
+        comparison_result["judge_malformed"] = comparison_result.get("judge_malformed", 0) + 1
+    if verdict_cache and comparison_result.get("success") and "judge_cost" in comparison_result:
+        await verdict_cache.store(cache_key, {
+            "similarity_score": comparison_result["similarity_score"],
+            "judge_reasoning": comparison_result["judge_reasoning"]
+        }, context)
+    return comparison_result
+
+async def judge_cases_concurrently(
+    execution_results: List[Dict[str, Any]],
+    judge_model: str,
+    similarity_threshold: int,
+    context: AgentContext,
+    judge_concurrency: int,
+    estimator: Optional[SequentialEstimator],
+    settings: Dict[str, Any],
+    hedging: Optional[HedgeConfig] = None,
+    verdict_cache: Optional[VerdictCacheSession] = None,
+    scorers: Optional[ScorerChain] = None,
+    ensemble: Optional[JudgeEnsemble] = None,
+    cost_tracker: Optional[CostTracker] = None
+) -> List[Dict[str, Any]]:
+    """Judge results with up to judge_concurrency cases in flight.
+
+    Comparisons come back in execution_results order however the calls finish.
+    With early stopping, cases are judged in random order and no new case starts
+    once the average is settled. No new case starts once the budget is exhausted
+    either, and a case whose judge call does not fit is dropped. Cases never judged
+    are left out.
+    """
+    total_cases = len(execution_results)
+    judge_order = shuffled(execution_results, settings["early_stopping"].get("seed")) if estimator else execution_results
     
-    try:
-        # Create the judging prompt
-        judge_prompt = f"""You are an expert evaluator comparing AI model responses. Your task is to judge how similar two responses are to the same question.
+    async def judge_one(index: int, result: Dict[str, Any]) -> Dict[str, Any]:
+        context.logger.info("Judging case %d/%d: %s", index + 1, total_cases, result["case_id"])
+        comparison_result = await judge_case(
+            result, judge_model, similarity_threshold, context, hedging=hedging, verdict_cache=verdict_cache,
+            scorers=scorers, ensemble=ensemble, cost_tracker=cost_tracker
+        )
+        if estimator and not result.get("deduplicated_from"):
+            estimator.add(comparison_result.get("similarity_score", 0))
+        return comparison_result
+    
+    def handle_judge_exception(index: int, result: Dict[str, Any], e: Exception) -> Optional[Dict[str, Any]]:
+        if isinstance(e, BudgetExhaustedError):
+            return None
+        context.logger.error("Unexpected error judging case %s: %s", result.get("case_id"), str(e))
+        return build_judge_error_result(result, str(e), judge_model)
+    
+    def should_stop() -> bool:
+        return bool((estimator and estimator.decision() is not None) or (cost_tracker and cost_tracker.exhausted))
+    
+    judged = await run_bounded(judge_order, judge_one, judge_concurrency, handle_judge_exception, should_stop)
+    comparisons_by_id = {
+        result["case_id"]: comparison_result
+        for result, comparison_result in zip(judge_order, judged) if comparison_result is not None
+    }
+    return [
+        comparisons_by_id[result["case_id"]] for result in execution_results if result["case_id"] in comparisons_by_id
+    ]
+
+async def judge_cases_in_groups(
+    execution_results: List[Dict[str, Any]],
+    judge_model: str,
+    similarity_threshold: int,
+    context: AgentContext,
+    judge_concurrency: int,
+    max_group_size: int,
+    hedging: Optional[HedgeConfig] = None,
+    verdict_cache: Optional[VerdictCacheSession] = None,
+    scorers: Optional[ScorerChain] = None,
+    cost_tracker: Optional[CostTracker] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Judge several cases per request so the rubric is sent once per group instead of once per case.
+
+    Cases settled by a scorer or the verdict cache are left out of the groups. Any
+    case whose verdict is missing or malformed in the group reply, or whose group
+    failed outright, is re-judged on its own. Cases whose request no longer fits
+    in the budget are left out. Returns comparisons in execution order and
+    statistics on grouping.
+    """
+    comparisons_by_id: Dict[str, Dict[str, Any]] = {}
+    results_by_id = {result["case_id"]: result for result in execution_results}
+    cache_keys = {}
+    items = []
+    for result in execution_results:
+        case_id = result["case_id"]
+        if not needs_judging(result):
+            comparisons_by_id[case_id] = build_unjudged_result(result, judge_model)
+            continue
+        inputs = judge_inputs(result)
+        verdict = scorers.score(*inputs) if scorers else None
+        if verdict is not None:
+            comparisons_by_id[case_id] = build_scored_result(result, verdict, judge_model, similarity_threshold)
+            continue
+        cache_keys[case_id] = verdict_cache_key(judge_model, JUDGE_PROMPT_VERSION, *inputs)
+        cached = await verdict_cache.lookup(cache_keys[case_id], context) if verdict_cache else None
+        if cached is not None:
+            comparisons_by_id[case_id] = build_judged_result(
+                result, cached["similarity_score"], cached["judge_reasoning"], judge_model, similarity_threshold
+            )
+            comparisons_by_id[case_id]["judge_cached"] = True
+            continue
+        items.append((case_id, inputs))
+    
+    groups = plan_groups(items, max(1, int(max_group_size)))
+    context.logger.info("Judging %d cases in %d multi-case requests", len(items), len(groups))
+    
+    async def judge_group(index: int, group: List[Tuple[str, Tuple[str, str, str]]]) -> Tuple[List[str], List[str]]:
+        case_ids = [case_id for case_id, _ in group]
+        judge_result, call_info, judge_cost = await call_judge(
+            build_judge_params(
+                build_multi_judge_prompt(group), judge_model, group_max_tokens(len(group)), GROUP_JUDGE_TOOL
+            ),
+            hedging, cost_tracker, call_kind="judge_group"
+        )
+        verdicts, missing = extract_group_verdicts(judge_result, case_ids)
+        # The request is shared, so each case in the group carries an equal share of its cost
+        cost_share = judge_cost / len(group)
+        for case_id, (similarity_score, reasoning) in verdicts.items():
+            comparison_result = build_judged_result(
+                results_by_id[case_id], similarity_score, reasoning, judge_model, similarity_threshold
+            )
+            comparison_result["judge_attempts"] = call_info["attempts"]
+            comparison_result["judge_group_size"] = len(group)
+            comparison_result["judge_cost"] = cost_share
+            comparisons_by_id[case_id] = with_model_key(comparison_result, results_by_id[case_id])
+            if verdict_cache:
+                await verdict_cache.store(
+                    cache_keys[case_id], {"similarity_score": similarity_score, "judge_reasoning": reasoning}, context
+                )
+        if missing:
+            context.logger.warning("Multi-case judge reply %d lacked valid verdicts for %d/%d cases",
+                                   index, len(missing), len(group))
+        return missing, []
+    
+    def handle_group_exception(
+        index: int, group: List[Tuple[str, Tuple[str, str, str]]], e: Exception
+    ) -> Tuple[List[str], List[str]]:
+        if isinstance(e, BudgetExhaustedError):
+            return [], []
+        # No reply came back, so nothing was malformed; the cases are re-judged as failed requests
+        context.logger.error("Multi-case judge request %d failed: %s", index, str(e))
+        return [], [case_id for case_id, _ in group]
+    
+    outcomes = await run_bounded(
+        groups, judge_group, judge_concurrency, handle_group_exception,
+        (lambda: cost_tracker.exhausted) if cost_tracker else None
+    )
+    malformed_ids = [case_id for missing, _ in outcomes for case_id in missing]
+    failed_ids = [case_id for _, failed in outcomes for case_id in failed]
+    rejudge_ids = malformed_ids + failed_ids
+    failed = set(failed_ids)
+    
+    async def rejudge_one(index: int, case_id: str) -> Dict[str, Any]:
+        return await rejudge_case(
+            results_by_id[case_id], judge_model, similarity_threshold, context, cache_keys[case_id], hedging, verdict_cache,
+            request_failed=case_id in failed, cost_tracker=cost_tracker
+        )
+    
+    def handle_rejudge_exception(index: int, case_id: str, e: Exception) -> Optional[Dict[str, Any]]:
+        if isinstance(e, BudgetExhaustedError):
+            return None
+        return with_model_key(build_judge_error_result(results_by_id[case_id], str(e), judge_model), results_by_id[case_id])
+    
+    rejudged = await run_bounded(rejudge_ids, rejudge_one, judge_concurrency, handle_rejudge_exception)
+    comparisons_by_id.update(
+        (case_id, comparison_result) for case_id, comparison_result in zip(rejudge_ids, rejudged) if comparison_result is not None
+    )
+    
+    stats = {
+        "max_group_size": max_group_size,
+        "grouped_cases": len(items),
+        "requests": len(groups),
+        "average_group_size": len(items) / len(groups) if groups else 0,
+        "rejudged_cases": len(rejudge_ids),
+        "failed_requests": sum(1 for _, failed_group in outcomes if failed_group),
+        "failed_request_cases": len(failed_ids)
+    }
+    return [
+        with_model_key(comparisons_by_id[result["case_id"]], result)
+        for result in execution_results if result["case_id"] in comparisons_by_id
+    ], stats
+
+def with_model_key(comparison_result: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Carry the executing model over from the execution result, for per-model summaries"""
+    if result.get("model_key"):
+        comparison_result["model_key"] = result["model_key"]
+    return comparison_result
 
-Please evaluate the similarity between the Expected Response and Actual Response on a scale of 0-100, where:
+async def store_comparison_results(
+    evaluation_id: str,
+    comparison_results: List[Dict[str, Any]],
+    similarity_threshold: int,
+    judge_model: str,
+    metadata: Optional[Dict[str, Any]],
+    context: AgentContext,
+    *,
+    early_stopping: Optional[Dict[str, Any]] = None,
+    judge_stats: Optional[Dict[str, Any]] = None,
+    statistics: Optional[Dict[str, Any]] = None,
+    cost_tracker: Optional[CostTracker] = None,
+    unjudged_cases: int = 0
+) -> Dict[str, Any]:
+    """Aggregate comparison results, store them and the metadata summary, and build the response.
+
+    judge_stats holds per-run judging statistics (verdict cache, scorers, ...) stored alongside the summary.
+    statistics (from compute_score_statistics) is stored in full with the comparison record; the
+    metadata summary and response carry only its overall distribution. With cost_tracker, the
+    cost summary also records whether judging ran out of budget and how many cases went unjudged.
+    """
+    judge_stats = judge_stats or {}
+    
+    total_cases = len(comparison_results)
+    
+    # Categorize similarity scores
+    high_similarity = 0  # >= threshold
+    medium_similarity = 0  # 50-threshold
+    low_similarity = 0  # < 50
+    total_similarity_score = 0
+    
+    for comparison_result in comparison_results:
+        similarity_score = comparison_result.get("similarity_score", 0)
+        if similarity_score >= similarity_threshold:
+            high_similarity += 1
+        elif similarity_score >= 50:
+            medium_similarity += 1
+        else:
+            low_similarity += 1
+        total_similarity_score += similarity_score
+    
+    # Calculate average similarity
+    avg_similarity = total_similarity_score / total_cases if total_cases > 0 else 0
+    
+    model_summaries = summarize_comparisons_by_model(comparison_results, similarity_threshold)
+    judge_cost = sum(comparison_result.get("judge_cost", 0) for comparison_result in comparison_results)
+    hedging = {
+        "hedged": sum(1 for comparison_result in comparison_results if comparison_result.get("judge_hedged")),
+        "hedge_wins": sum(1 for comparison_result in comparison_results if comparison_result.get("judge_hedge_won"))
+    }
+    reasked = [comparison_result for comparison_result in comparison_results if comparison_result.get("judge_malformed")]
+    verdict_validation = {
+        "malformed_verdicts": sum(comparison_result["judge_malformed"] for comparison_result in reasked),
+        "reasked_cases": len(reasked),
+        "unresolved_cases": sum(1 for comparison_result in reasked if comparison_result["similarity_category"] == "error"),
+        # Cases re-judged because their shared request failed, not because a verdict was malformed
+        "request_failure_cases": sum(1 for comparison_result in comparison_results if comparison_result.get("judge_request_failed"))
+    }
+    
+    # Store comparison results in KV store
+    comparison_key = f"eval_run_{evaluation_id}_comparison"
+    comparison_data = {
+        "evaluation_id": evaluation_id,
+        "total_cases": total_cases,
+        "high_similarity_count": high_similarity,  # >= threshold
+        "medium_similarity_count": medium_similarity,  # 50-threshold
+        "low_similarity_count": low_similarity,  # < 50
+        "average_similarity_score": avg_similarity,
+        "similarity_threshold": similarity_threshold,
+        "judge_model": judge_model,
+        "model_summaries": model_summaries,
+        "early_stopping": early_stopping,
+        "judge_cost": judge_cost,
+        "hedging": hedging,
+        "verdict_validation": verdict_validation,
+        **judge_stats,
+        "statistics": statistics,
+        "comparison_results": comparison_results,
+        "status": "comparison_completed"
+    }
+    
+    await context.kv.set("eval_comparison", comparison_key, comparison_data)
+    
+    # Update metadata
+    if metadata:
+        metadata["status"] = "comparison_completed"
+        metadata["comparison_summary"] = {
+            "average_similarity": avg_similarity,
+            "high_similarity_count": high_similarity,
+            "medium_similarity_count": medium_similarity,
+            "low_similarity_count": low_similarity,
+            "high_similarity_rate": high_similarity / total_cases if total_cases > 0 else 0,
+            "threshold": similarity_threshold,
+            "per_model": model_summaries,
+            "early_stopping": early_stopping,
+            "hedging": hedging,
+            "verdict_validation": verdict_validation,
+            **judge_stats,
+            "statistics": statistics["overall"] if statistics else None
+        }
+        cost_summary = metadata.setdefault("cost_summary", {"execution_cost": 0.0})
+        cost_summary["judge_cost"] = judge_cost
+        cost_summary["total_cost"] = cost_summary.get("execution_cost", 0.0) + judge_cost
+        if cost_tracker:
+            cost_summary["budget"] = cost_tracker.budget
+            cost_summary["budget_exhausted"] = cost_summary.get("budget_exhausted", False) or cost_tracker.exhausted
+            cost_summary["unjudged_cases"] = unjudged_cases
+        await context.kv.set("eval_metadata", f"eval_run_{evaluation_id}_metadata", metadata)
+    
+    context.logger.info("Response comparison completed: avg similarity %.1f, %d high, %d medium, %d low", 
+                      avg_similarity, high_similarity, medium_similarity, low_similarity)
+    
+    return {
+        "evaluation_id": evaluation_id,
+        "status": "comparison_completed",
+        "summary": {
+            "total_cases": total_cases,
+            "average_similarity_score": round(avg_similarity, 1),
+            "similarity_threshold": similarity_threshold,
+            "high_similarity_count": high_similarity,
+            "medium_similarity_count": medium_similarity,
+            "low_similarity_count": low_similarity,
+            "high_similarity_rate": round(high_similarity / total_cases * 100, 1) if total_cases > 0 else 0,
+            "judge_model": judge_model,
+            "per_model": model_summaries,
+            "early_stopping": early_stopping,
+            "verdict_validation": verdict_validation,
+            **judge_stats,
+            "statistics": statistics["overall"] if statistics else None,
+            "cost": (metadata or {}).get("cost_summary", {"judge_cost": judge_cost})
+        }
+    }
+
+def summarize_comparisons_by_model(
+    comparison_results: List[Dict[str, Any]],
+    similarity_threshold: int
+) -> Dict[str, Dict[str, Any]]:
+    """Similarity counts and average per model_key, so models in one run can be compared"""
+    summaries: Dict[str, Dict[str, Any]] = {}
+    for comparison_result in comparison_results:
+        summary = summaries.setdefault(comparison_result.get("model_key", "default"), {
+            "total_cases": 0,
+            "high_similarity_count": 0,
+            "medium_similarity_count": 0,
+            "low_similarity_count": 0,
+            "total_similarity_score": 0
+        })
+        similarity_score = comparison_result.get("similarity_score", 0)
+        summary["total_cases"] += 1
+        summary["total_similarity_score"] += similarity_score
+        summary[f"{categorize_similarity(similarity_score, similarity_threshold)}_similarity_count"] += 1
+    
+    for summary in summaries.values():
+        total = summary["total_cases"]
+        summary["average_similarity"] = summary.pop("total_similarity_score") / total if total > 0 else 0
+        summary["high_similarity_rate"] = summary["high_similarity_count"] / total if total > 0 else 0
+    return summaries
+
+JUDGE_RUBRIC = """Please evaluate the similarity between the Expected Response and Actual Response on a scale of 0-100, where:
 - 100 = Identical or semantically equivalent
 - 80-99 = Very similar, minor differences in wording or style
 - 60-79 = Similar meaning, some differences in detail or approach
@@ -207,7 +714,13 @@ Consider:
 - Factual accuracy
 - Semantic meaning
 - Completeness of the answer
-- Relevance to the question
+- Relevance to the question"""
+
+def build_judge_prompt(original_query: str, expected_response: str, model_response: str) -> str:
+    """Create the judging prompt for one case"""
+    return f"""You are an expert evaluator comparing AI model responses. Your task is to judge how similar two responses are to the same question.
+
+{JUDGE_RUBRIC}
 
 Original Question: {original_query}
 
@@ -215,78 +728,331 @@ Expected Response: {expected_response}
 
 Actual Response: {model_response}
 
-Respond with ONLY a JSON object in this exact format:
-{{
-    "similarity_score": <number 0-100>,
-    "reasoning": "<brief explanation of your scoring>"
-}}
+Record your verdict with the {JUDGE_TOOL['name']} tool.
 """
 
-        context.logger.info("Calling Claude judge with model: %s", judge_model)
-        
-        # Call Claude to judge similarity
-        judge_result = await client.messages.create(
-            max_tokens=200,
-            temperature=0.1,  # Low temperature for consistent judging
-            messages=[
-                {
-                    "role": "user",
-                    "content": judge_prompt,
-                }
-            ],
-            model=judge_model,
-        )
-        
-        judge_response = judge_result.content[0].text.strip()
+def build_multi_judge_prompt(group: List[Tuple[str, Tuple[str, str, str]]]) -> str:
+    """Create one judging prompt covering several cases, each labelled with its case ID"""
+    cases = "\n\n".join(
+        f"""<case id="{case_id}">
+Original Question: {original_query}
+
+Expected Response: {expected_response}
+
+Actual Response: {model_response}
+</case>"""
+        for case_id, (original_query, expected_response, model_response) in group
+    )
+    return f"""You are an expert evaluator comparing AI model responses. For each case below, judge how similar the Actual Response is to the Expected Response for the same question. Judge every case independently.
+
+{JUDGE_RUBRIC}
+
+{cases}
+
+Record one verdict per case, using each case's id, with the {GROUP_JUDGE_TOOL['name']} tool.
+"""
+
+def build_judge_params(
+    judge_prompt: str,
+    judge_model: str,
+    max_tokens: int = 200,
+    tool: Dict[str, Any] = JUDGE_TOOL
+) -> Dict[str, Any]:
+    """Build the messages.create parameters for a judge call, forcing the verdict tool"""
+    return {
+        **tool_params(tool),
+        "max_tokens": max_tokens,
+        "temperature": 0.1,  # Low temperature for consistent judging
+        "messages": [
+            {
+                "role": "user",
+                "content": judge_prompt,
+            }
+        ],
+        "model": judge_model,
+    }
+
+def categorize_similarity(similarity_score: int, similarity_threshold: int) -> str:
+    if similarity_score >= similarity_threshold:
+        return "high"
+    elif similarity_score >= 50:
+        return "medium"
+    return "low"
+
+def needs_judging(result: Dict[str, Any]) -> bool:
+    """Failed executions and empty responses are scored 0 without calling the judge"""
+    return bool(result.get("success", False) and (result.get("model_response") or "").strip())
+
+def build_unjudged_result(result: Dict[str, Any], judge_model: str) -> Dict[str, Any]:
+    return {
+        "case_id": result["case_id"],
+        "success": True,
+        "expected_response": (result.get("expected_response") or "").strip(),
+        "model_response": (result.get("model_response") or "").strip(),
+        "similarity_score": 0,
+        "similarity_category": "low",
+        "judge_reasoning": "Model execution failed or empty response",
+        "judge_model": judge_model
+    }
+
+def judge_inputs(result: Dict[str, Any]) -> Tuple[str, str, str]:
+    """The question, expected response and actual response a verdict is based on"""
+    return (
+        result.get("original_query", ""),
+        (result.get("expected_response") or "").strip(),
+        (result.get("model_response") or "").strip()
+    )
+
+def build_judged_result(
+    result: Dict[str, Any],
+    similarity_score: int,
+    reasoning: str,
+    judge_model: str,
+    similarity_threshold: int
+) -> Dict[str, Any]:
+    return {
+        "case_id": result["case_id"],
+        "success": True,
+        "expected_response": (result.get("expected_response") or "").strip(),
+        "model_response": (result.get("model_response") or "").strip(),
+        "similarity_score": similarity_score,
+        "similarity_category": categorize_similarity(similarity_score, similarity_threshold),
+        "judge_reasoning": reasoning,
+        "judge_model": judge_model,
+        "original_query": result.get("original_query", "")
+    }
+
+def build_scored_result(
+    result: Dict[str, Any],
+    verdict: Dict[str, Any],
+    judge_model: str,
+    similarity_threshold: int
+) -> Dict[str, Any]:
+    """A comparison decided by a deterministic scorer instead of the judge"""
+    comparison_result = build_judged_result(
+        result, verdict["similarity_score"], verdict["judge_reasoning"], judge_model, similarity_threshold
+    )
+    comparison_result["scored_by"] = verdict["scored_by"]
+    return comparison_result
+
+def build_judge_error_result(result: Dict[str, Any], error: str, judge_model: str) -> Dict[str, Any]:
+    return {
+        "case_id": result["case_id"],
+        "success": False,
+        "error": error,
+        "expected_response": (result.get("expected_response") or "").strip(),
+        "model_response": (result.get("model_response") or "").strip(),
+        "similarity_score": 0,
+        "similarity_category": "error",
+        "judge_reasoning": f"Judge error: {error}",
+        "judge_model": judge_model
+    }
+
+async def call_judge(
+    judge_params: Dict[str, Any],
+    hedging: Optional[HedgeConfig] = None,
+    cost_tracker: Optional[CostTracker] = None,
+    call_kind: str = "judge"
+) -> Tuple[Message, Dict[str, Any], float]:
+    """create_message for a judge call, reserving its projected cost against the budget first.
+
+    Returns the message, call info and the call's actual cost; raises
+    BudgetExhaustedError without calling the model when the call does not fit.
+    """
+    reserved = projected_cost(judge_params) if cost_tracker else 0.0
+    if cost_tracker and not await cost_tracker.reserve(reserved):
+        raise BudgetExhaustedError(f"Judge call to {judge_params['model']} does not fit in the remaining budget")
+    actual = 0.0
+    try:
+        judge_result, call_info = await create_message(get_anthropic_client(), hedging, call_kind, **judge_params)
+        actual = cost_of_usage(judge_params["model"], usage_to_dict(judge_result.usage))
+        return judge_result, call_info, actual
+    finally:
+        if cost_tracker:
+            await cost_tracker.settle(reserved, actual)
+
+async def judge_similarity_with_claude(
+    result: Dict[str, Any], 
+    judge_model: str,
+    similarity_threshold: int,
+    context: AgentContext,
+    hedging: Optional[HedgeConfig] = None,
+    verdict_cache: Optional[VerdictCacheSession] = None,
+    scorers: Optional[ScorerChain] = None,
+    cost_tracker: Optional[CostTracker] = None
+) -> Dict[str, Any]:
+    """Use Claude to judge similarity between expected and actual responses.
+
+    Cases a deterministic scorer is confident about never reach the judge. Each
+    judge call, re-asks included, is reserved against the budget first; raises
+    BudgetExhaustedError when one does not fit.
+    """
+    
+    case_id = result["case_id"]
+    
+    # If the execution failed, return 0 similarity
+    if not needs_judging(result):
+        return build_unjudged_result(result, judge_model)
+    
+    try:
+        inputs = judge_inputs(result)
+        verdict = scorers.score(*inputs) if scorers else None
+        if verdict is not None:
+            return build_scored_result(result, verdict, judge_model, similarity_threshold)
         
-        # Parse the JSON response
-        try:
-            judge_data = json.loads(judge_response)
-            similarity_score = int(judge_data.get("similarity_score", 0))
-            reasoning = judge_data.get("reasoning", "No reasoning provided")
-        except (json.JSONDecodeError, ValueError) as e:
-            context.logger.warning("Failed to parse judge response for case %s: %s", case_id, str(e))
-            # Fallback: try to extract number from response
-            import re
-            numbers = re.findall(r'\b(\d{1,3})\b', judge_response)
-            similarity_score = int(numbers[0]) if numbers else 0
-            reasoning = f"Fallback parsing: {judge_response[:100]}..."
+        cache_key = verdict_cache_key(judge_model, JUDGE_PROMPT_VERSION, *inputs)
+        cached = await verdict_cache.lookup(cache_key, context) if verdict_cache else None
+        if cached is not None:
+            comparison_result = build_judged_result(
+                result, cached["similarity_score"], cached["judge_reasoning"], judge_model, similarity_threshold
+            )
+            comparison_result["judge_cached"] = True
+            return comparison_result
         
-        # Ensure score is in valid range
-        similarity_score = max(0, min(100, similarity_score))
+        judge_params = build_judge_params(build_judge_prompt(*inputs), judge_model)
+
+        context.logger.info("Calling Claude judge with model: %s", judge_model)
         
-        # Categorize similarity
-        if similarity_score >= similarity_threshold:
-            category = "high"
-        elif similarity_score >= 50:
-            category = "medium"
+        # Call Claude to judge similarity, paced by the shared rate limiter; only a malformed verdict is asked again
+        judge_cost = 0.0
+        malformed = 0
+        for _ in range(1 + JUDGE_MAX_REASKS):
+            judge_result, call_info, call_cost = await call_judge(judge_params, hedging, cost_tracker)
+            judge_cost += call_cost
+            try:
+                similarity_score, reasoning = extract_verdict(judge_result)
+                break
+            except MalformedVerdictError as e:
+                malformed += 1
+                context.logger.warning("Malformed judge verdict for case %s: %s", case_id, str(e))
         else:
-            category = "low"
+            comparison_result = build_judge_error_result(
+                result, f"Malformed judge verdict after {malformed} attempts", judge_model
+            )
+            comparison_result["judge_malformed"] = malformed
+            comparison_result["judge_cost"] = judge_cost
+            return comparison_result
         
-        context.logger.info("Claude judge scored case %s: %d/100 (%s)", case_id, similarity_score, category)
+        comparison_result = build_judged_result(result, similarity_score, reasoning, judge_model, similarity_threshold)
+        comparison_result["judge_attempts"] = call_info["attempts"]
+        comparison_result["judge_hedged"] = call_info["hedged"]
+        comparison_result["judge_hedge_won"] = call_info["hedge_won"]
+        comparison_result["judge_malformed"] = malformed
+        comparison_result["judge_cost"] = judge_cost
+        if verdict_cache:
+            await verdict_cache.store(cache_key, {"similarity_score": similarity_score, "judge_reasoning": reasoning}, context)
         
-        return {
-            "case_id": case_id,
-            "success": True,
-            "expected_response": expected_response,
-            "model_response": model_response,
-            "similarity_score": similarity_score,
-            "similarity_category": category,
-            "judge_reasoning": reasoning,
-            "judge_model": judge_model,
-            "original_query": original_query
-        }
+        context.logger.info("Claude judge scored case %s: %d/100 (%s)",
+                          case_id, similarity_score, comparison_result["similarity_category"])
+        
+        return comparison_result
         
+    except BudgetExhaustedError:
+        raise
     except Exception as e:
         context.logger.error("Claude judge error for case %s: %s", case_id, str(e))
-        return {
-            "case_id": case_id,
-            "success": False,
-            "error": str(e),
-            "expected_response": expected_response,
-            "model_response": model_response,
-            "similarity_score": 0,
-            "similarity_category": "error",
-            "judge_reasoning": f"Judge error: {str(e)}",
-            "judge_model": judge_model
-        }
+        comparison_result = build_judge_error_result(result, str(e), judge_model)
+        comparison_result["judge_attempts"] = getattr(e, "attempts", 1)
+        return comparison_result
+
+async def judge_cases_in_batch(
+    execution_results: List[Dict[str, Any]],
+    judge_model: str,
+    similarity_threshold: int,
+    context: AgentContext,
+    verdict_cache: Optional[VerdictCacheSession] = None,
+    scorers: Optional[ScorerChain] = None,
+    cost_tracker: Optional[CostTracker] = None
+) -> List[Dict[str, Any]]:
+    """Judge all cases through the Message Batches API, returning results in case order.
+
+    Cases decided by a deterministic scorer or with a cached verdict are left out of the batch.
+    A submitted batch cannot be stopped, so only requests that fit in the budget are
+    submitted; the rest are left unjudged. Cases whose batch verdict is malformed are
+    re-asked individually.
+    """
+    
+    requests = {}
+    cache_keys = {}
+    cached_verdicts = {}
+    scored_verdicts = {}
+    for result in execution_results:
+        if needs_judging(result):
+            inputs = judge_inputs(result)
+            verdict = scorers.score(*inputs) if scorers else None
+            if verdict is not None:
+                scored_verdicts[result["case_id"]] = verdict
+                continue
+            cache_keys[result["case_id"]] = verdict_cache_key(judge_model, JUDGE_PROMPT_VERSION, *inputs)
+            cached = await verdict_cache.lookup(cache_keys[result["case_id"]], context) if verdict_cache else None
+            if cached is not None:
+                cached_verdicts[result["case_id"]] = cached
+                continue
+            requests[result["case_id"]] = build_judge_params(build_judge_prompt(*inputs), judge_model)
+    
+    reservations = {}
+    over_budget = set()
+    if cost_tracker:
+        for case_id, params in list(requests.items()):
+            reserved = projected_cost(params, batch=True)
+            if await cost_tracker.reserve(reserved, wait=False):
+                reservations[case_id] = reserved
+            else:
+                over_budget.add(case_id)
+                del requests[case_id]
+    
+    context.logger.info("Submitting %d judge requests as message batches", len(requests))
+    batch_results, batch_ids = await run_message_batches(get_anthropic_client(), requests) if requests else ({}, [])
+    context.logger.info("Judge message batches completed: %s", ", ".join(batch_ids))
+    for case_id, reserved in reservations.items():
+        entry = batch_results.get(case_id)
+        succeeded = entry is not None and entry["success"]
+        await cost_tracker.settle(
+            reserved, cost_of_usage(judge_model, usage_to_dict(entry["message"].usage), batch=True) if succeeded else 0.0
+        )
+    
+    comparison_results = []
+    for result in execution_results:
+        entry = batch_results.get(result["case_id"])
+        cached = cached_verdicts.get(result["case_id"])
+        if result["case_id"] in over_budget:
+            continue
+        if result["case_id"] in scored_verdicts:
+            comparison_result = build_scored_result(
+                result, scored_verdicts[result["case_id"]], judge_model, similarity_threshold
+            )
+        elif cached is not None:
+            comparison_result = build_judged_result(
+                result, cached["similarity_score"], cached["judge_reasoning"], judge_model, similarity_threshold
+            )
+            comparison_result["judge_cached"] = True
+        elif entry is None:
+            comparison_result = build_unjudged_result(result, judge_model)
+        elif entry["success"]:
+            try:
+                similarity_score, reasoning = extract_verdict(entry["message"])
+            except MalformedVerdictError as e:
+                context.logger.warning("Malformed batch judge verdict for case %s: %s", result["case_id"], str(e))
+                try:
+                    comparison_result = await rejudge_case(
+                        result, judge_model, similarity_threshold, context, cache_keys[result["case_id"]],
+                        verdict_cache=verdict_cache, cost_tracker=cost_tracker
+                    )
+                except BudgetExhaustedError:
+                    continue
+                comparison_result["judge_cost"] = comparison_result.get("judge_cost", 0) + cost_of_usage(
+                    judge_model, usage_to_dict(entry["message"].usage), batch=True
+                )
+                comparison_results.append(comparison_result)
+                continue
+            comparison_result = build_judged_result(result, similarity_score, reasoning, judge_model, similarity_threshold)
+            comparison_result["judge_cost"] = cost_of_usage(judge_model, usage_to_dict(entry["message"].usage), batch=True)
+            if verdict_cache:
+                await verdict_cache.store(
+                    cache_keys[result["case_id"]], {"similarity_score": similarity_score, "judge_reasoning": reasoning}, context
+                )
+        else:
+            comparison_result = build_judge_error_result(result, entry["error"], judge_model)
+        comparison_results.append(with_model_key(comparison_result, result))
+    
+    return comparison_results
@@ -0,0 +1,97 @@
+from itertools import combinations
+from typing import Any, Dict, List, Optional
+from agents.common.costs import get_model_pricing
+
+DEFAULT_ENSEMBLE_JUDGES = ["claude-3-haiku-20240307", "claude-3-5-haiku-latest"]
+DEFAULT_ESCALATION_MODEL = "claude-sonnet-4-20250514"
+DEFAULT_AGREEMENT_TOLERANCE = 10
+
+def cost_rank(model_name: str) -> float:
+    pricing = get_model_pricing(model_name)
+    return pricing["input"] + pricing["output"]
+
+class JudgeEnsemble:
+    """Several judges per case, called cheapest first, stopping once two agree.
+
+    A case starts with the two cheapest judges. While no pair of verdicts is within
+    tolerance, the next judge in cost order is added; if every judge has been
+    called without agreement, the escalation model's verdict decides the case
+    (or, without one, the median verdict).
+    """
+
+    def __init__(
+        self,
+        judges: List[str],
+        tolerance: float = DEFAULT_AGREEMENT_TOLERANCE,
+        escalation_model: Optional[str] = DEFAULT_ESCALATION_MODEL
+    ):
+        if not judges:
+            raise ValueError("judge_ensemble needs at least one judge")
+        self.judges = sorted(dict.fromkeys(judges), key=cost_rank)
+        self.tolerance = tolerance
+        self.escalation_model = escalation_model
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> Optional["JudgeEnsemble"]:
+        config = settings.get("judge_ensemble")
+        if not config:
+            return None
+        if config is True:
+            return cls(list(DEFAULT_ENSEMBLE_JUDGES))
+        return cls(
+            list(config.get("judges", DEFAULT_ENSEMBLE_JUDGES)),
+            float(config.get("tolerance", DEFAULT_AGREEMENT_TOLERANCE)),
+            config.get("escalation_model", DEFAULT_ESCALATION_MODEL)
+        )
+
+    @property
+    def initial_judges(self) -> int:
+        return min(2, len(self.judges))
+
+    def consensus(self, scores: List[int]) -> Optional[int]:
+        """Mean of the closest pair of scores within tolerance, or None while judges disagree.
+
+        A lone score is only a consensus for a one-judge ensemble; when the other
+        judges failed it is not, so the caller keeps calling judges or escalates.
+        """
+        if len(self.judges) == 1:
+            return scores[0] if scores else None
+        agreeing = [(abs(a - b), (a + b) / 2) for a, b in combinations(scores, 2) if abs(a - b) <= self.tolerance]
+        return round(min(agreeing)[1]) if agreeing else None
+
+    def fallback(self, scores: List[int]) -> int:
+        ordered = sorted(scores)
+        middle = len(ordered) // 2
+        return ordered[middle] if len(ordered) % 2 else round((ordered[middle - 1] + ordered[middle]) / 2)
+
+def summarize_ensemble(comparison_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """How often the ensemble agreed, how many judges it took and how each judge scored"""
+    ensembled = [comparison_result for comparison_result in comparison_results if comparison_result.get("ensemble")]
+    total = len(ensembled)
+    per_judge: Dict[str, Dict[str, Any]] = {}
+    spreads = []
+    for comparison_result in ensembled:
+        scores = []
+        for verdict in comparison_result.get("judge_scores", []):
+            judge = per_judge.setdefault(verdict["judge_model"], {"verdicts": 0, "total_score": 0, "escalations": 0})
+            judge["verdicts"] += 1
+            judge["total_score"] += verdict["similarity_score"]
+            judge["escalations"] += 1 if verdict.get("escalation") else 0
+            if not verdict.get("escalation"):
+                scores.append(verdict["similarity_score"])
+        if len(scores) > 1:
+            spreads.append(max(scores) - min(scores))
+    for judge in per_judge.values():
+        judge["average_score"] = judge.pop("total_score") / judge["verdicts"]
+    consensus = sum(1 for comparison_result in ensembled if comparison_result["ensemble"]["consensus"])
+    return {
+        "cases": total,
+        "consensus_cases": consensus,
+        "agreement_rate": consensus / total if total > 0 else 0,
+        "escalated_cases": sum(1 for comparison_result in ensembled if comparison_result["ensemble"]["escalated"]),
+        "average_judges_per_case": sum(
+            len(comparison_result.get("judge_scores", [])) for comparison_result in ensembled
+        ) / total if total > 0 else 0,
+        "average_spread": sum(spreads) / len(spreads) if spreads else 0,
+        "per_judge": per_judge
+    }
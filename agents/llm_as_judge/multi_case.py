@@ -0,0 +1,41 @@
+import os
+from typing import List, Tuple
+
+# Upper bound on cases packed into one judge request
+DEFAULT_MAX_GROUP_SIZE = int(os.environ.get("MULTI_JUDGE_MAX_GROUP_SIZE", "10"))
+
+# Case text per request; long cases get smaller groups so the judge keeps its attention on each one
+MULTI_JUDGE_MAX_CASE_CHARS = int(os.environ.get("MULTI_JUDGE_MAX_CASE_CHARS", "12000"))
+
+# Output budget per case in a group: the verdict object plus its reasoning
+MULTI_JUDGE_TOKENS_PER_CASE = int(os.environ.get("MULTI_JUDGE_TOKENS_PER_CASE", "150"))
+
+JudgeItem = Tuple[str, Tuple[str, str, str]]
+
+def case_chars(item: JudgeItem) -> int:
+    _, inputs = item
+    return sum(len(text) for text in inputs)
+
+def plan_groups(items: List[JudgeItem], max_group_size: int = DEFAULT_MAX_GROUP_SIZE) -> List[List[JudgeItem]]:
+    """Pack (case_id, inputs) items into groups in order.
+
+    A group closes once it holds max_group_size cases or adding the next case
+    would push its text past MULTI_JUDGE_MAX_CASE_CHARS, so K adapts to case length.
+    A case that is too long on its own still gets a group of one.
+    """
+    groups: List[List[JudgeItem]] = []
+    group: List[JudgeItem] = []
+    group_chars = 0
+    for item in items:
+        chars = case_chars(item)
+        if group and (len(group) >= max_group_size or group_chars + chars > MULTI_JUDGE_MAX_CASE_CHARS):
+            groups.append(group)
+            group, group_chars = [], 0
+        group.append(item)
+        group_chars += chars
+    if group:
+        groups.append(group)
+    return groups
+
+def group_max_tokens(group_size: int) -> int:
+    return MULTI_JUDGE_TOKENS_PER_CASE * group_size + 50
@@ -0,0 +1,100 @@
+from typing import Any, Dict, List, Optional
+
+def default_buckets(similarity_threshold: int) -> List[Dict[str, Any]]:
+    """The high/medium/low scheme llm_as_judge stores at judge time"""
+    return [
+        {"name": "high", "min": similarity_threshold},
+        {"name": "medium", "min": min(50, similarity_threshold)},
+        {"name": "low", "min": 0}
+    ]
+
+def resolve_buckets(buckets: Optional[List[Dict[str, Any]]], similarity_threshold: int) -> List[Dict[str, Any]]:
+    """Validate a bucketing scheme of {"name", "min"} entries, ordered from highest min to lowest.
+
+    A score falls in the first bucket whose min it reaches; the lowest bucket is
+    extended down to 0 so every score lands somewhere. Without a scheme the
+    default high/medium/low buckets for similarity_threshold are used.
+    """
+    if not buckets:
+        return default_buckets(similarity_threshold)
+    resolved = []
+    for bucket in buckets:
+        if not isinstance(bucket, dict) or not bucket.get("name") or not isinstance(bucket.get("min"), (int, float)):
+            raise ValueError(f"Invalid bucket {bucket!r}, expected {{\"name\": str, \"min\": number}}")
+        resolved.append({"name": str(bucket["name"]), "min": bucket["min"]})
+    names = [bucket["name"] for bucket in resolved]
+    if len(set(names)) != len(names):
+        raise ValueError("Bucket names must be unique")
+    resolved.sort(key=lambda bucket: bucket["min"], reverse=True)
+    resolved[-1]["min"] = min(resolved[-1]["min"], 0)
+    return resolved
+
+def categorize(similarity_score: float, buckets: List[Dict[str, Any]]) -> str:
+    for bucket in buckets:
+        if similarity_score >= bucket["min"]:
+            return bucket["name"]
+    return buckets[-1]["name"]
+
+def summarize_group(
+    comparison_results: List[Dict[str, Any]],
+    similarity_threshold: int,
+    buckets: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    total = len(comparison_results)
+    scores = [comparison_result.get("similarity_score", 0) for comparison_result in comparison_results]
+    counts = {bucket["name"]: 0 for bucket in buckets}
+    for similarity_score in scores:
+        counts[categorize(similarity_score, buckets)] += 1
+    passed = sum(1 for similarity_score in scores if similarity_score >= similarity_threshold)
+    return {
+        "total_cases": total,
+        "average_similarity_score": sum(scores) / total if total > 0 else 0,
+        "pass_count": passed,
+        "pass_rate": passed / total if total > 0 else 0,
+        "buckets": [
+            {**bucket, "count": counts[bucket["name"]], "rate": counts[bucket["name"]] / total if total > 0 else 0}
+            for bucket in buckets
+        ]
+    }
+
+def summarize_scores(
+    comparison_results: List[Dict[str, Any]],
+    similarity_threshold: int,
+    buckets: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Recompute rates and bucket counts, overall and per model_key, from stored raw scores.
+
+    Judge errors are stored with score 0 and count towards the lowest bucket, as at judge time.
+    """
+    buckets = resolve_buckets(buckets, similarity_threshold)
+    by_model: Dict[str, List[Dict[str, Any]]] = {}
+    for comparison_result in comparison_results:
+        by_model.setdefault(comparison_result.get("model_key", "default"), []).append(comparison_result)
+    return {
+        "similarity_threshold": similarity_threshold,
+        **summarize_group(comparison_results, similarity_threshold, buckets),
+        "per_model": {
+            model_key: summarize_group(model_results, similarity_threshold, buckets)
+            for model_key, model_results in by_model.items()
+        }
+    }
+
+def rescore_cases(
+    comparison_results: List[Dict[str, Any]],
+    similarity_threshold: int,
+    buckets: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """Per-case categories under a new scheme; judge errors keep their "error" category"""
+    buckets = resolve_buckets(buckets, similarity_threshold)
+    return [
+        {
+            "case_id": comparison_result.get("case_id"),
+            "model_key": comparison_result.get("model_key"),
+            "similarity_score": comparison_result.get("similarity_score", 0),
+            "similarity_category": (
+                "error" if comparison_result.get("similarity_category") == "error"
+                else categorize(comparison_result.get("similarity_score", 0), buckets)
+            )
+        }
+        for comparison_result in comparison_results
+    ]
@@ -0,0 +1,149 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Ten equal-width score bins; the last one includes 100
+HISTOGRAM_EDGES = np.linspace(0, 100, 11)
+PERCENTILES = [5, 25, 50, 75, 90, 95, 99]
+
+BOOTSTRAP_SAMPLES = int(os.environ.get("STATS_BOOTSTRAP_SAMPLES", "2000"))
+BOOTSTRAP_CONFIDENCE = float(os.environ.get("STATS_BOOTSTRAP_CONFIDENCE", "0.95"))
+
+# Bootstrap draw counts held in memory at once
+BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000
+
+# Slice label for cases that lack the slicing field
+MISSING_SLICE = "(none)"
+
+def bootstrap_mean_intervals(
+    sorted_scores: np.ndarray,
+    group_of: np.ndarray,
+    counts: np.ndarray,
+    rng: np.random.Generator,
+    samples: int = BOOTSTRAP_SAMPLES,
+    confidence: float = BOOTSTRAP_CONFIDENCE
+) -> np.ndarray:
+    """Percentile bootstrap intervals for the mean of every group at once, shape (groups, 2).
+
+    Resampling a group with replacement only changes how often each of its values
+    is drawn, so each replicate is a multinomial draw over the group's value counts.
+    Judge scores take at most 101 values, which keeps the cost independent of run size.
+    """
+    values, value_index = np.unique(sorted_scores, return_inverse=True)
+    frequencies = np.bincount(
+        group_of * len(values) + value_index.ravel(), minlength=len(counts) * len(values)
+    ).reshape(len(counts), len(values))
+    probabilities = frequencies / counts[:, None]
+    rows_per_chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // (len(counts) * len(values)))
+    means = np.concatenate([
+        rng.multinomial(counts, probabilities, size=(min(rows_per_chunk, samples - start), len(counts))) @ values / counts
+        for start in range(0, samples, rows_per_chunk)
+    ])
+    tail = (1 - confidence) / 2 * 100
+    return np.percentile(means, [tail, 100 - tail], axis=0).T
+
+def describe_groups(scores: np.ndarray, members: List[np.ndarray], rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Distribution of each group of scores (indices into scores), computed in one vectorized pass"""
+    counts = np.array([len(indices) for indices in members], dtype=int)
+    group_of = np.repeat(np.arange(len(members)), counts)
+    # Sort by group, then score, so each group is a contiguous sorted run
+    flat = scores[np.concatenate(members)]
+    order = np.lexsort((flat, group_of))
+    sorted_scores, group_of = flat[order], group_of[order]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(int)
+
+    means = np.bincount(group_of, weights=sorted_scores, minlength=len(members)) / counts
+    squared = np.bincount(group_of, weights=(sorted_scores - means[group_of]) ** 2, minlength=len(members))
+    variances = np.where(counts > 1, squared / np.maximum(counts - 1, 1), 0.0)
+
+    # Linear-interpolated percentiles, as np.percentile computes them
+    positions = np.array(PERCENTILES) / 100 * (counts[:, None] - 1)
+    below = np.floor(positions).astype(int)
+    above = np.minimum(below + 1, counts[:, None] - 1)
+    low_values = sorted_scores[starts[:, None] + below]
+    percentiles = low_values + (positions - below) * (sorted_scores[starts[:, None] + above] - low_values)
+
+    # The last bin includes 100, as in np.histogram
+    bins = np.clip(np.searchsorted(HISTOGRAM_EDGES, sorted_scores, side="right") - 1, 0, len(HISTOGRAM_EDGES) - 2)
+    histograms = np.bincount(
+        group_of * (len(HISTOGRAM_EDGES) - 1) + bins, minlength=len(members) * (len(HISTOGRAM_EDGES) - 1)
+    ).reshape(len(members), len(HISTOGRAM_EDGES) - 1)
+
+    intervals = bootstrap_mean_intervals(sorted_scores, group_of, counts, rng)
+    ends = starts + counts - 1
+    return [
+        {
+            "count": int(counts[group]),
+            "mean": float(means[group]),
+            "variance": float(variances[group]),
+            "std": float(np.sqrt(variances[group])),
+            "min": float(sorted_scores[starts[group]]),
+            "max": float(sorted_scores[ends[group]]),
+            "percentiles": {f"p{p}": float(value) for p, value in zip(PERCENTILES, percentiles[group])},
+            "histogram": [
+                {"low": float(low), "high": float(high), "count": int(count)}
+                for low, high, count in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:], histograms[group])
+            ],
+            "mean_interval": [float(intervals[group][0]), float(intervals[group][1])],
+            "confidence": BOOTSTRAP_CONFIDENCE
+        }
+        for group in range(len(members))
+    ]
+
+def field_value(record: Dict[str, Any], field: str) -> Any:
+    value: Any = record
+    for part in field.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+def slice_labels(comparison_result: Dict[str, Any], execution_result: Dict[str, Any], field: str) -> List[str]:
+    """Labels of the slices a case belongs to for field; list values (tags) put it in several"""
+    value = field_value(comparison_result, field)
+    if value is None:
+        value = field_value(execution_result.get("case_metadata") or {}, field)
+    if value is None:
+        value = field_value(execution_result, field)
+    if value is None or value == []:
+        return [MISSING_SLICE]
+    return [str(item) for item in value] if isinstance(value, list) else [str(value)]
+
+def compute_score_statistics(
+    comparison_results: List[Dict[str, Any]],
+    execution_results: Optional[List[Dict[str, Any]]] = None,
+    slice_fields: Sequence[str] = (),
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Score distribution for a run, overall and broken down by model_key and each slice field.
+
+    Slice fields are looked up on the comparison result, then in the case's dataset
+    fields (case_metadata, dotted paths allowed), then on the execution result.
+    """
+    rng = np.random.default_rng(seed)
+    scores = np.array([comparison_result.get("similarity_score", 0) for comparison_result in comparison_results], dtype=float)
+    fields = list(dict.fromkeys(["model_key", *slice_fields]))
+    slices: Dict[str, Dict[str, Any]] = {field: {} for field in fields}
+    if len(scores) == 0:
+        return {"overall": {"count": 0}, "slices": slices, "seed": seed}
+    executions_by_id = {result["case_id"]: result for result in execution_results or []}
+
+    # Every slice of every field, plus the whole run, is one group described in a single pass
+    groups: List[Tuple[Optional[str], Optional[str], np.ndarray]] = [(None, None, np.arange(len(scores)))]
+    for field in fields:
+        members: Dict[str, List[int]] = {}
+        for index, comparison_result in enumerate(comparison_results):
+            execution_result = executions_by_id.get(comparison_result.get("case_id"), {})
+            for label in slice_labels(comparison_result, execution_result, field):
+                members.setdefault(label, []).append(index)
+        groups.extend((field, label, np.array(indices, dtype=int)) for label, indices in sorted(members.items()))
+
+    described = describe_groups(scores, [indices for _, _, indices in groups], rng)
+    for (field, label, _), stats in zip(groups[1:], described[1:]):
+        slices[field][label] = stats
+
+    return {
+        "overall": described[0],
+        "slices": slices,
+        "seed": seed
+    }
@@ -0,0 +1,152 @@
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Scorers tried when the chain is enabled without a custom order, cheapest and strictest first
+DEFAULT_SCORER_CHAIN = ["exact", "numeric", "label"]
+
+DEFAULT_NUMERIC_TOLERANCE = 1e-6
+
+# A whole answer that is one number: optional sign and currency, thousands separators, optional %
+NUMBER_PATTERN = re.compile(
+    r"(?P<sign>-)?[$€£]?(?P<digits>\d{1,3}(?:,\d{3})+|\d+)(?P<fraction>\.\d+)?\s*(?P<percent>%)?"
+)
+
+# "Classify ... as positive, negative, or neutral" style instructions name the allowed labels
+LABEL_LIST_PATTERN = re.compile(r"\bas (?:either )?((?:[\w-]+, )*[\w-]+,? or [\w-]+)", re.IGNORECASE)
+
+def normalize_answer(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = re.sub(r"[^\w\s.-]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip(" .")
+
+def parse_number(text: str) -> Optional[Tuple[float, bool]]:
+    """(value, is_percent) if the whole of text is a single number, else None.
+
+    A trailing full stop is allowed; anything else around the number (words,
+    a question mark) means the answer is not just a number.
+    """
+    match = NUMBER_PATTERN.fullmatch(text.strip().rstrip("."))
+    if not match:
+        return None
+    value = float(match.group("digits").replace(",", "") + (match.group("fraction") or ""))
+    return (-value if match.group("sign") else value), match.group("percent") is not None
+
+def infer_labels(original_query: str) -> List[str]:
+    match = LABEL_LIST_PATTERN.search(original_query)
+    if not match:
+        return []
+    return [label.lower() for label in re.split(r",\s*(?:or\s+)?|\s+or\s+", match.group(1)) if label]
+
+ScorerResult = Optional[Tuple[int, str]]
+
+def exact_scorer(original_query: str, expected: str, actual: str, options: Dict[str, Any]) -> ScorerResult:
+    """Full marks when the answers match after normalization; never confident otherwise"""
+    if expected and normalize_answer(expected) == normalize_answer(actual):
+        return 100, "Exact match after normalization"
+    return None
+
+def numeric_scorer(original_query: str, expected: str, actual: str, options: Dict[str, Any]) -> ScorerResult:
+    """Compare answers that are each exactly one number, within a relative tolerance.
+
+    When only one side is a percentage it is compared as a fraction ("50%" and
+    "0.5" match); if they then differ, the judge decides, since the notations disagree.
+    """
+    expected_number = parse_number(expected)
+    actual_number = parse_number(actual)
+    if expected_number is None or actual_number is None:
+        return None
+    (expected_value, expected_percent), (actual_value, actual_percent) = expected_number, actual_number
+    if expected_percent != actual_percent:
+        expected_value = expected_value / 100 if expected_percent else expected_value
+        actual_value = actual_value / 100 if actual_percent else actual_value
+    tolerance = float(options.get("numeric_tolerance", DEFAULT_NUMERIC_TOLERANCE))
+    if math.isclose(actual_value, expected_value, rel_tol=tolerance, abs_tol=tolerance):
+        return 100, f"Numeric answer matches {expected.strip()}"
+    if expected_percent != actual_percent:
+        return None
+    return 0, f"Numeric answer {actual.strip()} does not match {expected.strip()}"
+
+def label_scorer(original_query: str, expected: str, actual: str, options: Dict[str, Any]) -> ScorerResult:
+    """Match classification labels, from options["labels"] or the label list named in the query.
+
+    Confident only when the whole response is one of the labels; a label inside
+    a sentence ("not positive", "probably negative") is left to the judge.
+    """
+    labels = [label.lower() for label in options.get("labels") or infer_labels(original_query)]
+    expected_label = normalize_answer(expected)
+    actual_label = normalize_answer(actual)
+    if expected_label not in labels or actual_label not in labels:
+        return None
+    if actual_label == expected_label:
+        return 100, f"Label matches '{expected_label}'"
+    return 0, f"Label '{actual_label}' does not match '{expected_label}'"
+
+def regex_scorer(original_query: str, expected: str, actual: str, options: Dict[str, Any]) -> ScorerResult:
+    """Pull the answer out of the response with options["regex_patterns"] and compare it exactly.
+
+    Each pattern must have an "answer" named group; the first pattern that matches decides.
+    """
+    for pattern in options.get("regex_patterns", []):
+        match = re.search(pattern, actual, re.IGNORECASE)
+        if match and match.group("answer") is not None:
+            answer = match.group("answer")
+            if normalize_answer(answer) == normalize_answer(expected):
+                return 100, f"Extracted answer '{answer}' matches"
+            return 0, f"Extracted answer '{answer}' does not match '{expected.strip()}'"
+    return None
+
+SCORERS: Dict[str, Callable[[str, str, str, Dict[str, Any]], ScorerResult]] = {
+    "exact": exact_scorer,
+    "numeric": numeric_scorer,
+    "label": label_scorer,
+    "regex": regex_scorer
+}
+
+class ScorerChain:
+    """Deterministic scorers tried in order before falling back to the LLM judge.
+
+    Opt-in through the "scorers" setting. The first scorer that is confident
+    decides the case. Counts how many cases each scorer decided and how many
+    needed the judge.
+    """
+
+    def __init__(self, names: List[str], options: Optional[Dict[str, Any]] = None):
+        unknown = [name for name in names if name not in SCORERS]
+        if unknown:
+            raise ValueError(f"Unknown scorer(s) {', '.join(unknown)}, expected any of: {', '.join(SCORERS)}")
+        self.names = names
+        self.options = options or {}
+        self.hits = {name: 0 for name in names}
+        self.judge_fallbacks = 0
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> Optional["ScorerChain"]:
+        config = settings.get("scorers", False)
+        if not config:
+            return None
+        if config is True:
+            return cls(list(DEFAULT_SCORER_CHAIN))
+        chain = config.get("chain", DEFAULT_SCORER_CHAIN + (["regex"] if config.get("regex_patterns") else []))
+        return cls(list(chain), config)
+
+    def score(self, original_query: str, expected: str, actual: str) -> Optional[Dict[str, Any]]:
+        """The first confident verdict as {"similarity_score", "judge_reasoning", "scored_by"}, or None"""
+        for name in self.names:
+            verdict = SCORERS[name](original_query, expected, actual, self.options)
+            if verdict is not None:
+                self.hits[name] += 1
+                similarity_score, reasoning = verdict
+                return {"similarity_score": similarity_score, "judge_reasoning": reasoning, "scored_by": name}
+        self.judge_fallbacks += 1
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        decided = sum(self.hits.values())
+        total = decided + self.judge_fallbacks
+        return {
+            "chain": self.names,
+            "hits": dict(self.hits),
+            "judge_fallbacks": self.judge_fallbacks,
+            "fast_path_rate": decided / total if total > 0 else 0
+        }
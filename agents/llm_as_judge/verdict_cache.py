@@ -0,0 +1,62 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+from agents.common.response_cache import CacheSession, ResponseCache
+
+VERDICT_CACHE_MAX_ENTRIES = int(os.environ.get("VERDICT_CACHE_MAX_ENTRIES", "10000"))
+VERDICT_CACHE_MAX_BYTES = int(os.environ.get("VERDICT_CACHE_MAX_BYTES", str(10 * 1024 * 1024)))
+VERDICT_CACHE_TTL_SECONDS = int(os.environ.get("VERDICT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# KV namespace holding the persistent tier
+VERDICT_CACHE_NAMESPACE = "eval_verdict_cache"
+
+def verdict_cache_key(
+    judge_model: str,
+    prompt_version: int,
+    original_query: str,
+    expected_response: str,
+    model_response: str
+) -> str:
+    """Content hash of everything that determines a verdict"""
+    keyed = {
+        "judge_model": judge_model,
+        "prompt_version": prompt_version,
+        "original_query": original_query,
+        "expected_response": expected_response,
+        "model_response": model_response
+    }
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True).encode("utf-8")).hexdigest()
+
+_verdict_cache: Optional[ResponseCache] = None
+
+def get_verdict_cache() -> ResponseCache:
+    """Return the process-wide judge verdict cache"""
+    global _verdict_cache
+    if _verdict_cache is None:
+        _verdict_cache = ResponseCache(
+            VERDICT_CACHE_NAMESPACE, VERDICT_CACHE_MAX_ENTRIES, VERDICT_CACHE_MAX_BYTES, VERDICT_CACHE_TTL_SECONDS
+        )
+    return _verdict_cache
+
+class VerdictCacheSession(CacheSession):
+    """Applies one run's verdict cache policy and counts hits and misses.
+
+    Verdicts are looked up by verdict_cache_key() and every one is cacheable;
+    policies match the response cache.
+    """
+
+    policy_setting = "verdict_cache_policy"
+
+    def __init__(self, policy: str = "use", cache: Optional[ResponseCache] = None):
+        super().__init__(policy, cache=cache or get_verdict_cache())
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "VerdictCacheSession":
+        return cls(settings.get("verdict_cache_policy", "use"))
+
+    def cache_key(self, key: str) -> str:
+        return key
+
+    def is_cacheable(self, key: str) -> bool:
+        return self.policy != "bypass"
@@ -0,0 +1,95 @@
+from typing import Any, Dict, List, Tuple
+from anthropic.types import Message
+
+# The judge must answer through these tools, so every reply is a structured object rather than free text
+JUDGE_TOOL = {
+    "name": "record_verdict",
+    "description": "Record the similarity verdict for the case.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "similarity_score": {"type": "integer", "minimum": 0, "maximum": 100},
+            "reasoning": {"type": "string", "description": "Brief explanation of the score"}
+        },
+        "required": ["similarity_score", "reasoning"]
+    }
+}
+
+GROUP_JUDGE_TOOL = {
+    "name": "record_verdicts",
+    "description": "Record one similarity verdict per case, identified by its case id.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "verdicts": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "similarity_score": {"type": "integer", "minimum": 0, "maximum": 100},
+                        "reasoning": {"type": "string", "description": "Brief explanation of the score"}
+                    },
+                    "required": ["id", "similarity_score", "reasoning"]
+                }
+            }
+        },
+        "required": ["verdicts"]
+    }
+}
+
+class MalformedVerdictError(ValueError):
+    """The judge reply did not contain a verdict matching the schema"""
+
+def tool_params(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """messages.create parameters forcing the judge to answer with tool"""
+    return {"tools": [tool], "tool_choice": {"type": "tool", "name": tool["name"]}}
+
+def tool_input(message: Message, tool: Dict[str, Any]) -> Dict[str, Any]:
+    for block in message.content:
+        if block.type == "tool_use" and block.name == tool["name"]:
+            if not isinstance(block.input, dict):
+                raise MalformedVerdictError(f"{tool['name']} input is not an object")
+            return block.input
+    raise MalformedVerdictError(f"Reply has no {tool['name']} call (stop_reason: {message.stop_reason})")
+
+def validate_verdict(verdict: Any) -> Tuple[int, str]:
+    """Check one verdict object against the schema and return (score, reasoning)"""
+    if not isinstance(verdict, dict):
+        raise MalformedVerdictError("Verdict is not an object")
+    score = verdict.get("similarity_score")
+    if isinstance(score, float) and score.is_integer():
+        score = int(score)
+    if isinstance(score, bool) or not isinstance(score, int) or not 0 <= score <= 100:
+        raise MalformedVerdictError(f"similarity_score must be an integer from 0 to 100, got {score!r}")
+    reasoning = verdict.get("reasoning")
+    if not isinstance(reasoning, str) or not reasoning.strip():
+        raise MalformedVerdictError("reasoning must be a non-empty string")
+    return score, reasoning.strip()
+
+def extract_verdict(message: Message) -> Tuple[int, str]:
+    """The validated (score, reasoning) from a single-case judge reply; raises MalformedVerdictError"""
+    return validate_verdict(tool_input(message, JUDGE_TOOL))
+
+def extract_group_verdicts(message: Message, case_ids: List[str]) -> Tuple[Dict[str, Tuple[int, str]], List[str]]:
+    """Validated verdicts by case ID from a multi-case reply, plus the requested IDs without one.
+
+    Entries for unknown IDs, repeated IDs and entries failing validation are dropped.
+    """
+    try:
+        entries = tool_input(message, GROUP_JUDGE_TOOL).get("verdicts")
+    except MalformedVerdictError:
+        entries = None
+
+    verdicts: Dict[str, Tuple[int, str]] = {}
+    requested = set(case_ids)
+    for entry in entries if isinstance(entries, list) else []:
+        case_id = entry.get("id") if isinstance(entry, dict) else None
+        if case_id not in requested or case_id in verdicts:
+            continue
+        try:
+            verdicts[case_id] = validate_verdict(entry)
+        except MalformedVerdictError:
+            continue
+
+    return verdicts, [case_id for case_id in case_ids if case_id not in verdicts]
@@ -1,7 +1,5 @@
 from agentuity import AgentRequest, AgentResponse, AgentContext
-from anthropic import AsyncAnthropic
-
-client = AsyncAnthropic()
+from agents.common.http_clients import get_anthropic_client
 
 def welcome():  
     return {  
@@ -19,7 +17,7 @@ def welcome():
     }
 
 async def run(request: AgentRequest, response: AgentResponse, context: AgentContext):
-    result = await client.messages.create(
+    result = await get_anthropic_client().messages.create(
         max_tokens=1024,
         messages=[
             {
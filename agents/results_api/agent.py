@@ -3,6 +3,9 @@ import json
 import os
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+from agents.common.scheduler import get_scheduler
+from agents.llm_as_judge.rescoring import rescore_cases, summarize_scores
+from agents.llm_as_judge.score_stats import compute_score_statistics
 
 def welcome():
     return {
@@ -42,6 +45,27 @@ def welcome():
                 "operation": "get_dataset_preview",
                 "description": "Get preview of dataset contents",
                 "example": {"operation": "get_dataset_preview", "filename": "superhero_powers.json", "max_items": 3}
+            },
+            {
+                "operation": "get_scheduler_status",
+                "description": "Queue depth, in-flight calls and wait times per running evaluation",
+                "example": {"operation": "get_scheduler_status"}
+            },
+            {
+                "operation": "get_evaluation_statistics",
+                "description": "Score distribution, percentiles, histogram, bootstrap interval and per-slice breakdowns for an evaluation",
+                "example": {"operation": "get_evaluation_statistics", "evaluation_id": "eval_001"}
+            },
+            {
+                "operation": "rescore_evaluation",
+                "description": "Recompute categories and rates from stored judge scores for another threshold or bucketing, without re-judging",
+                "example": {
+                    "operation": "rescore_evaluation",
+                    "evaluation_id": "eval_001",
+                    "similarity_threshold": 70,
+                    "buckets": [{"name": "pass", "min": 70}, {"name": "borderline", "min": 40}, {"name": "fail", "min": 0}],
+                    "include_cases": False
+                }
             }
         ]
     }
@@ -105,11 +129,28 @@ async def run(request: AgentRequest, response: AgentResponse, context: AgentCont
                 result = {"error": "Missing required field: filename", "status": "error"}
             else:
                 result = await handle_get_dataset_preview(filename, max_items, context)
+        elif operation == "get_scheduler_status":
+            result = await handle_get_scheduler_status(context)
+        elif operation == "get_evaluation_statistics":
+            evaluation_id = data.get("evaluation_id")
+            if not evaluation_id:
+                result = {"error": "Missing required field: evaluation_id", "status": "error"}
+            else:
+                result = await handle_get_evaluation_statistics(evaluation_id, context)
+        elif operation == "rescore_evaluation":
+            evaluation_id = data.get("evaluation_id")
+            if not evaluation_id:
+                result = {"error": "Missing required field: evaluation_id", "status": "error"}
+            else:
+                result = await handle_rescore_evaluation(
+                    evaluation_id, data.get("similarity_threshold"), data.get("buckets"),
+                    bool(data.get("include_cases", False)), context
+                )
         else:
             result = {
                 "error": "Unknown operation",
                 "operation": operation,
-                "available_operations": ["test", "list_evaluations", "get_evaluation_details", "get_evaluation_cases", "debug_kv_store", "list_datasets", "get_dataset_preview"],
+                "available_operations": ["test", "list_evaluations", "get_evaluation_details", "get_evaluation_cases", "debug_kv_store", "list_datasets", "get_dataset_preview", "get_scheduler_status", "get_evaluation_statistics", "rescore_evaluation"],
                 "status": "error"
             }
         
@@ -181,6 +222,19 @@ async def handle_list_evaluations(context: AgentContext) -> Dict[str, Any]:
                                     "highSimilarityRate": summary.get("high_similarity_rate", 0)
                                 }
                             
+                            # Add spend if the run has recorded any
+                            if "cost_summary" in metadata:
+                                cost = metadata["cost_summary"]
+                                evaluation_summary["cost"] = {
+                                    "executionCost": cost.get("execution_cost", 0),
+                                    "judgeCost": cost.get("judge_cost", 0),
+                                    "totalCost": cost.get("total_cost", 0),
+                                    "budget": cost.get("budget"),
+                                    "budgetExhausted": cost.get("budget_exhausted", False),
+                                    "skippedCases": cost.get("skipped_cases", 0),
+                                    "earlyStoppedCases": cost.get("early_stopped_cases", 0)
+                                }
+                            
                             evaluations.append(evaluation_summary)
                             
                     except Exception as e:
@@ -412,4 +466,90 @@ async def handle_debug_kv_store(context: AgentContext) -> Dict[str, Any]:
         return {
             "error": f"Failed to debug KV store: {str(e)}",
             "status": "error"
-        } 
\ No newline at end of file
+        } 
+
+async def handle_get_scheduler_status(context: AgentContext) -> Dict[str, Any]:
+    """Live view of the model-call scheduler shared by evaluations in this process"""
+    scheduler_stats = get_scheduler().stats()
+    context.logger.info("Scheduler status: %d in flight, %d queued", scheduler_stats["in_flight"], scheduler_stats["queue_depth"])
+    return {
+        "scheduler": scheduler_stats,
+        "status": "success"
+    }
+
+async def handle_get_evaluation_statistics(evaluation_id: str, context: AgentContext) -> Dict[str, Any]:
+    """Serve the statistics stored with an evaluation's comparison record"""
+    try:
+        comparison_result = await context.kv.get("eval_comparison", f"eval_run_{evaluation_id}_comparison")
+        if not comparison_result.data:
+            return {
+                "error": f"Comparison results not found for evaluation: {evaluation_id}",
+                "status": "error"
+            }
+        
+        comparison_data = await comparison_result.data.json()
+        statistics = comparison_data.get("statistics")
+        computed = statistics is None
+        if computed:
+            # Evaluations judged before statistics were stored; only model_key slices are available
+            statistics = compute_score_statistics(comparison_data.get("comparison_results", []))
+        
+        return {
+            "evaluation_id": evaluation_id,
+            "statistics": statistics,
+            "computed_on_request": computed,
+            "status": "success"
+        }
+        
+    except Exception as e:
+        context.logger.error("Error getting statistics for %s: %s", evaluation_id, str(e))
+        return {
+            "error": f"Failed to get evaluation statistics: {str(e)}",
+            "status": "error"
+        }
+
+async def handle_rescore_evaluation(
+    evaluation_id: str,
+    similarity_threshold: Optional[int],
+    buckets: Optional[List[Dict[str, Any]]],
+    include_cases: bool,
+    context: AgentContext
+) -> Dict[str, Any]:
+    """Recompute an evaluation's summary from its stored raw judge scores"""
+    try:
+        comparison_result = await context.kv.get("eval_comparison", f"eval_run_{evaluation_id}_comparison")
+        if not comparison_result.data:
+            return {
+                "error": f"Comparison results not found for evaluation: {evaluation_id}",
+                "status": "error"
+            }
+        
+        comparison_data = await comparison_result.data.json()
+        comparison_results = comparison_data.get("comparison_results", [])
+        if similarity_threshold is None:
+            similarity_threshold = comparison_data.get("similarity_threshold", 80)
+        similarity_threshold = int(similarity_threshold)
+        
+        rescored = {
+            "evaluation_id": evaluation_id,
+            "summary": summarize_scores(comparison_results, similarity_threshold, buckets),
+            "status": "success"
+        }
+        if include_cases:
+            rescored["cases"] = rescore_cases(comparison_results, similarity_threshold, buckets)
+        
+        context.logger.info("Rescored %d cases for evaluation %s at threshold %s",
+                          len(comparison_results), evaluation_id, similarity_threshold)
+        return rescored
+        
+    except ValueError as e:
+        return {
+            "error": f"Invalid rescoring parameters: {str(e)}",
+            "status": "error"
+        }
+    except Exception as e:
+        context.logger.error("Error rescoring evaluation %s: %s", evaluation_id, str(e))
+        return {
+            "error": f"Failed to rescore evaluation: {str(e)}",
+            "status": "error"
+        }
@@ -1,7 +1,9 @@
 from agentuity import AgentRequest, AgentResponse, AgentContext
 import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from agents.common.settings import get_run_settings
+from agents.common.sharding import DEFAULT_SHARD_SIZE, publish_shards
 
 async def run(request: AgentRequest, response: AgentResponse, context: AgentContext):
     try:
@@ -46,19 +48,26 @@ async def run(request: AgentRequest, response: AgentResponse, context: AgentCont
         
         context.logger.info("Processing %d cases with template: %s", len(dataset), template_string[:50] + "...")
         
+        # The text before the first variable is identical for every case and can be cached by the model
+        prompt_prefix, template_body = split_template(template_string)
+        
         # Process each case in the dataset
         processed_cases = []
         for i, case in enumerate(dataset):
             try:
-                # Substitute variables in template
-                processed_prompt = substitute_template_variables(template_string, case, variables)
+                # Substitute variables in the per-case part of the template
+                prompt_suffix = substitute_template_variables(template_body, case, variables)
                 
                 processed_case = {
                     "case_id": f"{evaluation_id}_case_{i}",
                     "original_query": case["query"],
                     "expected_response": case["response"],
-                    "processed_prompt": processed_prompt,
-                    "template_variables": {var: case.get(var, "") for var in variables}
+                    "processed_prompt": prompt_prefix + prompt_suffix,
+                    "prompt_prefix": prompt_prefix,
+                    "prompt_suffix": prompt_suffix,
+                    "template_variables": {var: case.get(var, "") for var in variables},
+                    # Remaining dataset fields (categories, tags, ...) for slicing results
+                    "case_metadata": {key: value for key, value in case.items() if key not in ("query", "response")}
                 }
                 
                 processed_cases.append(processed_case)
@@ -77,17 +86,29 @@ async def run(request: AgentRequest, response: AgentResponse, context: AgentCont
             "processed_cases": processed_cases,
             "template_info": {
                 "original_template": template_string,
-                "variables": variables
+                "variables": variables,
+                "prompt_prefix": prompt_prefix
             }
         })
         
         # Update metadata
         eval_metadata_key = f"eval_run_{evaluation_id}_metadata"
         metadata_result = await context.kv.get("eval_metadata", eval_metadata_key)
-        if metadata_result:
-            metadata = await metadata_result.data.json()
+        metadata = await metadata_result.data.json() if metadata_result.data else None
+        settings = get_run_settings(data, metadata)
+        
+        # Large evaluations can be split into shards that several runner workers claim
+        shard_manifest = None
+        if settings.get("sharded"):
+            shard_manifest = await publish_shards(
+                evaluation_id, processed_cases, settings.get("shard_size", DEFAULT_SHARD_SIZE), context
+            )
+        
+        if metadata:
             metadata["status"] = "templates_processed"
             metadata["processed_cases"] = len(processed_cases)
+            if shard_manifest:
+                metadata["shard_count"] = shard_manifest["shard_count"]
             await context.kv.set("eval_metadata", eval_metadata_key, metadata)
         
         context.logger.info("Successfully processed %d cases for evaluation: %s", len(processed_cases), evaluation_id)
@@ -105,6 +126,15 @@ async def run(request: AgentRequest, response: AgentResponse, context: AgentCont
             "error": f"Failed to process templates: {str(e)}"
         })
 
+def split_template(template: str) -> Tuple[str, str]:
+    """Split a template into its static prefix (everything before the first variable) and the rest"""
+    
+    first_variable = re.search(r'\{\{\w+\}\}', template)
+    if not first_variable:
+        return "", template
+    
+    return template[:first_variable.start()], template[first_variable.start():]
+
 def substitute_template_variables(template: str, case_data: Dict[str, Any], variables: List[str]) -> str:
     """Substitute variables in template string with values from case data"""
     
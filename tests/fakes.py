@@ -0,0 +1,40 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+
+class FakeData:
+    def __init__(self, value: Any):
+        self.value = value
+
+    async def json(self) -> Any:
+        return json.loads(json.dumps(self.value))
+
+class FakeDataResult:
+    def __init__(self, value: Any):
+        self.data = FakeData(value) if value is not None else None
+        self.exists = self.data is not None
+
+class FakeKeyValue:
+    """In-memory context.kv; like the SDK, deleting a key that does not exist raises"""
+
+    def __init__(self):
+        self.store: Dict[Tuple[str, str], Any] = {}
+
+    async def get(self, name: str, key: str) -> FakeDataResult:
+        return FakeDataResult(self.store.get((name, key)))
+
+    async def set(self, name: str, key: str, value: Any, params: Optional[Dict[str, Any]] = None):
+        self.store[(name, key)] = json.loads(json.dumps(value))
+
+    async def delete(self, name: str, key: str):
+        if (name, key) not in self.store:
+            raise Exception("Failed to delete key value: 404")
+        del self.store[(name, key)]
+
+class FakeLogger:
+    def __getattr__(self, level: str):
+        return lambda *args, **kwargs: None
+
+class FakeContext:
+    def __init__(self, kv: Optional[FakeKeyValue] = None):
+        self.kv = kv or FakeKeyValue()
+        self.logger = FakeLogger()
@@ -0,0 +1,36 @@
+import asyncio
+from anthropic import AsyncAnthropic
+from agents.common.batches import batch_custom_id, run_message_batches
+from agents.common.fake_batch_server import start_fake_batch_server
+
+def test_batch_round_trip_against_the_fake_server():
+    def responder(params):
+        prompt = params["messages"][-1]["content"]
+        if prompt == "fail":
+            raise ValueError("Responder refused")
+        return f"echo {prompt}"
+
+    async def scenario():
+        runner = await start_fake_batch_server(port=0, responder=responder, polls_until_ended=2)
+        port = runner.addresses[0][1]
+        try:
+            client = AsyncAnthropic(api_key="test", base_url=f"http://127.0.0.1:{port}")
+            requests = {
+                case_id: {"model": "claude-3-haiku-20240307", "max_tokens": 10, "messages": [{"role": "user", "content": prompt}]}
+                for case_id, prompt in [("ev1_case_0", "hello"), ("ev1 case/1", "world"), ("ev1_case_2", "fail")]
+            }
+            return await run_message_batches(client, requests, poll_interval=0)
+        finally:
+            await runner.cleanup()
+
+    results, batch_ids = asyncio.run(scenario())
+    assert len(batch_ids) == 1
+    assert results["ev1_case_0"]["success"] and results["ev1_case_0"]["message"].content[0].text == "echo hello"
+    # Ids the API would reject travel as a hash and are mapped back
+    assert results["ev1 case/1"]["message"].content[0].text == "echo world"
+    assert results["ev1_case_2"] == {"success": False, "message": None, "error": "Responder refused"}
+
+def test_custom_ids_are_valid_for_the_api():
+    assert batch_custom_id("ev1_case_0") == "ev1_case_0"
+    hashed = batch_custom_id("ev1 case/1" + "x" * 100)
+    assert len(hashed) == 64 and hashed.isalnum()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from anthropic.types import Message, ToolUseBlock, Usage
+from agents.common.costs import CostTracker, projected_cost
+from agents.common.rate_limiter import estimate_input_tokens
+from agents.llm_as_judge import agent as judge_agent
+from agents.llm_as_judge.ensemble import JudgeEnsemble
+from agents.llm_as_judge.verdict_schema import JUDGE_TOOL
+
+class Context:
+    logger = logging.getLogger("test")
+
+SETTINGS = {"early_stopping": {}}
+
+def make_results(count):
+    return [
+        {
+            "case_id": f"case-{index}",
+            "success": True,
+            "original_query": "What is the capital of France?",
+            "expected_response": "Paris",
+            "model_response": "It is Paris"
+        }
+        for index in range(count)
+    ]
+
+def install_fake_judge(monkeypatch, scores):
+    """Judge calls cost exactly their projected cost; scores maps judge model to its verdict"""
+    calls = []
+
+    async def fake_create_message(client, hedging=None, call_kind="default", **params):
+        calls.append(params["model"])
+        message = Message(
+            id="msg_test",
+            type="message",
+            role="assistant",
+            model=params["model"],
+            content=[ToolUseBlock(
+                type="tool_use", id="toolu_test", name=JUDGE_TOOL["name"],
+                input={"similarity_score": scores[params["model"]], "reasoning": "Judged"}
+            )],
+            stop_reason="tool_use",
+            stop_sequence=None,
+            usage=Usage(input_tokens=estimate_input_tokens(params), output_tokens=params["max_tokens"])
+        )
+        return message, {"attempts": 1, "hedged": False, "hedge_won": False}
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(judge_agent, "create_message", fake_create_message)
+    return calls
+
+def judge_call_cost(judge_model):
+    return projected_cost(judge_agent.build_judge_params(
+        judge_agent.build_judge_prompt(*judge_agent.judge_inputs(make_results(1)[0])), judge_model
+    ))
+
+def test_reservations_stop_at_the_budget():
+    async def scenario():
+        tracker = CostTracker(budget=1.0, spent=0.5)
+        assert await tracker.reserve(0.3)
+        assert not await tracker.reserve(0.3, wait=False)
+        assert tracker.exhausted
+        await tracker.settle(0.3, 0.1)
+        assert not await tracker.reserve(0.01)
+
+    asyncio.run(scenario())
+
+def test_judging_stops_once_the_budget_is_spent(monkeypatch):
+    judge_model = judge_agent.DEFAULT_JUDGE_MODEL
+    calls = install_fake_judge(monkeypatch, {judge_model: 90})
+    execution_cost = 1.0
+    # Execution already spent most of the budget; two judge calls still fit, a third does not
+    tracker = CostTracker(budget=execution_cost + 2.5 * judge_call_cost(judge_model), spent=execution_cost)
+
+    comparison_results = asyncio.run(judge_agent.judge_cases_concurrently(
+        make_results(5), judge_model, 80, Context(), 1, None, SETTINGS, cost_tracker=tracker
+    ))
+    assert [comparison_result["case_id"] for comparison_result in comparison_results] == ["case-0", "case-1"]
+    assert len(calls) == 2
+    assert tracker.exhausted
+    assert tracker.spent <= tracker.budget
+
+def test_ensemble_escalation_is_bounded_by_the_budget(monkeypatch):
+    cheap, mid, escalation = "claude-3-haiku-20240307", "claude-3-5-haiku-latest", "claude-sonnet-4-20250514"
+    # The cheap judges disagree, so the case would escalate to the larger model
+    calls = install_fake_judge(monkeypatch, {cheap: 10, mid: 90, escalation: 50})
+    ensemble = JudgeEnsemble([cheap, mid], escalation_model=escalation)
+    tracker = CostTracker(budget=judge_call_cost(cheap) + judge_call_cost(mid) + judge_call_cost(escalation) / 2)
+
+    comparison_results = asyncio.run(judge_agent.judge_cases_concurrently(
+        make_results(3), ", ".join(ensemble.judges), 80, Context(), 1, None, SETTINGS, ensemble=ensemble,
+        cost_tracker=tracker
+    ))
+    # The first case is scored from its cheap judges; the rest cannot afford even those
+    assert [comparison_result["case_id"] for comparison_result in comparison_results] == ["case-0"]
+    assert comparison_results[0]["similarity_score"] == 50
+    assert comparison_results[0]["ensemble"]["escalated"] is False
+    assert escalation not in calls
+    assert tracker.spent <= tracker.budget
+
+def install_fake_execution(monkeypatch, cost):
+    from agents.evaluation_runner import agent as runner_agent
+
+    async def fake_execute_single_case(case, context, cache_session=None, hedging=None):
+        return {"case_id": case["case_id"], "success": True, "cost": cost}
+
+    monkeypatch.setattr(runner_agent, "execute_single_case", fake_execute_single_case)
+    monkeypatch.setattr(runner_agent, "projected_cost", lambda params, batch=False: cost)
+    return runner_agent
+
+def make_cases(count):
+    return [{"case_id": f"case-{index}", "processed_prompt": "What is the capital of France?"} for index in range(count)]
+
+def test_budget_skips_count_only_cases_the_budget_refused(monkeypatch):
+    runner_agent = install_fake_execution(monkeypatch, 1.0)
+    tracker = CostTracker(budget=3.5)
+    results = asyncio.run(runner_agent.execute_pending_cases(
+        make_cases(10), "concurrent", 1, Context(), None, None, cost_tracker=tracker
+    ))
+    assert len(results) == 3
+    assert tracker.skipped == 7
+
+def test_early_stopped_cases_are_not_budget_skips(monkeypatch):
+    runner_agent = install_fake_execution(monkeypatch, 1.0)
+    tracker = CostTracker(budget=100.0)
+    done = []
+
+    async def on_result(case_result):
+        done.append(case_result)
+
+    results = asyncio.run(runner_agent.execute_pending_cases(
+        make_cases(10), "concurrent", 1, Context(), None, None,
+        on_result=on_result, should_stop=lambda: len(done) >= 4, cost_tracker=tracker
+    ))
+    assert len(results) == 4
+    assert tracker.skipped == 0
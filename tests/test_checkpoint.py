@@ -0,0 +1,52 @@
+import asyncio
+from agents.evaluation_runner.checkpoint import RunCheckpoint, run_fingerprint
+from tests.fakes import FakeContext
+
+PROCESSED = {
+    "template_info": {"original_template": "Answer: {{query}}"},
+    "processed_cases": [
+        {"case_id": f"ev1_case_{i}", "original_query": f"q{i}", "expected_response": f"a{i}", "processed_prompt": f"Answer: q{i}"}
+        for i in range(5)
+    ]
+}
+MODELS = [{"model_name": "claude-3-haiku-20240307", "max_tokens": 100, "temperature": 0.0, "model_key": "haiku"}]
+
+async def write_checkpoint(context: FakeContext, fingerprint: str, cases: int):
+    checkpoint = RunCheckpoint("ev1", context, chunk_size=2, fingerprint=fingerprint)
+    for i in range(cases):
+        await checkpoint.record({"case_id": f"ev1_case_{i}", "success": True})
+    await checkpoint.record({"case_id": "ev1_case_failed", "success": False})
+    await checkpoint.flush()
+
+def test_resume_returns_successful_cases():
+    async def scenario():
+        context = FakeContext()
+        fingerprint = run_fingerprint(PROCESSED, MODELS)
+        await write_checkpoint(context, fingerprint, 3)
+        completed = await RunCheckpoint("ev1", context, chunk_size=2, fingerprint=fingerprint).load()
+        assert sorted(completed) == ["ev1_case_0", "ev1_case_1", "ev1_case_2"]
+
+    asyncio.run(scenario())
+
+def test_checkpoint_discarded_when_the_run_changed():
+    changed_template = dict(PROCESSED, template_info={"original_template": "Reply to: {{query}}"})
+    changed_models = [dict(MODELS[0], temperature=1.0)]
+    changed_dataset = dict(PROCESSED, processed_cases=[
+        dict(case, expected_response="new") for case in PROCESSED["processed_cases"]
+    ])
+    original = run_fingerprint(PROCESSED, MODELS)
+    for fingerprint in (
+        run_fingerprint(changed_template, MODELS),
+        run_fingerprint(PROCESSED, changed_models),
+        run_fingerprint(changed_dataset, MODELS)
+    ):
+        assert fingerprint != original
+
+        async def scenario():
+            context = FakeContext()
+            await write_checkpoint(context, original, 3)
+            assert await RunCheckpoint("ev1", context, fingerprint=fingerprint).load() == {}
+            # The stale chunks and index are gone, so they cannot be resumed later either
+            assert context.kv.store == {}
+
+        asyncio.run(scenario())
@@ -0,0 +1,58 @@
+import asyncio
+import random
+from agents.common.concurrency import GLOBAL_MAX_CONCURRENCY, resolve_max_concurrency, run_bounded
+
+def test_results_keep_item_order_and_respect_the_limit():
+    in_flight = peak = 0
+
+    async def worker(index, item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(random.uniform(0, 0.005))
+        in_flight -= 1
+        return item * 2
+
+    results = asyncio.run(run_bounded(list(range(30)), worker, 4, lambda index, item, e: None))
+    assert results == [item * 2 for item in range(30)]
+    assert peak == 4
+
+def test_errors_become_results_without_failing_other_items():
+    async def worker(index, item):
+        if item == "bad":
+            raise ValueError("boom")
+        return item.upper()
+
+    errors = []
+
+    def on_error(index, item, e):
+        errors.append((index, str(e)))
+        return {"error": str(e)}
+
+    results = asyncio.run(run_bounded(["a", "bad", "c"], worker, 2, on_error))
+    assert results == ["A", {"error": "boom"}, "C"]
+    assert errors == [(1, "boom")]
+
+def test_no_new_items_start_once_should_stop_is_true():
+    started = []
+
+    async def worker(index, item):
+        started.append(index)
+        await asyncio.sleep(0)
+        return index
+
+    results = asyncio.run(run_bounded(list(range(10)), worker, 2, lambda *args: None, lambda: len(started) >= 4))
+    assert len(started) == 4
+    assert results[:4] == [0, 1, 2, 3] and results[4:] == [None] * 6
+
+def test_empty_input():
+    async def worker(index, item):
+        raise AssertionError("not called")
+
+    assert asyncio.run(run_bounded([], worker, 4, lambda *args: None)) == []
+
+def test_max_concurrency_is_read_from_settings_and_clamped():
+    assert resolve_max_concurrency({"max_concurrency": 3}) == 3
+    assert resolve_max_concurrency({"max_concurrency": 0}) == 1
+    assert resolve_max_concurrency({"max_concurrency": "many"}) == resolve_max_concurrency({})
+    assert resolve_max_concurrency({"max_concurrency": GLOBAL_MAX_CONCURRENCY + 100}) == GLOBAL_MAX_CONCURRENCY
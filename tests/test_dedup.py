@@ -0,0 +1,38 @@
+from agents.evaluation_runner.agent import resolve_dedup_samples
+from agents.evaluation_runner.dedup import fan_out_result, group_duplicate_cases, summarize_dedup
+
+MODEL = {"model_name": "claude-3-haiku-20240307", "max_tokens": 100, "temperature": 0.0}
+
+def case(case_id: str, prompt: str, model_config=MODEL):
+    return {"case_id": case_id, "processed_prompt": prompt, "model_config": model_config}
+
+def test_duplicates_share_one_call_per_sample():
+    cases = [
+        case("a", "What is 2+2?"),
+        case("b", "What is  2+2? "),
+        case("c", "What is 3+3?"),
+        case("d", "What is 2+2?"),
+        case("e", "What is 2+2?", dict(MODEL, temperature=1.0))
+    ]
+    to_execute, followers = group_duplicate_cases(cases)
+    assert [c["case_id"] for c in to_execute] == ["a", "c", "e"]
+    assert [c["case_id"] for c in followers["a"]] == ["b", "d"]
+
+    to_execute, followers = group_duplicate_cases(cases, samples=2)
+    assert [c["case_id"] for c in to_execute] == ["a", "b", "c", "e"]
+    assert [c["case_id"] for c in followers["a"]] == ["d"]
+
+def test_fanned_out_results_carry_their_own_case_and_no_call_cost():
+    result = {"case_id": "a", "success": True, "model_response": "4", "cost": 0.01, "usage": {"input_tokens": 5}}
+    fanned = fan_out_result(result, {"case_id": "b", "original_query": "q", "expected_response": "4"})
+    assert fanned["case_id"] == "b" and fanned["model_response"] == "4"
+    assert fanned["deduplicated_from"] == "a"
+    assert "cost" not in fanned and "usage" not in fanned
+    assert summarize_dedup([result, fanned], 1) == {
+        "samples": 1, "model_calls": 1, "deduplicated_cases": 1, "dedup_ratio": 0.5
+    }
+
+def test_dedup_is_off_unless_requested():
+    assert resolve_dedup_samples({}) is None
+    assert resolve_dedup_samples({"dedup": False, "samples": 3}) is None
+    assert resolve_dedup_samples({"dedup": True, "samples": 3}) == 3
@@ -0,0 +1,76 @@
+import asyncio
+from agents.llm_as_judge import agent as judge_agent
+from agents.llm_as_judge.ensemble import JudgeEnsemble, summarize_ensemble
+
+CHEAP, MID, PRICEY, ESCALATION = "claude-3-haiku-20240307", "claude-3-5-haiku-latest", "claude-3-opus-20240229", "claude-sonnet-4-20250514"
+
+def make_result():
+    return {
+        "case_id": "case-1",
+        "success": True,
+        "original_query": "What is 2 + 2?",
+        "expected_response": "4",
+        "model_response": "Four"
+    }
+
+def run_ensemble(monkeypatch, ensemble, verdicts):
+    """Judge one case with scripted verdicts per judge model; None stands for a failed judge"""
+    calls = []
+
+    async def fake_judge(result, judge_model, similarity_threshold, context, hedging=None, verdict_cache=None, cost_tracker=None):
+        calls.append(judge_model)
+        score = verdicts[judge_model]
+        if score is None:
+            return judge_agent.build_judge_error_result(result, "boom", judge_model)
+        return judge_agent.build_judged_result(result, score, f"{judge_model} says {score}", judge_model, 80)
+
+    monkeypatch.setattr(judge_agent, "judge_similarity_with_claude", fake_judge)
+    comparison_result = asyncio.run(judge_agent.judge_with_ensemble(make_result(), ensemble, 80, None))
+    return comparison_result, calls
+
+def test_consensus_is_the_closest_agreeing_pair():
+    ensemble = JudgeEnsemble([CHEAP, MID, PRICEY], tolerance=10)
+    assert ensemble.consensus([90, 50, 84]) == 87
+    assert ensemble.consensus([90, 50]) is None
+
+def test_a_lone_score_is_only_consensus_for_a_single_judge():
+    assert JudgeEnsemble([CHEAP, MID]).consensus([90]) is None
+    assert JudgeEnsemble([CHEAP]).consensus([90]) == 90
+    assert JudgeEnsemble([CHEAP]).consensus([]) is None
+
+def test_judges_are_ordered_by_cost():
+    assert JudgeEnsemble([PRICEY, CHEAP, MID]).judges == [CHEAP, MID, PRICEY]
+
+def test_agreeing_cheap_judges_stop_early(monkeypatch):
+    ensemble = JudgeEnsemble([CHEAP, MID, PRICEY], escalation_model=ESCALATION)
+    comparison_result, calls = run_ensemble(monkeypatch, ensemble, {CHEAP: 80, MID: 86, PRICEY: 10})
+    assert calls == [CHEAP, MID]
+    assert comparison_result["similarity_score"] == 83
+    assert comparison_result["ensemble"]["consensus"]
+
+def test_failed_judge_leaves_no_consensus_and_escalates(monkeypatch):
+    ensemble = JudgeEnsemble([CHEAP, MID], escalation_model=ESCALATION)
+    comparison_result, calls = run_ensemble(monkeypatch, ensemble, {CHEAP: 90, MID: None, ESCALATION: 40})
+    assert calls == [CHEAP, MID, ESCALATION]
+    assert comparison_result["similarity_score"] == 40
+    assert not comparison_result["ensemble"]["consensus"]
+    assert comparison_result["ensemble"]["escalated"]
+    assert comparison_result["ensemble"]["failed_judges"] == 1
+
+def test_failed_judge_calls_the_next_judge(monkeypatch):
+    ensemble = JudgeEnsemble([CHEAP, MID, PRICEY], escalation_model=None)
+    comparison_result, calls = run_ensemble(monkeypatch, ensemble, {CHEAP: 70, MID: None, PRICEY: 74})
+    assert calls == [CHEAP, MID, PRICEY]
+    assert comparison_result["similarity_score"] == 72
+    assert comparison_result["ensemble"]["consensus"]
+
+def test_disagreement_without_escalation_takes_the_median(monkeypatch):
+    ensemble = JudgeEnsemble([CHEAP, MID, PRICEY], escalation_model=None)
+    comparison_result, _ = run_ensemble(monkeypatch, ensemble, {CHEAP: 10, MID: 50, PRICEY: 95})
+    assert comparison_result["similarity_score"] == 50
+    assert not comparison_result["ensemble"]["consensus"]
+
+    summary = summarize_ensemble([comparison_result])
+    assert summary["agreement_rate"] == 0
+    assert summary["average_judges_per_case"] == 3
+    assert summary["average_spread"] == 85
@@ -0,0 +1,80 @@
+import asyncio
+from anthropic.types import Message, Usage
+from agents.common import model_client
+from agents.common.hedging import HedgeConfig, get_latency_tracker
+from agents.common.scheduler import FairScheduler
+
+class FakeClient:
+    def with_options(self, **options):
+        return self
+
+def make_message() -> Message:
+    return Message(
+        id="msg_test",
+        type="message",
+        role="assistant",
+        model="test-model",
+        content=[],
+        stop_reason="end_turn",
+        stop_sequence=None,
+        usage=Usage(input_tokens=1, output_tokens=1)
+    )
+
+def slow_tracker(model_name: str, call_kind: str):
+    """A tracker that has learned a short delay, so every call is eligible for a hedge"""
+    tracker = get_latency_tracker(model_name, call_kind)
+    tracker.latencies.extend([0.01] * 5)
+    tracker.calls = 100
+    return tracker
+
+def run_with_scheduler(monkeypatch, scheduler: FairScheduler, model_name: str):
+    params = {"model": model_name, "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+    sends = []
+
+    async def send(client):
+        sends.append(len(sends))
+        await asyncio.sleep(0.1 if len(sends) == 1 else 0)
+        return make_message(), {}, {}
+
+    monkeypatch.setattr(model_client, "get_scheduler", lambda: scheduler)
+    config = HedgeConfig(min_samples=5)
+    message, call_info = asyncio.run(
+        model_client._call_with_retries(FakeClient(), params, send, config, "execution")
+    )
+    return call_info, sends
+
+def test_hedge_skipped_when_no_scheduler_slot_is_free(monkeypatch):
+    tracker = slow_tracker("test-hedge-no-slot", "execution")
+    call_info, sends = run_with_scheduler(monkeypatch, FairScheduler(1), "test-hedge-no-slot")
+    assert len(sends) == 1
+    assert call_info["hedged"] is False
+    assert tracker.hedges == 0
+
+def test_hedge_holds_its_own_scheduler_slot(monkeypatch):
+    scheduler = FairScheduler(2)
+    tracker = slow_tracker("test-hedge-slot", "execution")
+    call_info, sends = run_with_scheduler(monkeypatch, scheduler, "test-hedge-slot")
+    assert len(sends) == 2
+    assert call_info["hedged"] is True and call_info["hedge_won"] is True
+    assert tracker.hedges == 1
+    assert scheduler.stats()["evaluations"]["unattributed"]["granted"] == 2
+    assert scheduler.in_flight == 0
+
+def test_try_acquire_never_jumps_the_queue():
+    async def scenario():
+        scheduler = FairScheduler(1)
+        async with scheduler.slot():
+            assert scheduler.try_acquire() is None
+            waiting = asyncio.create_task(scheduler.slot().__aenter__())
+            await asyncio.sleep(0)
+        # The freed slot went to the queued call, not to an optional extra one
+        await waiting
+        assert scheduler.try_acquire() is None
+
+    asyncio.run(scenario())
+
+def test_latency_trackers_are_kept_per_call_kind():
+    execution = get_latency_tracker("test-kinds", "execution")
+    judge = get_latency_tracker("test-kinds", "judge")
+    assert execution is not judge
+    assert get_latency_tracker("test-kinds", "execution") is execution
@@ -0,0 +1,44 @@
+import asyncio
+from agents.common import http_clients
+
+def test_anthropic_client_transport_speaks_http2(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(http_clients, "HTTP2_ENABLED", True)
+    monkeypatch.setattr(http_clients, "_anthropic_client", None)
+
+    async def pool():
+        return http_clients.get_anthropic_client()._client._transport._pool
+
+    connection_pool = asyncio.run(pool())
+    assert connection_pool._http2
+    assert connection_pool._max_connections == http_clients.HTTP_MAX_CONNECTIONS
+
+def test_anthropic_client_is_shared_per_event_loop(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(http_clients, "_anthropic_client", None)
+
+    async def clients():
+        return http_clients.get_anthropic_client(), http_clients.get_anthropic_client()
+
+    first, second = asyncio.run(clients())
+    assert first is second
+    other_loop_client, _ = asyncio.run(clients())
+    assert other_loop_client is not first
+
+def test_replaced_clients_are_closed(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(http_clients, "_anthropic_client", None)
+    monkeypatch.setattr(http_clients, "_http_session", None)
+
+    async def clients():
+        return http_clients.get_anthropic_client(), http_clients.get_http_session()
+
+    async def replace():
+        replaced = await clients()
+        await asyncio.sleep(0.01)
+        return replaced
+
+    first_client, first_session = asyncio.run(clients())
+    second_client, second_session = asyncio.run(replace())
+    assert first_client.is_closed() and first_session.closed
+    assert not second_client.is_closed() and not second_session.closed
@@ -0,0 +1,61 @@
+import asyncio
+from agents.common.sequential import SequentialEstimator
+from agents.llm_as_judge import agent as judge_agent
+from tests.fakes import FakeContext
+
+SETTINGS = {"early_stopping": {"seed": 7}}
+
+def make_results(count):
+    return [{"case_id": f"case-{index}", "model_response": "Paris", "expected_response": "Paris"} for index in range(count)]
+
+def install_fake_judge_case(monkeypatch, failing=()):
+    """A judge_case whose later cases finish first; records the most calls ever in flight"""
+    state = {"in_flight": 0, "peak": 0, "judged": []}
+
+    async def fake_judge_case(result, judge_model, similarity_threshold, context, **options):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            await asyncio.sleep(0.01 * (10 - int(result["case_id"].split("-")[1]) % 10))
+            if result["case_id"] in failing:
+                raise RuntimeError("judge fell over")
+            state["judged"].append(result["case_id"])
+            return {"case_id": result["case_id"], "similarity_score": 90}
+        finally:
+            state["in_flight"] -= 1
+
+    monkeypatch.setattr(judge_agent, "judge_case", fake_judge_case)
+    return state
+
+def test_comparisons_keep_execution_order_within_the_concurrency_limit(monkeypatch):
+    state = install_fake_judge_case(monkeypatch)
+    results = make_results(6)
+    comparisons = asyncio.run(judge_agent.judge_cases_concurrently(
+        results, "judge", 80, FakeContext(), 3, None, SETTINGS
+    ))
+    assert [comparison["case_id"] for comparison in comparisons] == [result["case_id"] for result in results]
+    assert state["peak"] == 3
+    assert state["judged"] != [result["case_id"] for result in results]
+
+def test_a_failing_case_becomes_an_error_result(monkeypatch):
+    install_fake_judge_case(monkeypatch, failing={"case-1"})
+    comparisons = asyncio.run(judge_agent.judge_cases_concurrently(
+        make_results(3), "judge", 80, FakeContext(), 2, None, SETTINGS
+    ))
+    assert [comparison["case_id"] for comparison in comparisons] == ["case-0", "case-1", "case-2"]
+    assert comparisons[1]["success"] is False
+    assert comparisons[1]["similarity_category"] == "error"
+    assert comparisons[1]["error"] == "judge fell over"
+
+def test_no_case_starts_once_the_estimator_decides(monkeypatch):
+    state = install_fake_judge_case(monkeypatch)
+    estimator = SequentialEstimator(average_threshold=50, min_cases=2)
+    results = make_results(20)
+    comparisons = asyncio.run(judge_agent.judge_cases_concurrently(
+        results, "judge", 80, FakeContext(), 1, estimator, SETTINGS
+    ))
+    assert estimator.decision() == "above"
+    assert len(comparisons) == len(state["judged"]) < len(results)
+    # Whatever was judged comes back in execution order, not the shuffled judging order
+    order = [result["case_id"] for result in results]
+    assert [comparison["case_id"] for comparison in comparisons] == sorted(state["judged"], key=order.index)
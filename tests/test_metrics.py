@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from agents.common.metrics import histogram, percentile, summarize_case_metrics
+
+def test_percentile_matches_numpy_linear_interpolation():
+    rng = np.random.default_rng(3)
+    values = list(rng.exponential(2.0, size=101))
+    for p in (0, 5, 50, 90, 99, 100):
+        assert percentile(values, p) == pytest.approx(np.percentile(values, p))
+    assert percentile([4.0], 99) == 4.0
+    assert percentile([], 50) is None
+
+def test_histogram_edges_are_inclusive_with_an_overflow_bucket():
+    assert histogram([0.1, 0.25, 0.3, 1, 99], [0.25, 0.5, 1]) == [
+        {"le": 0.25, "count": 2},
+        {"le": 0.5, "count": 1},
+        {"le": 1, "count": 1},
+        {"le": "inf", "count": 1}
+    ]
+    assert histogram([], [1]) == [{"le": 1, "count": 0}, {"le": "inf", "count": 0}]
+
+def test_roll_up_counts_only_real_model_calls():
+    results = [
+        {"success": True, "model_key": "a", "request_seconds": 1.0, "time_to_first_token": 0.2,
+         "output_tokens_per_second": 50, "usage": {"input_tokens": 10, "output_tokens": 5}, "hedged": True},
+        {"success": True, "model_key": "b", "request_seconds": 3.0, "time_to_first_token": 0.4,
+         "output_tokens_per_second": None, "usage": {"input_tokens": 20, "output_tokens": 7}, "retries": 2},
+        {"success": True, "model_key": "a", "cache_hit": True, "request_seconds": 0.0},
+        {"success": False, "model_key": "a", "request_seconds": 9.0}
+    ]
+    summary = summarize_case_metrics(results)
+    overall = summary["overall"]
+    assert overall["request_seconds"]["count"] == 2 and overall["request_seconds"]["mean"] == 2.0
+    assert overall["output_tokens_per_second"]["count"] == 1
+    assert overall["tokens"]["input_tokens"] == 30 and overall["tokens"]["output_tokens"] == 12
+    assert overall["retries"] == 2 and overall["hedged_calls"] == 1
+    assert summary["per_model"]["a"]["request_seconds"]["count"] == 1
+    assert summarize_case_metrics([]) == {"overall": None, "per_model": {}}
@@ -0,0 +1,48 @@
+from agents.evaluation_runner.agent import (
+    DEFAULT_MODEL_CONFIG, expand_cases_for_models, resolve_model_configs, summarize_by_model
+)
+
+CASES = [{"case_id": "ev1_case_0", "processed_prompt": "q0"}, {"case_id": "ev1_case_1", "processed_prompt": "q1"}]
+
+def test_request_model_configs_win_over_metadata_and_fill_defaults():
+    metadata = {"model_config": {"model_name": "claude-3-haiku-20240307"}}
+    configs = resolve_model_configs({"model_configs": [{"model_name": "claude-3-5-sonnet-latest", "max_tokens": "256"}]}, metadata)
+    assert configs == [{
+        "model_name": "claude-3-5-sonnet-latest",
+        "max_tokens": 256,
+        "temperature": DEFAULT_MODEL_CONFIG["temperature"],
+        "model_key": "claude-3-5-sonnet-latest"
+    }]
+    assert resolve_model_configs({}, metadata)[0]["model_name"] == "claude-3-haiku-20240307"
+    assert resolve_model_configs({}, None)[0]["model_name"] == DEFAULT_MODEL_CONFIG["model_name"]
+
+def test_model_keys_are_unique():
+    configs = resolve_model_configs({"model_configs": [
+        {"model_name": "claude-3-haiku-20240307"},
+        {"model_name": "claude-3-haiku-20240307", "temperature": 1.0},
+        {"model_name": "claude-3-haiku-20240307", "label": "haiku-hot"}
+    ]}, None)
+    assert [config["model_key"] for config in configs] == [
+        "claude-3-haiku-20240307", "claude-3-haiku-20240307_1", "haiku-hot"
+    ]
+
+def test_cases_fan_out_with_unique_ids_only_for_several_models():
+    one = resolve_model_configs({}, None)
+    assert [case["case_id"] for case in expand_cases_for_models(CASES, one)] == ["ev1_case_0", "ev1_case_1"]
+
+    two = resolve_model_configs({"model_configs": [{"label": "a"}, {"label": "b"}]}, None)
+    expanded = expand_cases_for_models(CASES, two)
+    assert [case["case_id"] for case in expanded] == [
+        "ev1_case_0__a", "ev1_case_1__a", "ev1_case_0__b", "ev1_case_1__b"
+    ]
+    assert expanded[2]["base_case_id"] == "ev1_case_0" and expanded[2]["model_config"]["model_key"] == "b"
+    assert "model_config" not in CASES[0]
+
+def test_summary_per_model_key():
+    summaries = summarize_by_model([
+        {"model_key": "a", "success": True, "cost": 0.5},
+        {"model_key": "a", "success": False},
+        {"model_key": "b", "success": True, "cost": 0.25}
+    ])
+    assert summaries["a"]["success_rate"] == 0.5 and summaries["a"]["cost"] == 0.5
+    assert summaries["b"]["total"] == 1
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from anthropic.types import Message, ToolUseBlock, Usage
+from agents.common.retry import ModelCallError
+from agents.llm_as_judge import agent as judge_agent
+from agents.llm_as_judge.multi_case import plan_groups
+from agents.llm_as_judge.verdict_schema import GROUP_JUDGE_TOOL, JUDGE_TOOL
+
+class Context:
+    logger = logging.getLogger("test")
+
+def tool_message(tool, tool_input):
+    return Message(
+        id="msg_test",
+        type="message",
+        role="assistant",
+        model="claude-3-5-haiku-latest",
+        content=[ToolUseBlock(type="tool_use", id="toolu_test", name=tool["name"], input=tool_input)],
+        stop_reason="tool_use",
+        stop_sequence=None,
+        usage=Usage(input_tokens=10, output_tokens=10)
+    )
+
+CALL_INFO = {"attempts": 1, "hedged": False, "hedge_won": False}
+
+def make_results(count):
+    return [
+        {
+            "case_id": f"case-{index}",
+            "success": True,
+            "original_query": f"Question {index}",
+            "expected_response": f"Answer {index}",
+            "model_response": f"Response {index}"
+        }
+        for index in range(count)
+    ]
+
+def judge_in_groups(monkeypatch, group_reply):
+    async def fake_create_message(client, hedging=None, call_kind="default", **params):
+        if params["tool_choice"]["name"] == GROUP_JUDGE_TOOL["name"]:
+            return group_reply(params), CALL_INFO
+        return tool_message(JUDGE_TOOL, {"similarity_score": 70, "reasoning": "Judged alone"}), CALL_INFO
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(judge_agent, "create_message", fake_create_message)
+    return asyncio.run(judge_agent.judge_cases_in_groups(
+        make_results(4), "claude-3-5-haiku-latest", 80, Context(), judge_concurrency=2, max_group_size=2
+    ))
+
+def test_plan_groups_splits_by_size_and_length():
+    short = [(f"case-{index}", ("q", "a", "r")) for index in range(5)]
+    assert [len(group) for group in plan_groups(short, 2)] == [2, 2, 1]
+    long = [(f"case-{index}", ("q" * 7000, "a", "r")) for index in range(3)]
+    assert [len(group) for group in plan_groups(long, 10)] == [1, 1, 1]
+
+def test_failed_group_request_is_not_counted_as_malformed(monkeypatch):
+    def group_reply(params):
+        raise ModelCallError("connection reset", 5, True)
+
+    comparison_results, stats = judge_in_groups(monkeypatch, group_reply)
+    assert [comparison_result["similarity_score"] for comparison_result in comparison_results] == [70] * 4
+    assert all(comparison_result["judge_request_failed"] for comparison_result in comparison_results)
+    assert not any(comparison_result.get("judge_malformed") for comparison_result in comparison_results)
+    assert stats["failed_requests"] == 2
+    assert stats["failed_request_cases"] == 4
+    assert stats["rejudged_cases"] == 4
+
+def test_missing_group_verdicts_are_counted_as_malformed(monkeypatch):
+    def group_reply(params):
+        # Only the first case of each group gets a verdict
+        case_id = "case-0" if "case-0" in params["messages"][0]["content"] else "case-2"
+        return tool_message(GROUP_JUDGE_TOOL, {"verdicts": [{"id": case_id, "similarity_score": 95, "reasoning": "Close"}]})
+
+    comparison_results, stats = judge_in_groups(monkeypatch, group_reply)
+    assert [comparison_result["similarity_score"] for comparison_result in comparison_results] == [95, 70, 95, 70]
+    assert [comparison_result.get("judge_malformed", 0) for comparison_result in comparison_results] == [0, 1, 0, 1]
+    assert not any(comparison_result.get("judge_request_failed") for comparison_result in comparison_results)
+    assert stats["failed_requests"] == 0
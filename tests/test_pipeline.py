@@ -0,0 +1,77 @@
+import asyncio
+from agents.common.sequential import SequentialEstimator
+from agents.evaluation_runner import pipeline
+from agents.evaluation_runner.pipeline import StreamingJudge
+from tests.fakes import FakeContext
+
+def fake_judge(release: asyncio.Event, judged: list):
+    async def judge_case(result, judge_model, similarity_threshold, context, **options):
+        await release.wait()
+        judged.append(result["case_id"])
+        return {"case_id": result["case_id"], "similarity_score": 90}
+    return judge_case
+
+def test_submit_blocks_while_the_queue_is_full(monkeypatch):
+    async def scenario():
+        release = asyncio.Event()
+        judged = []
+        monkeypatch.setattr(pipeline, "judge_case", fake_judge(release, judged))
+        results = [{"case_id": f"case_{i}"} for i in range(6)]
+
+        async with StreamingJudge("judge", 80, FakeContext(), judge_concurrency=1, queue_size=2) as streaming_judge:
+            submitted = 0
+
+            async def produce():
+                nonlocal submitted
+                for case_result in results:
+                    await streaming_judge.submit(case_result)
+                    submitted += 1
+
+            producer = asyncio.create_task(produce())
+            await asyncio.sleep(0.05)
+            # One case with the busy worker and two queued; the fourth submit waits
+            assert submitted == 3 and not producer.done()
+            assert streaming_judge.queue.qsize() == 2
+
+            release.set()
+            await asyncio.wait_for(producer, 1)
+            comparisons = await streaming_judge.finish(results)
+
+        assert [comparison["case_id"] for comparison in comparisons] == [r["case_id"] for r in results]
+        assert sorted(judged) == sorted(r["case_id"] for r in results)
+
+    asyncio.run(scenario())
+
+def test_results_never_queued_are_judged_on_finish(monkeypatch):
+    async def scenario():
+        release = asyncio.Event()
+        release.set()
+        judged = []
+        monkeypatch.setattr(pipeline, "judge_case", fake_judge(release, judged))
+        results = [{"case_id": "queued"}, {"case_id": "resumed"}]
+
+        async with StreamingJudge("judge", 80, FakeContext(), judge_concurrency=2, queue_size=4) as streaming_judge:
+            await streaming_judge.submit(results[0])
+            comparisons = await streaming_judge.finish(results)
+
+        assert [comparison["case_id"] for comparison in comparisons] == ["queued", "resumed"]
+        assert judged.count("queued") == 1
+
+    asyncio.run(scenario())
+
+def test_deduplicated_copies_are_not_counted_as_samples(monkeypatch):
+    async def scenario():
+        release = asyncio.Event()
+        release.set()
+        monkeypatch.setattr(pipeline, "judge_case", fake_judge(release, []))
+        results = [{"case_id": "a"}, {"case_id": "b", "deduplicated_from": "a"}, {"case_id": "c"}]
+        estimator = SequentialEstimator(average_threshold=50, min_cases=2)
+
+        async with StreamingJudge("judge", 80, FakeContext(), judge_concurrency=1, queue_size=4,
+                                  estimator=estimator) as streaming_judge:
+            comparisons = await streaming_judge.finish(results)
+
+        assert len(comparisons) == 3
+        assert estimator.count == 2
+
+    asyncio.run(scenario())
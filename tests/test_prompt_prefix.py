@@ -0,0 +1,43 @@
+from agents.evaluation_runner.agent import build_prompt_content, prompt_cache_min_tokens, uses_prompt_cache
+from agents.template_manager.agent import split_template, substitute_template_variables
+
+def test_split_template_at_the_first_variable():
+    assert split_template("You are an expert.\nQ: {{query}}\nContext: {{context}}") == (
+        "You are an expert.\nQ: ", "{{query}}\nContext: {{context}}"
+    )
+    assert split_template("{{query}} first") == ("", "{{query}} first")
+    assert split_template("No variables here") == ("", "No variables here")
+
+def test_prefix_and_substituted_suffix_rebuild_the_prompt():
+    template = "Answer carefully. {{query}}"
+    prefix, body = split_template(template)
+    case = {"query": "What is 2+2?"}
+    assert prefix + substitute_template_variables(body, case, ["query"]) == substitute_template_variables(
+        template, case, ["query"]
+    )
+
+def case_with_prefix(model_name: str, prefix_tokens: int):
+    return {
+        "prompt_prefix": "x" * (prefix_tokens * 4),
+        "prompt_suffix": "What is 2+2?",
+        "processed_prompt": "x" * (prefix_tokens * 4) + "What is 2+2?",
+        "model_config": {"model_name": model_name}
+    }
+
+def test_cache_minimum_depends_on_the_model_family():
+    assert prompt_cache_min_tokens("claude-3-5-sonnet-latest") == 1024
+    assert prompt_cache_min_tokens("claude-3-haiku-20240307") == 2048
+    assert prompt_cache_min_tokens("claude-3-5-haiku-latest") == 2048
+
+    # Long enough for Sonnet but too short for Haiku, so Haiku gets a plain prompt
+    assert uses_prompt_cache(case_with_prefix("claude-3-5-sonnet-latest", 1500))
+    assert not uses_prompt_cache(case_with_prefix("claude-3-haiku-20240307", 1500))
+    assert uses_prompt_cache(case_with_prefix("claude-3-haiku-20240307", 2100))
+
+def test_cacheable_prefix_is_sent_as_its_own_block():
+    case = case_with_prefix("claude-3-5-sonnet-latest", 1500)
+    content = build_prompt_content(case)
+    assert content[0]["cache_control"] == {"type": "ephemeral"} and content[0]["text"] == case["prompt_prefix"]
+    assert content[1]["text"] == "What is 2+2?"
+    short = case_with_prefix("claude-3-haiku-20240307", 1500)
+    assert build_prompt_content(short) == short["processed_prompt"]
@@ -0,0 +1,68 @@
+import asyncio
+from agents.common import rate_limiter
+from agents.common.rate_limiter import RateLimiter, TokenBucket, estimate_input_tokens
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+def test_bucket_refills_continuously_up_to_capacity(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    bucket = TokenBucket(60)
+    bucket.consume(60)
+    assert bucket.seconds_until(30) == 30.0
+
+    clock.now += 15
+    bucket.refill()
+    assert bucket.tokens == 15.0
+    assert bucket.seconds_until(30) == 15.0
+
+    clock.now += 600
+    bucket.refill()
+    assert bucket.tokens == 60.0
+    # More than capacity only ever waits for a full bucket
+    assert bucket.seconds_until(500) == 0.0
+
+def test_headers_update_limits_and_lower_remaining(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "time", FakeClock())
+    limiter = RateLimiter(50, 50000, 10000)
+    limiter.update_from_headers({
+        "anthropic-ratelimit-requests-limit": "4000",
+        "anthropic-ratelimit-requests-remaining": "3999",
+        "anthropic-ratelimit-input-tokens-limit": "400000",
+        "anthropic-ratelimit-input-tokens-remaining": "1000",
+        "anthropic-ratelimit-output-tokens-remaining": "not a number"
+    })
+    snapshot = limiter.snapshot()
+    # A higher limit does not grant tokens we have not seen refill yet
+    assert snapshot["requests"] == {"limit": 4000.0, "available": 50.0}
+    assert snapshot["input_tokens"] == {"limit": 400000.0, "available": 1000.0}
+    assert snapshot["output_tokens"] == {"limit": 10000.0, "available": 10000.0}
+
+def test_acquire_waits_for_the_scarcest_budget():
+    async def scenario():
+        limiter = RateLimiter(6000, 6000, 6000)
+        assert await limiter.acquire(5990, 10) < 0.1
+        # 100 input tokens refill in one second at 6000 per minute
+        waited = await limiter.acquire(100, 10)
+        assert 0.8 < waited < 1.5
+
+    asyncio.run(scenario())
+
+def test_reconcile_corrects_estimates():
+    limiter = RateLimiter(50, 1000, 1000)
+    limiter.reconcile(100, 500, 150, 20)
+    assert limiter.buckets["input_tokens"].tokens == 950
+    # Unused output estimate is handed back, never beyond capacity
+    assert limiter.snapshot()["output_tokens"]["available"] == 1000
+
+def test_input_tokens_are_estimated_from_system_and_text_blocks():
+    params = {
+        "system": "x" * 40,
+        "messages": [{"role": "user", "content": [{"type": "text", "text": "y" * 80}, {"type": "image"}]}]
+    }
+    assert estimate_input_tokens(params) == 11 + 21
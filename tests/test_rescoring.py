@@ -0,0 +1,35 @@
+import pytest
+from agents.llm_as_judge.rescoring import rescore_cases, resolve_buckets, summarize_scores
+
+RESULTS = [
+    {"case_id": "a", "model_key": "haiku", "similarity_score": 95, "similarity_category": "high"},
+    {"case_id": "b", "model_key": "haiku", "similarity_score": 60, "similarity_category": "medium"},
+    {"case_id": "c", "model_key": "sonnet", "similarity_score": 30, "similarity_category": "low"},
+    {"case_id": "d", "model_key": "sonnet", "similarity_score": 0, "similarity_category": "error"}
+]
+
+def test_default_buckets_match_judge_time_categories():
+    summary = summarize_scores(RESULTS, 80)
+    assert summary["pass_count"] == 1 and summary["pass_rate"] == 0.25
+    assert {bucket["name"]: bucket["count"] for bucket in summary["buckets"]} == {"high": 1, "medium": 1, "low": 2}
+    assert summary["per_model"]["haiku"]["average_similarity_score"] == 77.5
+
+def test_rescoring_with_a_new_threshold_and_scheme():
+    buckets = [{"name": "pass", "min": 50}, {"name": "excellent", "min": 90}, {"name": "fail", "min": 10}]
+    summary = summarize_scores(RESULTS, 50, buckets)
+    assert summary["pass_count"] == 2
+    assert [bucket["name"] for bucket in summary["buckets"]] == ["excellent", "pass", "fail"]
+    # The lowest bucket is extended down to 0
+    assert summary["buckets"][-1]["min"] == 0 and summary["buckets"][-1]["count"] == 2
+
+    categories = {case["case_id"]: case["similarity_category"] for case in rescore_cases(RESULTS, 50, buckets)}
+    assert categories == {"a": "excellent", "b": "pass", "c": "fail", "d": "error"}
+
+@pytest.mark.parametrize("buckets", [
+    [{"name": "high"}],
+    [{"name": "a", "min": 10}, {"name": "a", "min": 5}],
+    ["high"]
+])
+def test_invalid_bucket_schemes_are_rejected(buckets):
+    with pytest.raises(ValueError):
+        resolve_buckets(buckets, 80)
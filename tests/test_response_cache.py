@@ -0,0 +1,81 @@
+import asyncio
+from agents.common import response_cache
+from agents.common.response_cache import CacheSession, LRUCache, ResponseCache, response_cache_key
+from tests.fakes import FakeContext
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+PARAMS = {"model": "claude-3-haiku-20240307", "max_tokens": 10, "temperature": 0, "messages": [{"role": "user", "content": "hi"}]}
+
+def test_lru_evicts_least_recently_used_by_count_and_size():
+    cache = LRUCache(max_entries=2, max_bytes=100)
+    cache.set("a", 1, ttl=60, size=10)
+    cache.set("b", 2, ttl=60, size=10)
+    assert cache.get("a") == 1
+    cache.set("c", 3, ttl=60, size=10)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+
+    # Two entries fit by count, but not by size, so the older one goes too
+    cache.set("d", 4, ttl=60, size=95)
+    assert cache.get("a") is None and cache.get("c") is None
+    assert cache.total_bytes == 95
+    # An entry bigger than the whole cache is not stored at all
+    cache.set("e", 5, ttl=60, size=101)
+    assert cache.get("e") is None and cache.get("d") == 4
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    cache = LRUCache(max_entries=10, max_bytes=1000)
+    cache.set("a", 1, ttl=30, size=10)
+    clock.now += 29
+    assert cache.get("a") == 1
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.total_bytes == 0
+
+def test_kv_tier_serves_other_processes_and_honours_expiry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "time", clock)
+
+    async def scenario():
+        context = FakeContext()
+        await ResponseCache(ttl=60).set("key", {"model_response": "hello"}, context)
+        fresh_process = ResponseCache(ttl=60)
+        value, tier = await fresh_process.get("key", context)
+        assert value["model_response"] == "hello" and tier == "kv"
+        assert (await fresh_process.get("key", context))[1] == "memory"
+
+        clock.now += 61
+        assert await ResponseCache(ttl=60).get("key", context) == (None, None)
+
+    asyncio.run(scenario())
+
+def test_session_policies_and_nondeterministic_calls():
+    async def scenario():
+        context = FakeContext()
+        cache = ResponseCache()
+        await CacheSession("use", cache=cache).store(PARAMS, {"model_response": "hi"}, context)
+
+        use = CacheSession("use", cache=cache)
+        assert (await use.lookup(PARAMS, context))["model_response"] == "hi"
+        assert await use.lookup(dict(PARAMS, temperature=0.7), context) is None
+        assert use.summary()["hits"] == 1 and use.stats["uncacheable"] == 1
+
+        refresh = CacheSession("refresh", cache=cache)
+        assert await refresh.lookup(PARAMS, context) is None
+        assert await CacheSession("bypass", cache=cache).lookup(PARAMS, context) is None
+        assert await CacheSession("use", cache_nondeterministic=True, cache=cache).lookup(
+            dict(PARAMS, temperature=0.7), context
+        ) is None
+
+    asyncio.run(scenario())
+
+def test_cache_key_ignores_fields_that_do_not_change_the_completion():
+    assert response_cache_key(PARAMS) == response_cache_key(dict(PARAMS, stream=True, metadata={"user_id": "x"}))
+    assert response_cache_key(PARAMS) != response_cache_key(dict(PARAMS, max_tokens=11))
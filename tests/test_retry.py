@@ -0,0 +1,149 @@
+import asyncio
+import time
+import httpx
+import pytest
+from anthropic import APIStatusError, APITimeoutError
+from anthropic.types import Message, Usage
+from agents.common.model_client import _call_with_retries
+from agents.common.retry import CircuitBreaker, _circuit_breakers, backoff_delay, is_retryable, retry_after_seconds
+
+class FakeClient:
+    def with_options(self, **options):
+        return self
+
+def make_message() -> Message:
+    return Message(
+        id="msg_test",
+        type="message",
+        role="assistant",
+        model="test-model",
+        content=[],
+        stop_reason="end_turn",
+        stop_sequence=None,
+        usage=Usage(input_tokens=1, output_tokens=1)
+    )
+
+def half_open_breaker(model_name: str) -> CircuitBreaker:
+    breaker = _circuit_breakers[model_name] = CircuitBreaker(failure_threshold=1, cooldown=0.01)
+    breaker.state = "open"
+    breaker.open_until = time.monotonic() - 1
+    return breaker
+
+def test_cancelled_probe_frees_half_open_circuit():
+    model_name = "test-cancelled-probe"
+    params = {"model": model_name, "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+
+    async def hang(client):
+        await asyncio.Event().wait()
+
+    async def succeed(client):
+        return make_message(), {}, {}
+
+    async def scenario():
+        breaker = half_open_breaker(model_name)
+        probe = asyncio.create_task(_call_with_retries(FakeClient(), params, hang, None))
+        await asyncio.sleep(0.01)
+        assert breaker.state == "half_open" and breaker.probe_in_flight
+
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        assert not breaker.probe_in_flight
+
+        # The next caller becomes the probe instead of waiting forever
+        message, call_info = await asyncio.wait_for(_call_with_retries(FakeClient(), params, succeed, None), 1)
+        assert call_info["attempts"] == 1
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+def test_cancelled_non_probe_call_keeps_the_probe():
+    model_name = "test-cancelled-non-probe"
+    params = {"model": model_name, "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+
+    async def hang(client):
+        await asyncio.Event().wait()
+
+    async def scenario():
+        breaker = _circuit_breakers[model_name] = CircuitBreaker()
+        call = asyncio.create_task(_call_with_retries(FakeClient(), params, hang, None))
+        await asyncio.sleep(0.01)
+
+        # The circuit trips while the call is in flight and another caller takes the probe
+        breaker.state = "half_open"
+        breaker.probe_in_flight = True
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        assert breaker.probe_in_flight
+
+    asyncio.run(scenario())
+
+def test_opens_after_threshold_and_closes_after_successful_probe():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=0.01)
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        # The first caller after the cooldown is the probe
+        assert await breaker.before_call() > 0
+        assert breaker.state == "half_open" and breaker.probe_in_flight
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.consecutive_failures == 0
+        assert breaker.cooldown == 0.01
+
+    asyncio.run(scenario())
+
+def test_failed_probe_reopens_with_doubled_cooldown():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0.01, max_cooldown=0.03)
+        breaker.record_failure()
+        for expected_cooldown in (0.02, 0.03, 0.03):
+            await breaker.before_call()
+            breaker.record_failure()
+            assert breaker.state == "open"
+            assert breaker.cooldown == expected_cooldown
+
+    asyncio.run(scenario())
+
+def test_callers_wait_while_another_call_probes():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0.01)
+        breaker.record_failure()
+        await breaker.before_call()
+        waiting = asyncio.create_task(breaker.before_call())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        breaker.record_success()
+        await asyncio.wait_for(waiting, 1)
+
+    asyncio.run(scenario())
+
+def test_success_in_closed_state_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+def status_error(status_code: int, headers=None) -> APIStatusError:
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return APIStatusError("error", response=response, body=None)
+
+def test_only_transient_errors_are_retried():
+    assert is_retryable(APITimeoutError(httpx.Request("POST", "https://api.anthropic.com")))
+    for status_code in (408, 409, 429, 500, 529):
+        assert is_retryable(status_error(status_code))
+    for status_code in (400, 401, 404):
+        assert not is_retryable(status_error(status_code))
+    assert not is_retryable(ValueError("bad params"))
+
+def test_backoff_honours_retry_after():
+    assert retry_after_seconds(status_error(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(status_error(429, {"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(status_error(429, {"retry-after": "soon"})) is None
+    assert backoff_delay(1, retry_after=5.0) >= 5.0
+    assert all(0 <= backoff_delay(3) <= 4.0 for _ in range(50))
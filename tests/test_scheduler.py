@@ -0,0 +1,50 @@
+import asyncio
+from collections import Counter
+from agents.common.scheduler import FairScheduler, set_dispatch_context
+
+def run_contended(evaluations, calls_per_evaluation: int, slots: int = 1):
+    """Queue calls from several evaluations behind a busy scheduler and record the grant order"""
+    order = []
+
+    async def scenario():
+        scheduler = FairScheduler(slots)
+
+        async def call(evaluation_id):
+            async with scheduler.slot():
+                order.append(evaluation_id)
+                await asyncio.sleep(0)
+
+        async def evaluation(evaluation_id, settings):
+            set_dispatch_context(evaluation_id, settings)
+            await asyncio.gather(*(call(evaluation_id) for _ in range(calls_per_evaluation)))
+
+        async with scheduler.slot():
+            tasks = [asyncio.create_task(evaluation(evaluation_id, settings)) for evaluation_id, settings in evaluations]
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+        assert scheduler.in_flight == 0
+
+    asyncio.run(scenario())
+    return order
+
+def test_slots_are_shared_in_proportion_to_weight():
+    order = run_contended([("light", {}), ("heavy", {"scheduling_weight": 3})], 40)
+    # While both are busy, the heavy evaluation gets three slots for every one of the light one
+    assert Counter(order[:20]) == {"heavy": 15, "light": 5}
+
+def test_higher_priority_class_is_served_first():
+    order = run_contended([("batch", {"priority": "batch"}), ("interactive", {"priority": "interactive"})], 5)
+    assert order == ["interactive"] * 5 + ["batch"] * 5
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    async def scenario():
+        scheduler = FairScheduler(1)
+        async with scheduler.slot():
+            waiter = asyncio.create_task(scheduler.slot().__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.in_flight == 0
+        assert scheduler.stats()["queue_depth"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from agents.llm_as_judge.score_stats import (
+    BOOTSTRAP_CONFIDENCE, BOOTSTRAP_SAMPLES, HISTOGRAM_EDGES, MISSING_SLICE, PERCENTILES, compute_score_statistics
+)
+
+def make_comparisons(scores, model_keys=None):
+    return [
+        {"case_id": f"case-{index}", "similarity_score": score, "model_key": (model_keys or ["m"] * len(scores))[index]}
+        for index, score in enumerate(scores)
+    ]
+
+def reference_stats(scores):
+    scores = np.asarray(scores, dtype=float)
+    return {
+        "mean": scores.mean(),
+        "variance": scores.var(ddof=1) if len(scores) > 1 else 0.0,
+        "percentiles": np.percentile(scores, PERCENTILES),
+        "histogram": np.histogram(scores, bins=HISTOGRAM_EDGES)[0]
+    }
+
+@pytest.mark.parametrize("scores", [
+    [72],
+    [0, 100],
+    [10, 20, 20, 35, 50, 50, 50, 90, 95, 100],
+    list(np.random.default_rng(3).integers(0, 101, size=257))
+])
+def test_distribution_matches_numpy(scores):
+    overall = compute_score_statistics(make_comparisons(scores))["overall"]
+    expected = reference_stats(scores)
+    assert overall["count"] == len(scores)
+    assert overall["mean"] == pytest.approx(expected["mean"])
+    assert overall["variance"] == pytest.approx(expected["variance"])
+    assert overall["std"] == pytest.approx(np.sqrt(expected["variance"]))
+    assert (overall["min"], overall["max"]) == (min(scores), max(scores))
+    assert list(overall["percentiles"].values()) == pytest.approx(list(expected["percentiles"]))
+    assert [histogram_bin["count"] for histogram_bin in overall["histogram"]] == list(expected["histogram"])
+
+def test_slices_match_numpy_on_each_subset():
+    scores = [90, 80, 30, 100, 60, 45, 70]
+    model_keys = ["a", "b", "a", "a", "b", "b", "a"]
+    slices = compute_score_statistics(make_comparisons(scores, model_keys))["slices"]["model_key"]
+    for model_key in ("a", "b"):
+        subset = [score for score, key in zip(scores, model_keys) if key == model_key]
+        expected = reference_stats(subset)
+        assert slices[model_key]["mean"] == pytest.approx(expected["mean"])
+        assert slices[model_key]["variance"] == pytest.approx(expected["variance"])
+        assert list(slices[model_key]["percentiles"].values()) == pytest.approx(list(expected["percentiles"]))
+
+def test_bootstrap_interval_agrees_with_a_direct_resampling():
+    rng = np.random.default_rng(11)
+    scores = rng.integers(40, 101, size=200).astype(float)
+    low, high = compute_score_statistics(make_comparisons(list(scores)), seed=5)["overall"]["mean_interval"]
+
+    resampled_means = rng.choice(scores, size=(BOOTSTRAP_SAMPLES, len(scores))).mean(axis=1)
+    tail = (1 - BOOTSTRAP_CONFIDENCE) / 2 * 100
+    expected_low, expected_high = np.percentile(resampled_means, [tail, 100 - tail])
+    # Both are Monte Carlo estimates; allow a small share of the interval width
+    width = expected_high - expected_low
+    assert low == pytest.approx(expected_low, abs=0.15 * width)
+    assert high == pytest.approx(expected_high, abs=0.15 * width)
+    assert low < scores.mean() < high
+
+def test_seed_makes_intervals_reproducible():
+    comparisons = make_comparisons([10, 40, 55, 70, 95, 100])
+    assert compute_score_statistics(comparisons, seed=1) == compute_score_statistics(comparisons, seed=1)
+
+def test_cases_without_the_field_fall_in_the_missing_slice():
+    comparisons = make_comparisons([80, 60])
+    execution_results = [{"case_id": "case-0", "case_metadata": {"topic": "geo"}}, {"case_id": "case-1"}]
+    slices = compute_score_statistics(comparisons, execution_results, ["topic"])["slices"]["topic"]
+    assert slices["geo"]["count"] == 1 and slices[MISSING_SLICE]["count"] == 1
@@ -0,0 +1,64 @@
+import pytest
+from agents.llm_as_judge.scorers import ScorerChain, label_scorer, numeric_scorer, regex_scorer
+
+SENTIMENT_QUERY = "Classify the review as positive, negative, or neutral."
+
+@pytest.mark.parametrize("expected, actual, score", [
+    ("6", "6", 100),
+    ("6", "6.", 100),
+    ("6", "7", 0),
+    ("$1,200", "1200", 100),
+    ("-3.5", "-3.50", 100),
+    ("0.5", "50%", 100),
+    ("50%", "50 %", 100),
+])
+def test_numeric_scorer_decides_bare_numbers(expected, actual, score):
+    assert numeric_scorer("", expected, actual, {})[0] == score
+
+@pytest.mark.parametrize("expected, actual", [
+    ("6", "maybe 6?"),
+    ("6", "The answer is 6"),
+    ("6", "6 or 7"),
+    ("0.5", "40%"),
+    ("1,5", "15"),
+    ("six", "6"),
+])
+def test_numeric_scorer_leaves_everything_else_to_the_judge(expected, actual):
+    assert numeric_scorer("", expected, actual, {}) is None
+
+@pytest.mark.parametrize("actual, score", [("positive", 100), ("Positive.", 100), ("negative", 0)])
+def test_label_scorer_decides_bare_labels(actual, score):
+    assert label_scorer(SENTIMENT_QUERY, "positive", actual, {})[0] == score
+
+@pytest.mark.parametrize("actual", ["This is not positive.", "Probably positive", "positive or neutral"])
+def test_label_scorer_leaves_sentences_to_the_judge(actual):
+    assert label_scorer(SENTIMENT_QUERY, "positive", actual, {}) is None
+
+def test_label_scorer_needs_known_labels():
+    assert label_scorer("Summarize the review.", "positive", "positive", {}) is None
+    assert label_scorer("Summarize the review.", "spam", "ham", {"labels": ["spam", "ham"]})[0] == 0
+
+def test_regex_scorer_compares_the_extracted_answer():
+    options = {"regex_patterns": [r"answer:\s*(?P<answer>\w+)"]}
+    assert regex_scorer("", "B", "Reasoning... Answer: b", options)[0] == 100
+    assert regex_scorer("", "B", "Reasoning... Answer: c", options)[0] == 0
+    assert regex_scorer("", "B", "No idea", options) is None
+
+def test_chain_is_opt_in():
+    assert ScorerChain.from_settings({}) is None
+    assert ScorerChain.from_settings({"scorers": False}) is None
+    assert ScorerChain.from_settings({"scorers": True}).names == ["exact", "numeric", "label"]
+    assert ScorerChain.from_settings({"scorers": {"regex_patterns": ["(?P<answer>x)"]}}).names[-1] == "regex"
+
+def test_chain_counts_hits_and_judge_fallbacks():
+    chain = ScorerChain(["exact", "numeric", "label"])
+    assert chain.score("", "Paris", "paris")["scored_by"] == "exact"
+    assert chain.score("", "4", "4.0")["scored_by"] == "numeric"
+    assert chain.score(SENTIMENT_QUERY, "positive", "This is not positive.") is None
+    summary = chain.summary()
+    assert summary["hits"] == {"exact": 1, "numeric": 1, "label": 0}
+    assert summary["judge_fallbacks"] == 1
+
+def test_unknown_scorer_is_rejected():
+    with pytest.raises(ValueError):
+        ScorerChain(["fuzzy"])
@@ -0,0 +1,59 @@
+import pytest
+from agents.common.sequential import SequentialEstimator, shuffled
+
+def feed(estimator: SequentialEstimator, scores):
+    for score in scores:
+        estimator.add(score)
+
+def test_no_decision_before_min_cases():
+    estimator = SequentialEstimator(average_threshold=50, min_cases=10)
+    feed(estimator, [90] * 9)
+    assert estimator.decision() is None
+    estimator.add(90)
+    assert estimator.decision() == "above"
+
+def test_below_and_precise_decisions():
+    below = SequentialEstimator(average_threshold=50, min_cases=5)
+    feed(below, [10, 12, 8, 11, 9])
+    assert below.decision() == "below"
+
+    precise = SequentialEstimator(max_interval_width=10, min_cases=5)
+    feed(precise, [60, 62, 58, 61, 59])
+    assert precise.decision() == "precise"
+
+    unsettled = SequentialEstimator(average_threshold=50, min_cases=5)
+    feed(unsettled, [0, 100, 0, 100, 50])
+    assert unsettled.decision() is None
+    assert unsettled.summary(5)["decision"] == "exhausted"
+
+def test_running_mean_and_interval_match_the_textbook_formula():
+    estimator = SequentialEstimator(max_interval_width=1)
+    scores = [70, 80, 65, 90, 85]
+    feed(estimator, scores)
+    mean = sum(scores) / len(scores)
+    variance = sum((score - mean) ** 2 for score in scores) / (len(scores) - 1)
+    assert estimator.mean == pytest.approx(mean)
+    assert estimator.variance == pytest.approx(variance)
+    low, high = estimator.interval()
+    assert (high - low) / 2 == pytest.approx(1.959964 * (variance / len(scores)) ** 0.5, rel=1e-5)
+
+def test_first_decision_is_final_and_later_scores_are_reported_apart():
+    estimator = SequentialEstimator(average_threshold=50, min_cases=5)
+    feed(estimator, [80, 82, 78, 81, 79])
+    assert estimator.decision() == "above"
+    # Calls that were already in flight drag the mean down, but the run stopped for "above"
+    feed(estimator, [0, 0, 0])
+    summary = estimator.summary(100)
+    assert summary["decision"] == "above"
+    assert summary["cases_spent"] == 8
+    assert summary["cases_at_decision"] == 5 and summary["cases_after_decision"] == 3
+    assert summary["decision_interval"][0] > 50
+
+def test_settings_and_shuffling():
+    assert SequentialEstimator.from_settings({}) is None
+    assert SequentialEstimator.from_settings({"early_stopping": {"enabled": False, "average_threshold": 50}}) is None
+    assert SequentialEstimator.from_settings({"early_stopping": {"average_threshold": 50}}).min_cases == 30
+    with pytest.raises(ValueError):
+        SequentialEstimator.from_settings({"early_stopping": {"min_cases": 10}})
+    assert shuffled(list(range(20)), seed=1) == shuffled(list(range(20)), seed=1)
+    assert sorted(shuffled(list(range(20)), seed=1)) == list(range(20))
@@ -0,0 +1,64 @@
+import asyncio
+from agents.common.sharding import SHARD_NAMESPACE, ShardQueue, load_manifest, publish_shards
+from agents.evaluation_runner.checkpoint import RunCheckpoint
+from tests.fakes import FakeContext
+
+CASES = [{"case_id": f"ev1_case_{i}"} for i in range(5)]
+
+def test_publish_claim_complete_and_clear_on_a_fresh_store():
+    async def scenario():
+        context = FakeContext()
+        manifest = await publish_shards("ev1", CASES, 2, context)
+        assert manifest["shard_count"] == 3
+
+        queue = ShardQueue("ev1", manifest["shard_count"], context, worker_id="worker-1")
+        claimed = []
+        while (claim := await queue.claim()) is not None:
+            shard_number, cases = claim
+            claimed.extend(case["case_id"] for case in cases)
+            await queue.complete(shard_number, [dict(case, success=True) for case in cases])
+
+        assert sorted(claimed) == sorted(case["case_id"] for case in CASES)
+        assert (await queue.progress())["completed"] == 3
+        assert sorted(await queue.collect()) == sorted(claimed)
+
+        await queue.clear()
+        assert not any(name == SHARD_NAMESPACE for name, _ in context.kv.store)
+        assert await load_manifest("ev1", context) is None
+
+    asyncio.run(scenario())
+
+def test_republishing_clears_leftovers_from_an_earlier_run():
+    async def scenario():
+        context = FakeContext()
+        await publish_shards("ev1", CASES, 5, context)
+        queue = ShardQueue("ev1", 1, context, worker_id="worker-1")
+        shard_number, cases = await queue.claim()
+        await queue.complete(shard_number, cases)
+
+        await publish_shards("ev1", CASES, 5, context)
+        assert (await queue.progress())["pending"] == 1
+
+    asyncio.run(scenario())
+
+def test_clearing_a_checkpoint_that_was_never_written():
+    async def scenario():
+        context = FakeContext()
+        checkpoint = RunCheckpoint("ev1", context)
+        await checkpoint.load()
+        await checkpoint.clear()
+
+    asyncio.run(scenario())
+
+def test_completing_a_shard_after_clear_leaves_no_keys():
+    async def scenario():
+        context = FakeContext()
+        await publish_shards("ev1", CASES, 5, context)
+        queue = ShardQueue("ev1", 1, context, worker_id="worker-1")
+        shard_number, cases = await queue.claim()
+
+        await queue.clear()
+        assert await queue.complete(shard_number, cases) is False
+        assert not any(name == SHARD_NAMESPACE for name, _ in context.kv.store)
+
+    asyncio.run(scenario())
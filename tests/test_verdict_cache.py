@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from agents.common.response_cache import ResponseCache
+from agents.llm_as_judge.verdict_cache import VerdictCacheSession, verdict_cache_key
+from tests.fakes import FakeContext
+
+KEY = verdict_cache_key("claude-3-haiku-20240307", 1, "What is 2 + 2?", "4", "Four")
+VERDICT = {"similarity_score": 95, "judge_reasoning": "Same answer"}
+
+def test_verdict_key_changes_with_anything_that_changes_the_verdict():
+    assert verdict_cache_key("claude-3-haiku-20240307", 1, "What is 2 + 2?", "4", "Four") == KEY
+    assert verdict_cache_key("claude-3-haiku-20240307", 2, "What is 2 + 2?", "4", "Four") != KEY
+    assert verdict_cache_key("claude-3-5-haiku-latest", 1, "What is 2 + 2?", "4", "Four") != KEY
+    assert verdict_cache_key("claude-3-haiku-20240307", 1, "What is 2 + 2?", "4", "Five") != KEY
+
+def test_policies_control_reads_and_writes():
+    async def scenario():
+        context = FakeContext()
+        cache = ResponseCache("test_verdicts", 10, 10_000, 60)
+
+        first_run = VerdictCacheSession("use", cache)
+        assert await first_run.lookup(KEY, context) is None
+        await first_run.store(KEY, VERDICT, context)
+
+        second_run = VerdictCacheSession("use", cache)
+        assert (await second_run.lookup(KEY, context))["similarity_score"] == 95
+        assert second_run.summary()["hits"] == 1
+
+        refreshed = VerdictCacheSession("refresh", cache)
+        assert await refreshed.lookup(KEY, context) is None
+        await refreshed.store(KEY, dict(VERDICT, similarity_score=80), context)
+        assert refreshed.summary()["writes"] == 1
+
+        bypassed = VerdictCacheSession("bypass", cache)
+        assert await bypassed.lookup(KEY, context) is None
+        await bypassed.store(KEY, VERDICT, context)
+        assert bypassed.summary()["writes"] == 0
+        assert (await second_run.lookup(KEY, context))["similarity_score"] == 80
+
+    asyncio.run(scenario())
+
+def test_unknown_policy_names_the_verdict_setting():
+    with pytest.raises(ValueError, match="verdict_cache_policy"):
+        VerdictCacheSession.from_settings({"verdict_cache_policy": "sometimes"})
@@ -0,0 +1,65 @@
+import pytest
+from anthropic.types import Message, TextBlock, ToolUseBlock, Usage
+from agents.llm_as_judge.verdict_schema import (
+    GROUP_JUDGE_TOOL, JUDGE_TOOL, MalformedVerdictError, extract_group_verdicts, extract_verdict, validate_verdict
+)
+
+def make_message(*content, stop_reason="tool_use") -> Message:
+    return Message(
+        id="msg_test",
+        type="message",
+        role="assistant",
+        model="test-model",
+        content=list(content),
+        stop_reason=stop_reason,
+        stop_sequence=None,
+        usage=Usage(input_tokens=1, output_tokens=1)
+    )
+
+def tool_call(tool, tool_input) -> ToolUseBlock:
+    return ToolUseBlock(type="tool_use", id="toolu_test", name=tool["name"], input=tool_input)
+
+def test_valid_verdicts_are_normalized():
+    assert validate_verdict({"similarity_score": 87, "reasoning": " Close enough "}) == (87, "Close enough")
+    assert validate_verdict({"similarity_score": 100.0, "reasoning": "Identical"}) == (100, "Identical")
+    assert validate_verdict({"similarity_score": 0, "reasoning": "Unrelated"}) == (0, "Unrelated")
+
+@pytest.mark.parametrize("verdict", [
+    "95",
+    {"reasoning": "No score"},
+    {"similarity_score": "95", "reasoning": "Score as text"},
+    {"similarity_score": True, "reasoning": "Score as a flag"},
+    {"similarity_score": 87.5, "reasoning": "Fractional score"},
+    {"similarity_score": 101, "reasoning": "Out of range"},
+    {"similarity_score": -1, "reasoning": "Out of range"},
+    {"similarity_score": 50},
+    {"similarity_score": 50, "reasoning": "   "}
+])
+def test_verdicts_off_the_schema_are_rejected(verdict):
+    with pytest.raises(MalformedVerdictError):
+        validate_verdict(verdict)
+
+def test_single_verdict_requires_the_judge_tool_call():
+    message = make_message(tool_call(JUDGE_TOOL, {"similarity_score": 90, "reasoning": "Same"}))
+    assert extract_verdict(message) == (90, "Same")
+
+    with pytest.raises(MalformedVerdictError, match="max_tokens"):
+        extract_verdict(make_message(TextBlock(type="text", text="Score: 90"), stop_reason="max_tokens"))
+    with pytest.raises(MalformedVerdictError):
+        extract_verdict(make_message(tool_call(GROUP_JUDGE_TOOL, {"verdicts": []})))
+
+def test_group_verdicts_keep_valid_entries_and_report_the_rest_missing():
+    message = make_message(tool_call(GROUP_JUDGE_TOOL, {"verdicts": [
+        {"id": "a", "similarity_score": 90, "reasoning": "Same"},
+        {"id": "a", "similarity_score": 10, "reasoning": "Repeated id"},
+        {"id": "b", "similarity_score": 200, "reasoning": "Out of range"},
+        {"id": "unknown", "similarity_score": 50, "reasoning": "Not requested"},
+        "not an object"
+    ]}))
+    verdicts, missing = extract_group_verdicts(message, ["a", "b", "c"])
+    assert verdicts == {"a": (90, "Same")}
+    assert missing == ["b", "c"]
+
+def test_group_reply_without_the_tool_call_misses_every_case():
+    verdicts, missing = extract_group_verdicts(make_message(TextBlock(type="text", text="All fine")), ["a", "b"])
+    assert verdicts == {} and missing == ["a", "b"]